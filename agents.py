@@ -1,20 +1,32 @@
 from typing import Any, TypedDict
 from langchain.agents import AgentExecutor, create_openai_tools_agent
-from llms import get_llm
+from llms import get_llm, key_fingerprint
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+import asyncio
 import os
+import threading
+import time
+from functools import wraps
 
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
+from cache import LRUCache
 from chains import get_finish_chain, get_supervisor_chain
+from analysis_store import get_analysis_store
+from artifacts import bind_resume, get_current_resume_path, unbind_resume
+from data_loader import resume_digest
+from memory import compact_history
+from router import cached_llm_route, classify, record_llm_route, remember_llm_route, route_cache_key, route_locally
 from tools import (
     get_job_search_tool,
-    ResumeExtractorTool,
+    get_resume_extractor_tool,
+    is_resume_extraction_error,
     generate_letter_for_specific_job,
     get_google_search_results, 
     save_cover_letter_for_specific_job,
     scrape_website,
+    scrape_websites,
 )
 from prompts import (
     get_analyzer_agent_prompt_template,
@@ -22,11 +34,12 @@ from prompts import (
     get_generator_agent_prompt_template,
     researcher_agent_prompt_template,
 )
+from utils import normalize_query
 
 load_dotenv()
 
 
-def create_agent(llm, tools: list, system_prompt: str):
+def create_agent(llm, tools: list, system_prompt: str, return_intermediate_steps: bool = False):
     """
     Creates an agent using the specified ChatOpenAI model, tools, and system prompt.
 
@@ -34,6 +47,7 @@ def create_agent(llm, tools: list, system_prompt: str):
         llm : LLM to be used to create the agent.
         tools (list): The list of tools to be given to the worker node.
         system_prompt (str): The system prompt to be used in the agent.
+        return_intermediate_steps (bool): Include the (action, observation) pairs in the output.
 
     Returns:
         AgentExecutor: The executor for the created agent.
@@ -47,19 +61,199 @@ def create_agent(llm, tools: list, system_prompt: str):
         ]
     )
     agent = create_openai_tools_agent(llm, tools, prompt)
-    executor = AgentExecutor(agent=agent, tools=tools)
+    executor = AgentExecutor(agent=agent, tools=tools, return_intermediate_steps=return_intermediate_steps)
     return executor
 
 
-def init_chat_model(model, model_provider, dashscope_api_key, temperature):
+def init_chat_model(model, model_provider, dashscope_api_key, temperature, streaming=False):
     return get_llm(
         provider=model_provider,
         model=model,
         api_key=dashscope_api_key,
         temperature=temperature,
+        streaming=streaming,
     )
 
-def supervisor_node(state):
+
+# 每个 Agent 节点的工具集与系统提示（工具实例在 tools 模块中只创建一次）
+AGENT_SPECS = {
+    "ResumeAnalyzer": (
+        lambda: [get_resume_extractor_tool(), get_google_search_results],
+        get_analyzer_agent_prompt_template,
+    ),
+    "CoverLetterGenerator": (
+        lambda: [
+            generate_letter_for_specific_job,
+            save_cover_letter_for_specific_job,
+            get_resume_extractor_tool(),
+        ],
+        get_generator_agent_prompt_template,
+    ),
+    "JobSearcher": (
+        lambda: [get_job_search_tool(), get_google_search_results],
+        get_search_agent_prompt_template,
+    ),
+    "WebResearcher": (
+        lambda: [get_google_search_results, scrape_website, scrape_websites],
+        researcher_agent_prompt_template,
+    ),
+}
+
+# 预编译的 AgentExecutor 缓存：提示模板、工具 schema 与 bind_tools 载荷只构建一次
+_executor_cache = LRUCache(max_size=32)
+
+
+def _llm_settings(config: dict) -> dict:
+    return {
+        "model": config["model"],
+        "model_provider": config["model_provider"],
+        "dashscope_api_key": config.get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
+        "temperature": config.get("temperature", 0.3),
+        # 流式模式下 LLM 逐 token 回调 on_llm_new_token，界面边生成边显示
+        "streaming": bool(config.get("streaming", False)),
+    }
+
+
+def _get_cached_runnable(name: str, config: dict, build):
+    settings = _llm_settings(config)
+    key = (
+        name,
+        settings["model_provider"],
+        settings["model"],
+        settings["temperature"],
+        settings["streaming"],
+        key_fingerprint(settings["dashscope_api_key"]),
+    )
+    return _executor_cache.get_or_create(key, lambda: build(init_chat_model(**settings)))
+
+
+def get_agent_executor(node: str, config: dict) -> AgentExecutor:
+    """
+    Returns the cached AgentExecutor for the given node and model configuration.
+
+    Executors are built once per (node, provider, model, temperature, streaming, key fingerprint) and
+    reused across turns and sessions; callbacks are passed per invocation, not at build time.
+
+    Args:
+        node (str): Name of the worker node, one of AGENT_SPECS.
+        config (dict): The "config" entry of the agent state.
+
+    Returns:
+        AgentExecutor: The shared executor for the node.
+    """
+    get_tools, get_prompt = AGENT_SPECS[node]
+    # ResumeAnalyzer 需要工具调用记录来判断分析是否真正成功
+    return _get_cached_runnable(
+        node, config,
+        lambda llm: create_agent(llm, get_tools(), get_prompt(), return_intermediate_steps=node == "ResumeAnalyzer"),
+    )
+
+
+def get_shared_supervisor_chain(config: dict):
+    """
+    Returns the process-wide supervisor chain for the given model configuration.
+    """
+    return _get_cached_runnable("Supervisor", config, get_supervisor_chain)
+
+
+def get_shared_finish_chain(config: dict):
+    """
+    Returns the process-wide finish (ChatBot) chain for the given model configuration.
+    """
+    return _get_cached_runnable("ChatBot", config, get_finish_chain)
+
+
+def get_executor_stats() -> dict:
+    """
+    Returns hit/miss counters of the agent executor cache.
+    """
+    return _executor_cache.stats()
+
+def with_session_context(node):
+    """
+    Binds the session's resume to the running context while the node executes,
+    so shared tool instances resolve the right file for each conversation.
+    """
+    if asyncio.iscoroutinefunction(node):
+        @wraps(node)
+        async def awrapped(state):
+            token = bind_resume(state.get("resume_path"))
+            try:
+                return await node(state)
+            finally:
+                unbind_resume(token)
+
+        return awrapped
+
+    @wraps(node)
+    def wrapped(state):
+        token = bind_resume(state.get("resume_path"))
+        try:
+            return node(state)
+        finally:
+            unbind_resume(token)
+
+    return wrapped
+
+
+def _resume_sha256(state) -> str:
+    if state.get("resume_sha256"):
+        return state["resume_sha256"]
+    resume_path = get_current_resume_path()
+    if not resume_path:
+        return ""
+    try:
+        return resume_digest(resume_path)
+    except OSError:
+        return ""
+
+
+def _analysis_model(config: dict) -> str:
+    settings = _llm_settings(config)
+    return f'{settings["model_provider"]}:{settings["model"]}'
+
+
+def _analysis_succeeded(output: dict, max_iterations=None) -> bool:
+    """
+    Returns True when a ResumeAnalyzer run read the resume and finished on its own.
+
+    The outcome is taken from the executor's intermediate steps, not from the report
+    text: the resume_extractor tool must have returned the resume at least once, and
+    the agent must have reached AgentFinish before hitting its iteration limit.
+    """
+    steps = output.get("intermediate_steps") or []
+    if not output.get("output"):
+        return False
+    if max_iterations is not None and len(steps) >= max_iterations:
+        return False
+    return any(
+        action.tool == "resume_extractor" and not is_resume_extraction_error(observation)
+        for action, observation in steps
+    )
+
+
+def get_resume_analysis(state):
+    """
+    Returns the ResumeAnalyzer report for the session's resume: the one produced in this
+    run, otherwise the stored report for the same resume, model and prompt version,
+    otherwise the latest ResumeAnalyzer message in the history (e.g. when the session
+    has no resume hash and nothing could be stored).
+    Must run inside with_session_context so the session's resume path is bound.
+    """
+    if state.get("resume_analysis"):
+        return state["resume_analysis"]
+    analysis = get_analysis_store().get(_resume_sha256(state), _analysis_model(state["config"]))
+    if not analysis:
+        analysis = next(
+            (msg.content for msg in reversed(state["messages"]) if getattr(msg, "name", None) == "ResumeAnalyzer"),
+            None,
+        )
+    if analysis:
+        state["resume_analysis"] = analysis
+    return analysis
+
+
+def _supervisor_steps(state):
     """
     Supervisor 节点 - 支持多Agent协作
     """
@@ -74,90 +268,75 @@ def supervisor_node(state):
         state["next_step"] = next_action
         return state
     
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
     if not chat_history:
         chat_history.append(HumanMessage(content=user_query))
     
-    # 🔴 分析用户查询，检测复合任务
-    user_lower = user_query.lower()
-    
-    # 🔴 检测复合任务模式
-    if ("简历" in user_lower or "resume" in user_lower) and ("求职信" in user_lower or "cover letter" in user_lower):
-        # 复合任务1：简历分析 + 求职信生成
-        print("🎯 检测到复合任务：简历分析 + 求职信生成")
-        state["needs_followup"] = "CoverLetterGenerator"
-        next_action = "ResumeAnalyzer"
-        
-    elif ("简历" in user_lower or "resume" in user_lower or "分析我的" in user_lower) and \
-         ("岗位" in user_lower or "job" in user_lower or "职位" in user_lower or "推荐" in user_lower or "招聘" in user_lower or "工作" in user_lower):
-        # 🔴 复合任务2：简历分析 + 岗位推荐
-        print("🎯 检测到复合任务：简历分析 + 岗位推荐")
-        state["needs_followup"] = "JobSearcher"
-        next_action = "ResumeAnalyzer"
-        
-    elif ("搜索" in user_lower or "查找" in user_lower) and \
-         ("岗位" in user_lower or "job" in user_lower or "职位" in user_lower or "工作" in user_lower) and \
-         ("简历" in user_lower or "resume" in user_lower or "我的" in user_lower):
-        # 🔴 复合任务3：简历分析 + 岗位搜索
-        print("🎯 检测到复合任务：简历分析 + 岗位搜索")
-        state["needs_followup"] = "JobSearcher"
-        next_action = "ResumeAnalyzer"
-        
+    # 🔴 本地意图分类：复合任务与高置信度的单一任务不调用 LLM
+    route = route_locally(user_query)
+    if route is not None:
+        next_action = route.agent
+        if route.followup:
+            labels = {"CoverLetterGenerator": "求职信生成", "JobSearcher": "岗位推荐"}
+            print(f"🎯 检测到复合任务：简历分析 + {labels[route.followup]}")
+            state["needs_followup"] = route.followup
+        else:
+            print(f"⚡ 本地路由（置信度 {route.confidence:.2f}）")
     else:
-        # 单一任务，使用 supervisor chain
-        supervisor_chain = get_supervisor_chain(llm)
-        output = supervisor_chain.invoke({"messages": chat_history})
-        next_action = output.content.strip()
-        
-        # 验证输出
-        valid_agents = ["ResumeAnalyzer", "CoverLetterGenerator", "JobSearcher", "WebResearcher", "ChatBot", "Finish"]
-        if next_action not in valid_agents:
-            if any(word in user_lower for word in ["简历", "resume", "分析"]):
-                next_action = "ResumeAnalyzer"
-            elif any(word in user_lower for word in ["岗位", "job", "工作"]):
-                next_action = "JobSearcher"
-            elif any(word in user_lower for word in ["求职信", "cover letter"]):
-                next_action = "CoverLetterGenerator"
-            elif any(word in user_lower for word in ["搜索", "研究", "新闻"]):
-                next_action = "WebResearcher"
+        # 意图不明确，先查路由缓存（相同问题 + 相同会话形态 + 相同模型），未命中再调用 supervisor chain
+        settings = _llm_settings(state["config"])
+        cache_key = route_cache_key(
+            normalize_query(user_query), chat_history, f'{settings["model_provider"]}:{settings["model"]}'
+        )
+        next_action = cached_llm_route(cache_key)
+        if next_action is not None:
+            print("⚡ 路由缓存命中")
+        else:
+            supervisor_chain = get_shared_supervisor_chain(state["config"])
+            started = time.perf_counter()
+            output = yield supervisor_chain, {"messages": compact_history(chat_history, "Supervisor")}, None
+            record_llm_route(time.perf_counter() - started)
+            next_action = output.content.strip()
+
+            # 验证输出，只缓存有效结果；无效时退回本地分类的最佳猜测
+            valid_agents = ["ResumeAnalyzer", "CoverLetterGenerator", "JobSearcher", "WebResearcher", "ChatBot", "Finish"]
+            if next_action in valid_agents:
+                remember_llm_route(cache_key, next_action)
             else:
-                next_action = "ChatBot"
+                next_action = classify(user_query).agent or "ChatBot"
     
     print(f"🎯 Supervisor 路由到: {next_action}")
     state["next_step"] = next_action
     state["messages"] = chat_history
     return state
 
-def resume_analyzer_node(state):
+def _resume_analyzer_steps(state):
     """
     简历分析节点 - 支持协作模式
     """
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
-    analyzer_agent = create_agent(
-        llm, [ResumeExtractorTool(), get_google_search_results], 
-        get_analyzer_agent_prompt_template()
-    )
-    
     state["callback"].write_agent_name("📄 ResumeAnalyzer Agent")
     
-    output = analyzer_agent.invoke(
-        {"messages": state["messages"]}, 
-        {"callbacks": [state["callback"]]}
-    )
+    # 🔴 复合任务中简历分析只是后续 Agent 的输入：同一份简历、模型和提示词已分析过则直接复用
+    resume_sha256 = _resume_sha256(state)
+    model = _analysis_model(state["config"])
+    result_content = None
+    if state.get("needs_followup"):
+        result_content = get_analysis_store().get(resume_sha256, model)
+        if result_content:
+            print("📄 复用已保存的简历分析结果")
+    
+    if not result_content:
+        analyzer_agent = get_agent_executor("ResumeAnalyzer", state["config"])
+        output = yield (
+            analyzer_agent,
+            {"messages": compact_history(state["messages"], "ResumeAnalyzer")},
+            {"callbacks": [state["callback"]]},
+        )
+        result_content = output.get("output")
+        # 失败的分析不能保存，否则在有效期内会一直被当作分析结果复用
+        if _analysis_succeeded(output, analyzer_agent.max_iterations):
+            get_analysis_store().put(resume_sha256, model, result_content)
     
-    result_content = output.get("output")
+    state["resume_analysis"] = result_content
     state["messages"].append(AIMessage(content=result_content, name="ResumeAnalyzer"))
     
     # 🔴 如果有后续任务，标记为未完成
@@ -170,37 +349,19 @@ def resume_analyzer_node(state):
     
     return state
 
-def cover_letter_generator_node(state):
+def _cover_letter_generator_steps(state):
     """
     求职信生成节点 - 增强协作功能
     """
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
-    generator_agent = create_agent(
-        llm, [
-            generate_letter_for_specific_job,
-            save_cover_letter_for_specific_job,
-            ResumeExtractorTool(),
-        ], 
-        get_generator_agent_prompt_template()
-    )
+    generator_agent = get_agent_executor("CoverLetterGenerator", state["config"])
 
     state["callback"].write_agent_name("✍️ CoverLetterGenerator Agent")
     
     # 🔴 检查是否有简历分析结果，如果有则生成更好的提示
-    messages_to_use = state["messages"].copy()
+    messages_to_use = compact_history(state["messages"], "CoverLetterGenerator")
     
-    # 查找 ResumeAnalyzer 的输出
-    resume_analysis = None
-    for msg in reversed(state["messages"]):
-        if hasattr(msg, 'name') and msg.name == "ResumeAnalyzer":
-            resume_analysis = msg.content
-            break
+    # 读取本次或之前保存的简历分析结果
+    resume_analysis = get_resume_analysis(state)
     
     if resume_analysis:
         enhanced_prompt = f"""基于以下简历分析结果，生成一份专业的求职信：
@@ -213,9 +374,10 @@ def cover_letter_generator_node(state):
         messages_to_use.append(HumanMessage(content=enhanced_prompt))
         print("✍️ 使用简历分析结果生成求职信")
     
-    output = generator_agent.invoke(
-        {"messages": messages_to_use}, 
-        {"callbacks": [state["callback"]]}
+    output = yield (
+        generator_agent,
+        {"messages": messages_to_use},
+        {"callbacks": [state["callback"]]},
     )
     
     result_content = output.get("output")
@@ -237,33 +399,19 @@ def cover_letter_generator_node(state):
     
     return state
 
-def job_search_node(state):
+def _job_search_steps(state):
     """
     职位搜索节点 - 支持协作模式
     """
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
-    search_agent = create_agent(
-        llm, [get_job_search_tool(), get_google_search_results], 
-        get_search_agent_prompt_template()
-    )
+    search_agent = get_agent_executor("JobSearcher", state["config"])
     
     state["callback"].write_agent_name("💼 JobSearcher Agent")
     
     # 🔴 检查是否有简历分析结果，如果有则生成更好的搜索提示
-    messages_to_use = state["messages"].copy()
+    messages_to_use = compact_history(state["messages"], "JobSearcher")
     
-    # 查找 ResumeAnalyzer 的输出
-    resume_analysis = None
-    for msg in reversed(state["messages"]):
-        if hasattr(msg, 'name') and msg.name == "ResumeAnalyzer":
-            resume_analysis = msg.content
-            break
+    # 读取本次或之前保存的简历分析结果
+    resume_analysis = get_resume_analysis(state)
     
     if resume_analysis:
         enhanced_prompt = f"""基于以下简历分析结果，搜索和推荐合适的岗位：
@@ -271,18 +419,18 @@ def job_search_node(state):
 **简历分析结果：**
 {resume_analysis}
 
-请根据上述简历分析，搜索匹配的岗位机会，重点关注：
-1. 与候选人技能匹配的职位
-2. 适合候选人经验水平的岗位
-3. 候选人所在行业或相关行业的机会
-4. 提供具体的岗位列表和申请建议"""
+请根据上述简历分析确定搜索关键词，搜索匹配的岗位机会：
+1. 工具返回的职位已按与简历的匹配度（match_score）排好序，直接沿用该顺序和分数，不要重新排序
+2. 用 matched_skills 说明每个职位与候选人技能的契合点
+3. 结合候选人的经验水平和行业给出申请建议"""
         
         messages_to_use.append(HumanMessage(content=enhanced_prompt))
         print("💼 使用简历分析结果搜索匹配岗位")
     
-    output = search_agent.invoke(
-        {"messages": messages_to_use}, 
-        {"callbacks": [state["callback"]]}
+    output = yield (
+        search_agent,
+        {"messages": messages_to_use},
+        {"callbacks": [state["callback"]]},
     )
     
     result_content = output.get("output")
@@ -304,64 +452,123 @@ def job_search_node(state):
     
     return state
 
-def web_research_node(state):
+def _web_research_steps(state):
     """
     网络研究节点 - 支持协作模式
     """
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
-    research_agent = create_agent(
-        llm, [get_google_search_results, scrape_website], 
-        researcher_agent_prompt_template()
-    )
+    research_agent = get_agent_executor("WebResearcher", state["config"])
     
     state["callback"].write_agent_name("🔍 WebResearcher Agent")
     
-    output = research_agent.invoke(
-        {"messages": state["messages"]}, 
-        {"callbacks": [state["callback"]]}
+    output = yield (
+        research_agent,
+        {"messages": compact_history(state["messages"], "WebResearcher")},
+        {"callbacks": [state["callback"]]},
     )
     
     state["messages"].append(AIMessage(content=output.get("output"), name="WebResearcher"))
     state["task_completed"] = True
     return state
 
-def chatbot_node(state):
+def _chatbot_steps(state):
     """聊天机器人节点"""
-    llm = init_chat_model(
-        model=state["config"]["model"],
-        model_provider=state["config"]["model_provider"],
-        dashscope_api_key=state["config"].get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY"),
-        temperature=state["config"].get("temperature", 0.3)
-    )
-    
     state["callback"].write_agent_name("🤖 ChatBot Agent")
     
-    finish_chain = get_finish_chain(llm)
-    output = finish_chain.invoke({"messages": state["messages"]})
+    finish_chain = get_shared_finish_chain(state["config"])
+    output = yield (
+        finish_chain,
+        {"messages": compact_history(state["messages"], "ChatBot")},
+        {"callbacks": [state["callback"]]},
+    )
     
     state["messages"].append(AIMessage(content=output.content, name="ChatBot"))
     state["task_completed"] = True
     return state
 
-def define_graph():
+def _run_steps(steps):
+    """
+    Runs a node's step generator synchronously: every (runnable, input, config) it yields
+    is executed with invoke and the result is sent back into the generator.
+    """
+    try:
+        call = next(steps)
+        while True:
+            runnable, inputs, config = call
+            call = steps.send(runnable.invoke(inputs, config))
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun_steps(steps):
+    """
+    Async counterpart of _run_steps: LLM and agent calls are awaited with ainvoke, so one
+    event loop can serve many conversations while they wait on the network.
+    """
+    try:
+        call = next(steps)
+        while True:
+            runnable, inputs, config = call
+            call = steps.send(await runnable.ainvoke(inputs, config))
+    except StopIteration as done:
+        return done.value
+
+
+def _sync_node(step_fn):
+    @wraps(step_fn)
+    def node(state):
+        return _run_steps(step_fn(state))
+
+    return node
+
+
+def _async_node(step_fn):
+    @wraps(step_fn)
+    async def node(state):
+        return await _arun_steps(step_fn(state))
+
+    return node
+
+
+# 每个节点的逻辑只写一次（步骤生成器），同步图和异步图共用前后处理
+supervisor_node = _sync_node(_supervisor_steps)
+resume_analyzer_node = _sync_node(_resume_analyzer_steps)
+cover_letter_generator_node = _sync_node(_cover_letter_generator_steps)
+job_search_node = _sync_node(_job_search_steps)
+web_research_node = _sync_node(_web_research_steps)
+chatbot_node = _sync_node(_chatbot_steps)
+
+asupervisor_node = _async_node(_supervisor_steps)
+aresume_analyzer_node = _async_node(_resume_analyzer_steps)
+acover_letter_generator_node = _async_node(_cover_letter_generator_steps)
+ajob_search_node = _async_node(_job_search_steps)
+aweb_research_node = _async_node(_web_research_steps)
+achatbot_node = _async_node(_chatbot_steps)
+
+
+def define_graph(use_async: bool = False):
     """
     定义支持多Agent协作的工作流图
+
+    use_async=True 时使用异步节点（AgentExecutor.ainvoke / 异步工具 / 异步 LLM），
+    编译后的图需通过 ainvoke / astream 驱动。
     """
+    if use_async:
+        nodes = (asupervisor_node, aresume_analyzer_node, ajob_search_node,
+                 acover_letter_generator_node, aweb_research_node, achatbot_node)
+    else:
+        nodes = (supervisor_node, resume_analyzer_node, job_search_node,
+                 cover_letter_generator_node, web_research_node, chatbot_node)
+    supervisor, resume_analyzer, job_search, cover_letter_generator, web_research, chatbot = nodes
+
     workflow = StateGraph(AgentState)
     
     # 添加节点
-    workflow.add_node("Supervisor", supervisor_node)
-    workflow.add_node("ResumeAnalyzer", resume_analyzer_node)
-    workflow.add_node("JobSearcher", job_search_node)
-    workflow.add_node("CoverLetterGenerator", cover_letter_generator_node)
-    workflow.add_node("WebResearcher", web_research_node)
-    workflow.add_node("ChatBot", chatbot_node)
+    workflow.add_node("Supervisor", supervisor)
+    workflow.add_node("ResumeAnalyzer", with_session_context(resume_analyzer))
+    workflow.add_node("JobSearcher", with_session_context(job_search))
+    workflow.add_node("CoverLetterGenerator", with_session_context(cover_letter_generator))
+    workflow.add_node("WebResearcher", with_session_context(web_research))
+    workflow.add_node("ChatBot", with_session_context(chatbot))
     
     # 设置入口点
     workflow.set_entry_point("Supervisor")
@@ -401,6 +608,41 @@ def define_graph():
     
     return workflow.compile()
 
+
+_compiled_graph = None
+_compiled_async_graph = None
+_compiled_graph_lock = threading.Lock()
+
+
+def get_graph():
+    """
+    Returns the process-wide compiled graph, compiling it on first use.
+
+    The compiled graph holds no per-session data: everything a conversation needs
+    (messages, config, callback) is passed through the invoke input.
+    """
+    global _compiled_graph
+    if _compiled_graph is None:
+        with _compiled_graph_lock:
+            if _compiled_graph is None:
+                _compiled_graph = define_graph()
+    return _compiled_graph
+
+
+def get_async_graph():
+    """
+    Returns the process-wide graph compiled with async nodes, for ainvoke / astream.
+
+    Agent, tool and LLM calls are awaited, so a single event loop can run many
+    conversations concurrently instead of holding a thread per conversation.
+    """
+    global _compiled_async_graph
+    if _compiled_async_graph is None:
+        with _compiled_graph_lock:
+            if _compiled_async_graph is None:
+                _compiled_async_graph = define_graph(use_async=True)
+    return _compiled_async_graph
+
 # The agent state is the input to each node in the graph
 class AgentState(TypedDict):
     user_input: str              # 用户输入
@@ -409,4 +651,7 @@ class AgentState(TypedDict):
     config: dict                 # 配置信息
     callback: Any                # 回调处理器
     task_completed: bool         # 🔴 新增：标记任务是否完成
-    needs_followup: str          # 🔴 新增：需要后续执行的Agent
\ No newline at end of file
+    needs_followup: str          # 🔴 新增：需要后续执行的Agent
+    resume_path: str             # 当前会话简历（按内容哈希存储）的路径
+    resume_sha256: str           # 当前会话简历的内容哈希
+    resume_analysis: str         # 本轮 ResumeAnalyzer 的分析结果，供后续 Agent 使用
\ No newline at end of file
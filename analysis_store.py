@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+import time
+
+from cache import LRUCache, SQLiteCache
+from prompts import get_analyzer_agent_prompt_template
+
+# 简历分析结果的持久化存储；设为空字符串则只保存在内存中
+ANALYSIS_STORE_PATH = os.environ.get("ANALYSIS_STORE_PATH", os.path.join("temp", "resume_analysis.sqlite3"))
+# 分析结果的有效期（秒），简历和提示词不变时分析结论不会过时，默认 30 天
+ANALYSIS_TTL = float(os.environ.get("ANALYSIS_TTL", str(30 * 86400)))
+# 提示词版本：ResumeAnalyzer 的系统提示词一旦修改，旧的分析结果自动失效
+PROMPT_VERSION = hashlib.sha256(get_analyzer_agent_prompt_template().encode("utf-8")).hexdigest()[:12]
+
+
+class ResumeAnalysisStore:
+    """
+    Stores ResumeAnalyzer reports keyed by (resume SHA-256, model, prompt version).
+
+    Reports are kept in an in-memory LRU in front of an optional SQLite table, so an
+    analysis produced in one session is reused by later turns and other sessions for
+    the same resume bytes, model and analyzer prompt.
+
+    Methods:
+        key(resume_sha256, model): Build the store key for the current prompt version.
+        get(resume_sha256, model): Return the stored report, or None.
+        put(resume_sha256, model, analysis): Store a report; callers only pass successful runs.
+        stats(): Return hit/miss/write counters.
+    """
+
+    def __init__(self, path: str = ANALYSIS_STORE_PATH, ttl: float = ANALYSIS_TTL, max_size: int = 256) -> None:
+        self.ttl = ttl
+        self.store = SQLiteCache(path, table="resume_analysis") if path else None
+        self._memory = LRUCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def key(resume_sha256: str, model: str) -> str:
+        return f"{resume_sha256}:{model}:{PROMPT_VERSION}"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, resume_sha256: str, model: str):
+        if not resume_sha256:
+            return None
+        key = self.key(resume_sha256, model)
+        analysis = self._memory.get(key)
+        if analysis is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, stored_at = stored
+                if time.time() - stored_at < self.ttl:
+                    analysis = value
+                    self._memory.set(key, analysis, ttl=self.ttl - (time.time() - stored_at))
+        self._count("hits" if analysis is not None else "misses")
+        return analysis
+
+    def put(self, resume_sha256: str, model: str, analysis: str) -> None:
+        # 是否成功由调用方根据 Agent 的实际运行结果判断，这里只拒绝空输出
+        if not resume_sha256 or not analysis or not analysis.strip():
+            return
+        key = self.key(resume_sha256, model)
+        self._memory.set(key, analysis)
+        if self.store is not None:
+            self.store.set(key, analysis)
+        self._count("writes")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": self.hits / total if total else 0.0,
+                "prompt_version": PROMPT_VERSION,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> ResumeAnalysisStore:
+    """
+    Returns the process-wide resume analysis store.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResumeAnalysisStore()
+    return _store
+
+
+def get_analysis_store_stats() -> dict:
+    """
+    Returns hit/miss/write counters of the resume analysis store.
+    """
+    return get_analysis_store().stats()
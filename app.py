@@ -10,7 +10,9 @@ from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ct
 from streamlit.delta_generator import DeltaGenerator
 from langchain_community.chat_message_histories import StreamlitChatMessageHistory
 from custom_callback_handler import CustomStreamlitCallbackHandler
-from agents import define_graph
+from agents import get_graph
+from streaming import stream_graph
+from artifacts import get_artifact_store
 import shutil
 from langchain_core.messages import HumanMessage, AIMessage
 
@@ -55,21 +57,19 @@ if not uploaded_document:
         st.sidebar.write("📝 请上传您的简历以开始使用职业助手功能")
         uploaded_document = None
         
-# 🔴 优化：避免重复保存简历
+# 🔴 优化：简历按内容哈希存储，每个会话只引用自己的文件；相同内容只写一次
 if uploaded_document:
-    # 检查是否是新文件
+    # 按内容（而非文件名）判断是否是新文件
     current_filename = getattr(uploaded_document, 'name', 'dummy_resume.pdf')
-    if not st.session_state.get("resume_saved", False) or st.session_state.get("resume_filename", "") != current_filename:
-        bytes_data = uploaded_document.read()
-        filepath = os.path.join(temp_dir, "resume.pdf")
-        with open(filepath, "wb") as f:
-            f.write(bytes_data)
-        
+    resume_sha256, filepath = get_artifact_store().put_stream(uploaded_document, suffix=".pdf")
+    if not st.session_state.get("resume_saved", False) or st.session_state.get("resume_sha256", "") != resume_sha256:
         # 更新会话状态
         st.session_state["resume_saved"] = True
         st.session_state["resume_filename"] = current_filename
+        st.session_state["resume_sha256"] = resume_sha256
+        st.session_state["resume_path"] = filepath
         
-        print(f"新简历已保存: {current_filename}, 简历已保存到: {filepath}, 大小: {len(bytes_data)} bytes")
+        print(f"新简历已保存: {current_filename}, 简历已保存到: {filepath}, 大小: {os.path.getsize(filepath)} bytes")
         st.sidebar.markdown("**✅ 简历上传成功！**")
     else:
         st.sidebar.markdown(f"**✅ 已加载简历：{current_filename}**")
@@ -91,11 +91,14 @@ model_tongyi = st.sidebar.selectbox(
     help="推荐使用 qwen-plus 或 qwen-max 以获得更好的工具调用支持"
 )
 
+stream_output = st.sidebar.toggle("流式输出", value=True, help="边生成边显示回答，并实时显示 Agent 交接")
+
 settings = {
     "model": model_tongyi,
     "model_provider": "tongyi",
     "temperature": 0.3,
     "DASHSCOPE_API_KEY": api_key_tongyi,
+    "streaming": stream_output,
 }
 st.session_state["DASHSCOPE_API_KEY"] = api_key_tongyi
 os.environ["DASHSCOPE_API_KEY"] = api_key_tongyi
@@ -117,8 +120,12 @@ if model_tongyi in ["qwen-plus", "qwen-max", "qwen-max-1201"]:
 else:
     st.sidebar.markdown("⚠️ 基础模型，部分高级功能可能受限")
 
-# 创建代理流程
-flow_graph = define_graph()
+# 🔴 优化：编译后的代理流程在进程内共享，不随每次 rerun / 每个会话重新编译
+@st.cache_resource
+def load_flow_graph():
+    return get_graph()
+
+flow_graph = load_flow_graph()
 message_history = StreamlitChatMessageHistory()
 
 # 初始化会话状态变量
@@ -134,6 +141,10 @@ if "resume_saved" not in st.session_state:
     st.session_state["resume_saved"] = False
 if "resume_filename" not in st.session_state:
     st.session_state["resume_filename"] = ""
+if "resume_sha256" not in st.session_state:
+    st.session_state["resume_sha256"] = ""
+if "resume_path" not in st.session_state:
+    st.session_state["resume_path"] = ""
 if "DASHSCOPE_API_KEY" not in st.session_state:
     st.session_state["DASHSCOPE_API_KEY"] = ""
 
@@ -171,20 +182,27 @@ def execute_chat_conversation(user_input, graph):
     try:
         print(f"执行对话，用户输入: {user_input}")
         
-        # 清除之前的agent序列
-        callback_handler.clear_agent_sequence()
+        # 清除之前的agent序列，开始计时
+        callback_handler.start_run()
         
-        # 🔴 优化：简化消息处理
-        output = graph.invoke(
-            {
-                "messages": list(message_history.messages) + [HumanMessage(content=user_input)],
-                "user_input": user_input,
-                "config": settings,
-                "callback": callback_handler,
-                "recursion_count": 0,  # 初始化递归计数
-            },
-            {"recursion_limit": 15},  # 增加递归限制以支持多步骤任务
-        )
+        # 🔴 逐个节点执行：Supervisor 的交接即时显示，LLM token 经回调流式写入界面
+        inputs = {
+            "messages": list(message_history.messages) + [HumanMessage(content=user_input)],
+            "user_input": user_input,
+            "config": settings,
+            "callback": callback_handler,
+            "resume_path": st.session_state.get("resume_path", ""),
+            "resume_sha256": st.session_state.get("resume_sha256", ""),
+            "recursion_count": 0,  # 初始化递归计数
+        }
+        output = inputs
+        for node, state in stream_graph(graph, inputs, {"recursion_limit": 15}):  # 增加递归限制以支持多步骤任务
+            if node == "Supervisor" and state.get("next_step") not in (None, "", "Finish"):
+                callback_handler.write_handoff(state["next_step"])
+            output = state
+        
+        latency = callback_handler.finish_run()
+        print(f"⏱️ 首个 token {latency['ttft_seconds']:.2f}s，总耗时 {latency['total_seconds']:.2f}s")
         
         # 显示agent执行序列
         agent_sequence = callback_handler.get_agent_sequence()
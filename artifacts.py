@@ -0,0 +1,132 @@
+import hashlib
+import os
+import tempfile
+import threading
+from contextvars import ContextVar
+
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", os.path.join("temp", "artifacts"))
+CHUNK_SIZE = 256 * 1024
+
+# 当前会话的简历路径；由图节点在执行前绑定，工具在执行时读取
+_current_resume_path: ContextVar = ContextVar("current_resume_path", default=None)
+
+
+class ArtifactStore:
+    """
+    A content-addressed file store for uploaded artifacts such as resumes.
+
+    Each artifact is written once under <root>/<sha256><suffix>; uploading identical
+    bytes again resolves to the same path without rewriting the file, and different
+    sessions can never overwrite each other's uploads.
+
+    Methods:
+        put_stream(stream, suffix): Hash and store a binary stream in chunks, returning (digest, path).
+        path_for(digest, suffix): Return the storage path for a digest.
+        exists(digest, suffix): Check whether an artifact is already stored.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, chunk_size: int = CHUNK_SIZE) -> None:
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, digest: str, suffix: str = ".pdf") -> str:
+        return os.path.join(self.root, f"{digest}{suffix}")
+
+    def exists(self, digest: str, suffix: str = ".pdf") -> bool:
+        return os.path.exists(self.path_for(digest, suffix))
+
+    def _chunks(self, stream):
+        return iter(lambda: stream.read(self.chunk_size), b"")
+
+    def put_stream(self, stream, suffix: str = ".pdf"):
+        """
+        Stores a binary stream under its SHA-256.
+
+        Seekable streams are hashed first and only written when the digest is new;
+        other streams are written to a temporary file while hashing and discarded
+        if the digest already exists.
+
+        Returns:
+            tuple[str, str]: The hex digest and the path of the stored artifact.
+        """
+        if hasattr(stream, "seek") and getattr(stream, "seekable", lambda: True)():
+            stream.seek(0)
+            digest = hashlib.sha256()
+            for chunk in self._chunks(stream):
+                digest.update(chunk)
+            hexdigest = digest.hexdigest()
+            path = self.path_for(hexdigest, suffix)
+            if not os.path.exists(path):
+                stream.seek(0)
+                self._write_atomic(self._chunks(stream), path)
+            stream.seek(0)
+            return hexdigest, path
+
+        digest = hashlib.sha256()
+
+        def hashed_chunks():
+            for chunk in self._chunks(stream):
+                digest.update(chunk)
+                yield chunk
+
+        tmp_path = self._write_temp(hashed_chunks())
+        hexdigest = digest.hexdigest()
+        path = self.path_for(hexdigest, suffix)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return hexdigest, path
+
+    def _write_temp(self, chunks) -> str:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _write_atomic(self, chunks, path: str) -> None:
+        # 先写临时文件再原子替换，并发写入同一哈希时读者不会看到半个文件
+        os.replace(self._write_temp(chunks), path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Returns the process-wide artifact store.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+    return _store
+
+
+def bind_resume(path):
+    """
+    Binds the resume path of the current session to the running context.
+
+    Returns:
+        Token: Pass to unbind_resume to restore the previous binding.
+    """
+    return _current_resume_path.set(path)
+
+
+def unbind_resume(token) -> None:
+    _current_resume_path.reset(token)
+
+
+def get_current_resume_path() -> str:
+    """
+    Returns the resume path bound to the current session, or "" when the session has
+    no resume. Callers skip resume-dependent work in that case.
+    """
+    return _current_resume_path.get() or ""
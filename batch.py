@@ -0,0 +1,299 @@
+"""
+Batch runner: executes the agent graph over many (resume, query) jobs in parallel.
+
+Usage:
+    python batch.py jobs.jsonl results.jsonl [--workers 8] [--executor thread|process]
+                    [--timeout 300] [--query "分析我的简历" --query "为我的简历生成求职信"]
+
+Input: one JSON object per line with "id", "resume" (PDF path) and "query". Lines without
+a "query" are expanded into one job per --query, with ids "<id>#<n>".
+
+Output: one JSON object per finished job, appended and flushed as soon as it completes:
+{"id", "resume", "query", "status": "ok" | "error" | "timeout", "answer", "agents",
+"seconds", "error"}. Re-running with the same output file skips every job already
+recorded with status "ok", so an interrupted batch resumes where it stopped; failed and
+timed-out jobs are retried.
+
+Each worker runs turns on the async graph, on one event loop it keeps for all its jobs,
+so the pooled HTTP sessions bound to that loop are reused from job to job and closed
+when the batch ends. The per-job timeout cancels the turn inside the worker, and the
+worker then moves on to the next job.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from langchain_core.messages import HumanMessage
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "8"))
+BATCH_TIMEOUT = float(os.environ.get("BATCH_TIMEOUT", "300"))
+BATCH_RECURSION_LIMIT = 15
+DEFAULT_GRAPH_FACTORY = "agents:get_async_graph"
+
+
+def load_jobs(path: str, queries: list = ()) -> list:
+    """
+    Reads job lines and expands lines without a query into one job per query.
+
+    Returns:
+        list[dict]: Jobs with "id", "resume" and "query", in file order.
+
+    Raises:
+        ValueError: On invalid JSON, a duplicate id, or a line without a query when no
+            queries are given.
+    """
+    jobs, seen = [], set()
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON ({e})") from None
+            job_id = str(item.get("id") or number)
+            if item.get("query"):
+                expanded = [(job_id, item["query"])]
+            elif not queries:
+                raise ValueError(f"{path}:{number}: no query; add one to the line or pass --query")
+            else:
+                expanded = [(f"{job_id}#{index}", query) for index, query in enumerate(queries, 1)]
+            for expanded_id, query in expanded:
+                if expanded_id in seen:
+                    raise ValueError(f"{path}:{number}: duplicate job id {expanded_id}")
+                seen.add(expanded_id)
+                jobs.append({"id": expanded_id, "resume": item.get("resume", ""), "query": query})
+    return jobs
+
+
+def completed_ids(path: str) -> set:
+    """
+    Returns the ids already recorded with status "ok" in an output file.
+    A truncated last line (interrupted write) is ignored.
+    """
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("status") == "ok":
+                    done.add(record.get("id"))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def _load_graph(factory_path: str):
+    # 每个工作进程只编译一次图；线程池中的工作线程共用同一个图
+    with _graphs_lock:
+        graph = _graphs.get(factory_path)
+        if graph is None:
+            module, _, attribute = factory_path.partition(":")
+            graph = _graphs[factory_path] = getattr(importlib.import_module(module), attribute)()
+    return graph
+
+
+_worker = threading.local()
+_worker_loops = []
+_worker_loops_lock = threading.Lock()
+
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    # 每个工作线程（或进程）在所有作业间复用同一个事件循环：按事件循环创建的 aiohttp/httpx
+    # 连接池因此跨作业复用，而不是每个作业 asyncio.run 一次、留下一个未关闭的会话
+    loop = getattr(_worker, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _worker.loop = asyncio.new_event_loop()
+        with _worker_loops_lock:
+            _worker_loops.append(loop)
+    return loop
+
+
+def close_worker_loops() -> None:
+    """
+    Closes the pooled HTTP session and the event loop of every worker in this process.
+    Call it only once the workers are idle, i.e. after the pool has shut down.
+    """
+    from utils import close_http_session
+
+    with _worker_loops_lock:
+        loops = list(_worker_loops)
+        _worker_loops.clear()
+    for loop in loops:
+        try:
+            loop.run_until_complete(close_http_session())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+def _init_process_worker() -> None:
+    # 进程池的工作进程退出时不会执行 atexit，改用 multiprocessing 的终结器收尾
+    multiprocessing.util.Finalize(None, close_worker_loops, exitpriority=10)
+
+
+async def _run_turn(graph, job: dict, model_config: dict) -> dict:
+    from data_loader import resume_digest
+    from streaming import EventCallbackHandler
+
+    resume_path = os.path.abspath(job["resume"]) if job["resume"] else ""
+    callback = EventCallbackHandler()
+    state = await graph.ainvoke(
+        {
+            "messages": [HumanMessage(content=job["query"])],
+            "user_input": job["query"],
+            "config": model_config,
+            "callback": callback,
+            "resume_path": resume_path,
+            "resume_sha256": resume_digest(resume_path) if resume_path else "",
+        },
+        {"recursion_limit": BATCH_RECURSION_LIMIT},
+    )
+    messages = state.get("messages") or []
+    return {"answer": messages[-1].content if messages else "", "agents": callback.get_agent_sequence()}
+
+
+def _new_record(job: dict, status: str = "ok", error: str = "") -> dict:
+    return {"id": job["id"], "resume": job["resume"], "query": job["query"],
+            "status": status, "answer": "", "agents": [], "error": error}
+
+
+def run_job(job: dict, model_config: dict, timeout: float, factory_path: str = DEFAULT_GRAPH_FACTORY) -> dict:
+    """
+    Runs one job to completion or timeout and returns its output record. Never raises.
+    """
+    record = _new_record(job)
+    started = time.perf_counter()
+    try:
+        if job["resume"] and not os.path.exists(job["resume"]):
+            raise FileNotFoundError(f"resume not found: {job['resume']}")
+        graph = _load_graph(factory_path)
+        loop = _worker_loop()
+        record.update(loop.run_until_complete(asyncio.wait_for(_run_turn(graph, job, model_config), timeout)))
+    except asyncio.TimeoutError:
+        record.update(status="timeout", error=f"timed out after {timeout:g}s")
+    except Exception as e:
+        record.update(status="error", error=str(e) or type(e).__name__)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(jobs: list, output_path: str, model_config: dict, workers: int = BATCH_WORKERS,
+              executor: str = "thread", timeout: float = BATCH_TIMEOUT,
+              factory_path: str = DEFAULT_GRAPH_FACTORY) -> dict:
+    """
+    Runs jobs in a thread or process pool and appends each record to output_path as it finishes.
+
+    Jobs already completed in output_path are skipped. At most 2 * workers jobs are in
+    flight at once, so memory stays bounded for large batches. A job whose worker fails
+    outside run_job (e.g. a crashed process breaking the pool) is recorded as an error
+    and the remaining jobs are still drained and recorded.
+
+    Returns:
+        dict: Counts per status, skipped jobs and wall-clock seconds.
+    """
+    done = completed_ids(output_path)
+    pending = [job for job in jobs if job["id"] not in done]
+    summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "ok": 0, "error": 0, "timeout": 0}
+    print(f"📦 {len(jobs)} jobs, {summary['skipped']} already completed, {len(pending)} to run "
+          f"({workers} {executor} workers, timeout {timeout:g}s)", file=sys.stderr)
+
+    started = time.perf_counter()
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    queue = iter(pending)
+    with pool, open(output_path, "a", encoding="utf-8") as out:
+        in_flight = {}
+        finished = 0
+
+        def write(record):
+            nonlocal finished
+            # 逐行写入并刷新，中断后已完成的结果不会丢失
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary[record["status"]] += 1
+            finished += 1
+            print(f"[{finished}/{len(pending)}] {record['id']}: {record['status']} "
+                  f"({record['seconds']:.1f}s)", file=sys.stderr)
+
+        def submit_next():
+            job = next(queue, None)
+            while job is not None:
+                try:
+                    future = pool.submit(run_job, job, model_config, timeout, factory_path)
+                except Exception as e:
+                    # 进程池已损坏时无法再提交，剩余任务逐个记为失败，下次运行会重试
+                    write({**_new_record(job, "error", str(e) or type(e).__name__), "seconds": 0.0})
+                    job = next(queue, None)
+                    continue
+                in_flight[future] = (job, time.perf_counter())
+                return
+
+        for _ in range(workers * 2):
+            submit_next()
+        while in_flight:
+            ready, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in ready:
+                job, submitted = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # run_job 本身不抛异常；这里是工作进程崩溃（BrokenProcessPool）等池层面的失败
+                    record = {**_new_record(job, "error", str(e) or type(e).__name__),
+                              "seconds": round(time.perf_counter() - submitted, 3)}
+                write(record)
+                submit_next()
+    # 线程池的工作线程已全部空闲，关闭它们的事件循环与连接池（进程池由各进程的终结器关闭）
+    close_worker_loops()
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main():
+    from service import default_model_config
+
+    parser = argparse.ArgumentParser(description="Run the agent graph over a JSONL batch of resumes and queries")
+    parser.add_argument("jobs", help="input JSONL with id, resume and query")
+    parser.add_argument("output", help="output JSONL; existing ok records are skipped")
+    parser.add_argument("--query", action="append", default=[], help="query applied to lines without one; repeatable")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--timeout", type=float, default=BATCH_TIMEOUT, help="seconds per job")
+    parser.add_argument("--model", default=None, help="defaults to SERVICE_MODEL")
+    parser.add_argument("--provider", default=None, help="defaults to SERVICE_MODEL_PROVIDER")
+    parser.add_argument("--graph-factory", default=DEFAULT_GRAPH_FACTORY,
+                        help="module:function returning a compiled async graph (e.g. a stub graph for dry runs)")
+    args = parser.parse_args()
+
+    model_config = default_model_config()
+    if args.model:
+        model_config["model"] = args.model
+    if args.provider:
+        model_config["model_provider"] = args.provider
+
+    jobs = load_jobs(args.jobs, args.query)
+    summary = run_batch(jobs, args.output, model_config, args.workers, args.executor, args.timeout, args.graph_factory)
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return 0 if summary["error"] + summary["timeout"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark: concurrent conversations per process, sync graph on a thread pool vs async graph on one event loop.
+
+Usage:
+    python benchmarks/bench_async_graph.py [--sessions 50 200 1000] [--threads 16] [--latency 0.5]
+
+Agents, the supervisor chain and the ChatBot chain are replaced by stubs that wait
+--latency seconds per call (time.sleep for invoke, asyncio.sleep for ainvoke), standing
+in for LLM and tool round trips. Each session runs one turn through the real graph,
+including local routing, history compaction and compound tasks that call two agents.
+The sync graph runs on a --threads thread pool, the way a threaded server would host
+it; the async graph runs every session on a single event loop.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANALYSIS_STORE_PATH", "")  # 只用内存存储，不写 temp/
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import agents  # noqa: E402
+
+QUERIES = [
+    "分析我的简历并推荐合适岗位及相关职位列表",
+    "为我的简历生成求职信",
+    "阿里的GenAI相关岗位",
+    "识别与GenAI相关的科技行业最新趋势",
+    "字节跳动怎么样",
+    "你好",
+]
+
+
+class StubRunnable:
+    def __init__(self, latency: float, output) -> None:
+        self.latency = latency
+        self.output = output
+
+    def invoke(self, inputs, config=None):
+        time.sleep(self.latency)
+        return self.output
+
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(self.latency)
+        return self.output
+
+
+class StubCallback:
+    def write_agent_name(self, name: str) -> None:
+        pass
+
+
+def install_stubs(latency: float) -> None:
+    agents.get_agent_executor = lambda node, config: StubRunnable(latency, {"output": f"{node} 的回答"})
+    agents.get_shared_supervisor_chain = lambda config: StubRunnable(latency, AIMessage(content="WebResearcher"))
+    agents.get_shared_finish_chain = lambda config: StubRunnable(latency, AIMessage(content="ChatBot 的回答"))
+
+
+def session_input(index: int) -> dict:
+    query = QUERIES[index % len(QUERIES)]
+    return {
+        "messages": [HumanMessage(content=query)],
+        "user_input": query,
+        "config": {"model": "stub", "model_provider": "openai"},
+        "callback": StubCallback(),
+        "resume_path": "",
+        "resume_sha256": "",
+    }
+
+
+# 所有会话同时到达，延迟从到达时刻算起（包含排队等待线程的时间）
+def run_sync(graph, sessions: int, threads: int):
+    peak = [threading.active_count()]
+
+    def one(index):
+        graph.invoke(session_input(index), {"recursion_limit": 15})
+        peak[0] = max(peak[0], threading.active_count())
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(sessions)))
+    return time.perf_counter() - started, latencies, peak[0]
+
+
+async def run_async(graph, sessions: int):
+    peak = [threading.active_count()]
+
+    async def one(index):
+        await graph.ainvoke(session_input(index), {"recursion_limit": 15})
+        peak[0] = max(peak[0], threading.active_count())
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one(index) for index in range(sessions)))
+    return time.perf_counter() - started, latencies, peak[0]
+
+
+def report(label: str, sessions: int, wall: float, latencies: list, threads: int) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<7} {sessions:>8} {wall:>8.2f}s {sessions / wall:>9.1f}/s "
+          f"{statistics.median(latencies):>8.2f}s {p95:>8.2f}s {threads:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    install_stubs(args.latency)
+    sync_graph = agents.define_graph()
+    async_graph = agents.define_graph(use_async=True)
+
+    print(f"{'mode':<7} {'sessions':>8} {'wall':>9} {'throughput':>11} {'p50':>9} {'p95':>9} {'threads':>8}")
+    for sessions in args.sessions:
+        # 节点里的进度打印在并发下没有意义，这里屏蔽
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_result = run_sync(sync_graph, sessions, args.threads)
+            async_result = asyncio.run(run_async(async_graph, sessions))
+        report("sync", sessions, *sync_result)
+        report("async", sessions, *async_result)
+
+
+if __name__ == "__main__":
+    main()
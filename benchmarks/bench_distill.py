@@ -0,0 +1,57 @@
+"""
+Benchmark: token reduction and latency of distill.distill on saved pages.
+
+Usage:
+    python benchmarks/bench_distill.py [--repeat 200] [--max-chars 4000]
+
+Runs the distillation pipeline over the HTML/markdown fixtures in benchmarks/fixtures
+with and without a research question, and reports estimated tokens before/after and
+the time per page.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distill import distill  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+QUERIES = {
+    "careers_acme.md": "machine learning engineer requirements and interview process",
+    "about_shuzhi_cn.md": "公司规模 融资 研发中心",
+    "about_northwind.html": "engineering team tech stack",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-chars", type=int, default=4000)
+    args = parser.parse_args()
+
+    total_before = total_after = 0
+    print(f"{'fixture':<24} {'query':<6} {'tokens':>14} {'reduction':>10} {'boiler':>7} {'dups':>5} {'ms/page':>8}")
+    for name in sorted(QUERIES):
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            page = f.read()
+        for query in ("", QUERIES.get(name, "")):
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = distill(page, query, args.max_chars)
+                samples.append((time.perf_counter() - started) * 1e3)
+            total_before += result["tokens_before"]
+            total_after += result["tokens_after"]
+            print(
+                f"{name:<24} {'yes' if query else 'no':<6} "
+                f"{result['tokens_before']:>6} → {result['tokens_after']:<5} {result['reduction']:>10.0%} "
+                f"{result['boilerplate_removed']:>7} {result['duplicates_removed']:>5} {statistics.median(samples):>8.2f}"
+            )
+    print(f"overall: {total_before} → {total_after} tokens ({1 - total_after / total_before:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
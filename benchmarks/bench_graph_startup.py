@@ -0,0 +1,47 @@
+"""
+Benchmark: graph startup and per-rerun cost with and without the shared compiled graph.
+
+Usage:
+    python benchmarks/bench_graph_startup.py [--reruns 20]
+
+"rerun" mimics what app.py does on every Streamlit rerun: obtain the graph it will invoke.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    import agents
+    import_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    agents.get_graph()
+    first_compile = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(args.reruns):
+        agents.define_graph()
+    rebuild = (time.perf_counter() - started) / args.reruns
+
+    started = time.perf_counter()
+    for _ in range(args.reruns):
+        agents.get_graph()
+    shared = (time.perf_counter() - started) / args.reruns
+
+    print(f"import agents:              {import_seconds * 1e3:10.2f} ms")
+    print(f"first compile (startup):    {first_compile * 1e3:10.2f} ms")
+    print(f"rerun, define_graph():      {rebuild * 1e3:10.3f} ms")
+    print(f"rerun, shared get_graph():  {shared * 1e6:10.3f} us")
+
+
+if __name__ == "__main__":
+    main()
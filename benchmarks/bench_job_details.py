@@ -0,0 +1,109 @@
+"""
+Benchmark: batched job-detail enrichment against a local HTML fixture server.
+
+Usage:
+    python benchmarks/bench_job_details.py [--count 50] [--batch-size 5] [--latency 0.2] [--fail-rate 0.1]
+
+Serves benchmarks/fixtures/linkedin_job.html and career_jsonld.html from a local aiohttp
+server with artificial latency and transient 503s, then compares fetching the details one
+by one with search.fetch_all_jobs and enriching snippet-only postings with
+search.enrich_postings.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search  # noqa: E402
+from postings import JobPosting  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture_app(latency: float, fail_rate: float, seed: int = 3):
+    pages = {}
+    for name in ("linkedin_job.html", "career_jsonld.html"):
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            pages[name] = f.read()
+    rng = random.Random(seed)
+    stats = {"requests": 0, "in_flight": 0, "peak": 0}
+
+    async def job(request):
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak"] = max(stats["peak"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+            if rng.random() < fail_rate:
+                return web.Response(status=503)
+            name = "linkedin_job.html" if int(request.match_info["id"]) % 2 else "career_jsonld.html"
+            return web.Response(text=pages[name], content_type="text/html")
+        finally:
+            stats["in_flight"] -= 1
+
+    app = web.Application()
+    app.router.add_get("/jobs/{id}", job)
+    return app, stats
+
+
+async def run(args):
+    app, stats = fixture_app(args.latency, args.fail_rate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    search.JOB_DETAIL_BASE_URL = f"http://127.0.0.1:{port}/jobs"
+    job_ids = [str(i) for i in range(args.count)]
+
+    try:
+        async with search.aiohttp.ClientSession() as session:
+            started = time.perf_counter()
+            sequential = [await search.fetch_job_details(session, job_id) for job_id in job_ids]
+            sequential_seconds = time.perf_counter() - started
+
+            stats["peak"] = 0
+            started = time.perf_counter()
+            batched = await search.fetch_all_jobs(job_ids, batch_size=args.batch_size, session=session)
+            batched_seconds = time.perf_counter() - started
+            peak = stats["peak"]
+
+            snippets = [
+                JobPosting(
+                    job_title=f"Posting {job_id}",
+                    job_desc_text="Short search snippet...",
+                    apply_link=f"{search.JOB_DETAIL_BASE_URL}/{job_id}",
+                )
+                for job_id in job_ids
+            ]
+            started = time.perf_counter()
+            enriched = await search.enrich_postings(snippets, batch_size=args.batch_size, session=session)
+            enrich_seconds = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    full = sum(p.job_desc_text != "Short search snippet..." for p in enriched)
+    print(f"postings:            {args.count} (latency {args.latency * 1e3:.0f} ms, {args.fail_rate:.0%} transient 503s)")
+    print(f"sequential:          {sequential_seconds:6.2f} s, {sum(1 for d in sequential if d)} parsed")
+    print(f"fetch_all_jobs:      {batched_seconds:6.2f} s, {len(batched)} parsed, peak {peak} in flight")
+    print(f"enrich_postings:     {enrich_seconds:6.2f} s, {full}/{len(enriched)} snippets replaced by full descriptions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: local job index query latency.
+
+Usage:
+    python benchmarks/bench_job_index.py [--count 1000000] [--queries 200] [--path /tmp/job_index_bench.sqlite3]
+
+Builds (or reuses) an index of synthetic postings and reports p50/p95/max latency of
+JobIndex.search for a mix of English, Chinese and location-filtered queries.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_index import JobIndex  # noqa: E402
+from postings import JobPosting  # noqa: E402
+
+ROLES = ["GenAI 工程师", "算法工程师", "Backend Developer", "数据分析师", "LLM Researcher", "前端开发",
+         "Machine Learning Engineer", "嵌入式软件工程师", "产品经理", "C++ Developer"]
+SKILLS = ["Python", "PyTorch", "Kubernetes", "大模型", "推荐系统", "React", "Go", "Spark", "RAG", "C++", "Linux"]
+COMPANIES = ["Alibaba", "Tencent", "ByteDance", "Baidu", "Meituan", "JD", "Huawei", "NetEase", "小米", "蚂蚁集团"]
+CITIES = ["北京", "上海", "深圳", "杭州", "广州", "成都", "Singapore", "Remote"]
+QUERIES = [
+    ("GenAI 工程师", None), ("算法工程师", "北京"), ("machine learning engineer", None),
+    ("大模型 推荐系统", "上海"), ("C++ developer", "深圳"), ("数据分析师", None), ("LLM researcher RAG", None),
+]
+
+
+def synthetic_postings(count: int, start: int = 0, seed: int = 11):
+    rng = random.Random(seed + start)
+    for i in range(start, start + count):
+        role = rng.choice(ROLES)
+        skills = " ".join(rng.sample(SKILLS, 3))
+        company = rng.choice(COMPANIES)
+        yield JobPosting(
+            job_title=f"{role} {i}",
+            company_name=company,
+            job_location=rng.choice(CITIES),
+            job_desc_text=f"{company} 招聘 {role}，要求熟悉 {skills}。",
+            apply_link=f"https://jobs.example.com/{i}",
+            time_posted=f"{rng.randrange(30)} days ago",
+        )
+
+
+def build(index: JobIndex, count: int, start: int, batch: int = 10_000) -> float:
+    started = time.perf_counter()
+    buffer = []
+    for posting in synthetic_postings(count, start):
+        buffer.append(posting)
+        if len(buffer) >= batch:
+            index.add(buffer)
+            buffer = []
+    if buffer:
+        index.add(buffer)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--path", default="/tmp/job_index_bench.sqlite3")
+    args = parser.parse_args()
+
+    index = JobIndex(args.path)
+    existing = index.count()
+    if existing < args.count:
+        seconds = build(index, args.count - existing, existing)
+        print(f"indexed {args.count - existing:,} postings in {seconds:.1f} s")
+    print(f"index size: {index.count():,} postings")
+
+    for listed_at in (None, 7 * 86400):
+        latencies = []
+        for i in range(args.queries):
+            keywords, location = QUERIES[i % len(QUERIES)]
+            started = time.perf_counter()
+            index.search(keywords, location, listed_at, args.limit)
+            latencies.append((time.perf_counter() - started) * 1e3)
+        latencies.sort()
+        print(
+            f"listed_at={listed_at}: p50 {statistics.median(latencies):.2f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, max {latencies[-1]:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
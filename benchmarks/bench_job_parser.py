@@ -0,0 +1,87 @@
+"""
+Benchmark: job-page parsing throughput of job_parser.
+
+Usage:
+    python benchmarks/bench_job_parser.py [--pages 500] [--workers 4]
+
+Parses the saved job-page fixtures (benchmarks/fixtures/linkedin_job.html and
+career_jsonld.html) with the previous BeautifulSoup approach (seven full-tree find()
+scans with html.parser) and with every available job_parser backend, and reports pages
+parsed per second per core. parse_many is also run through the process pool.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import job_parser  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES = ("linkedin_job.html", "career_jsonld.html")
+
+
+def beautifulsoup_baseline(html: str) -> dict:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    finds = (
+        ("job_title", "h2", {"class": "top-card-layout__title font-sans text-lg papabear:text-xl font-bold leading-open text-color-text mb-0 topcard__title"}),
+        ("job_location", "span", {"class": "topcard__flavor topcard__flavor--bullet"}),
+        ("company_name", "a", {"class": "topcard__org-name-link topcard__flavor--black-link"}),
+        ("time_posted", "span", {"class": "posted-time-ago__text topcard__flavor--metadata"}),
+        ("num_applicants", "span", {"class": "num-applicants__caption topcard__flavor--metadata topcard__flavor--bullet"}),
+        ("job_desc_text", "div", {"class": "decorated-job-posting__details"}),
+    )
+    post = {}
+    for field, tag, attrs in finds:
+        element = soup.find(tag, attrs)
+        post[field] = element.text.strip() if element else ""
+    link = soup.find("a", class_="topcard__link")
+    post["apply_link"] = link.get("href") if link else ""
+    return post
+
+
+def throughput(parse, pages: list) -> float:
+    started = time.perf_counter()
+    for page in pages:
+        parse(page)
+    return len(pages) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    fixtures = []
+    for name in FIXTURES:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            fixtures.append(f.read())
+    pages = [fixtures[i % len(fixtures)] for i in range(args.pages)]
+    print(f"pages: {args.pages} ({', '.join(FIXTURES)}), avg {sum(map(len, pages)) // len(pages):,} chars")
+
+    try:
+        baseline = throughput(beautifulsoup_baseline, pages)
+        print(f"{'bs4 7x find() (before)':<28} {baseline:10,.0f} pages/s/core")
+    except ImportError:
+        baseline = None
+        print(f"{'bs4 7x find() (before)':<28} {'not installed':>10}")
+
+    for backend in job_parser.available_backends():
+        rate = throughput(lambda page: job_parser.parse_job_html(page, backend=backend), pages)
+        speedup = f"  ({rate / baseline:.1f}x)" if baseline else ""
+        print(f"{'job_parser ' + backend:<28} {rate:10,.0f} pages/s/core{speedup}")
+
+    if args.workers > 1:
+        job_parser.parse_many(pages[: args.workers], workers=args.workers)  # 预热进程池
+        started = time.perf_counter()
+        job_parser.parse_many(pages, workers=args.workers)
+        rate = args.pages / (time.perf_counter() - started)
+        print(f"{'parse_many, ' + str(args.workers) + ' processes':<28} {rate:10,.0f} pages/s ({rate / args.workers:,.0f} per core)")
+
+
+if __name__ == "__main__":
+    main()
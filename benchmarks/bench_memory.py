@@ -0,0 +1,90 @@
+"""
+Benchmark: prompt history size and modelled time-to-answer as a session grows, with memory.compact_history.
+
+Usage:
+    python benchmarks/bench_memory.py [--turns 12] [--prefill-rate 1500] [--base-latency 0.6]
+
+Replays a synthetic session that cycles through resume analyses, job tables, cover
+letters and research reports of realistic length. For every turn it reports the history
+tokens the supervisor and the answering agent would receive in full and after
+compaction, and a time-to-answer modelled as base latency + prompt tokens / prefill rate
+for the two LLM calls of the turn. The real cost of compact_history itself is measured.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import memory  # noqa: E402
+
+JOB_ROW = "| 大模型算法工程师 | 字节跳动 | 北京 | 86 | PyTorch, RLHF | 负责大模型预训练与对齐，优化训练效率 | https://jobs.example.com/123 | 2 天前 |\n"
+
+# (用户输入, 回答的 Agent, 回复内容)
+SCRIPT = [
+    ("分析我的简历", "ResumeAnalyzer",
+     "## 简历分析报告\n" + "候选人有五年机器学习工程经验，熟悉分布式训练、模型压缩与推理优化。" * 60),
+    ("找北京的大模型算法岗位", "JobSearcher",
+     "## 岗位推荐\n| 职位名称 | 公司 | 地点 | 匹配度 | 匹配技能 | 职位角色(摘要) | 申请网址 | 发布时间 |\n" + JOB_ROW * 25),
+    ("用第 2 个岗位生成中文求职信", "CoverLetterGenerator",
+     "尊敬的招聘负责人：\n" + "我在大规模模型训练和推理优化方面积累了丰富经验，期待加入贵团队。" * 30
+     + "\nHere is the download link: /srv/app/temp/字节跳动_cover_letter.docx"),
+    ("调研字节跳动在 AI Infra 近期布局", "WebResearcher",
+     "## 调研结果\n" + "字节跳动近期在训练集群、推理加速和自研芯片方面持续投入。" * 50),
+    ("谢谢", "ChatBot", "不客气，祝求职顺利！"),
+]
+
+
+def session(turns: int):
+    messages = []
+    for index in range(turns):
+        query, agent, reply = SCRIPT[index % len(SCRIPT)]
+        messages.append(HumanMessage(content=query))
+        yield agent, list(messages)
+        messages.append(AIMessage(content=reply, name=agent))
+
+
+def history_tokens(messages) -> int:
+    return sum(map(memory.message_tokens, messages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--prefill-rate", type=float, default=1500, help="prompt tokens processed per second")
+    parser.add_argument("--base-latency", type=float, default=0.6, help="fixed seconds per LLM call")
+    args = parser.parse_args()
+
+    def time_to_answer(*prompts):
+        return sum(args.base_latency + tokens / args.prefill_rate for tokens in prompts)
+
+    print(f"{'turn':>4} {'agent':<21} {'full':>7} {'compact':>8} {'ttA full':>9} {'ttA compact':>12}")
+    compact_seconds = calls = 0
+    totals = [0, 0, 0.0, 0.0]
+    for turn, (agent, messages) in enumerate(session(args.turns), 1):
+        full = history_tokens(messages)
+        started = time.perf_counter()
+        supervisor = memory.compact_history(messages, "Supervisor")
+        answering = memory.compact_history(messages, agent)
+        compact_seconds += time.perf_counter() - started
+        calls += 2
+        compact_supervisor, compact_agent = history_tokens(supervisor), history_tokens(answering)
+        full_time = time_to_answer(full, full)
+        compact_time = time_to_answer(compact_supervisor, compact_agent)
+        totals[0] += 2 * full
+        totals[1] += compact_supervisor + compact_agent
+        totals[2] += full_time
+        totals[3] += compact_time
+        print(f"{turn:>4} {agent:<21} {full:>7,} {compact_agent:>8,} {full_time:>8.2f}s {compact_time:>11.2f}s")
+
+    print(f"\nprompt history tokens: {totals[0]:,} -> {totals[1]:,} ({1 - totals[1] / totals[0]:.0%} fewer)")
+    print(f"modelled time-to-answer: {totals[2]:.1f}s -> {totals[3]:.1f}s over {args.turns} turns")
+    print(f"compact_history: {compact_seconds / calls * 1e3:.2f} ms per call")
+    print(f"summary sample:\n{memory.compact_history(messages, 'ChatBot')[0].content[:400]}")
+
+
+if __name__ == "__main__":
+    main()
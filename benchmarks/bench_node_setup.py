@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: agent node setup time with and without the executor cache.
+
+Usage:
+    python benchmarks/bench_node_setup.py [--rounds 50]
+
+No network calls are made; an OpenAI client with a dummy key is only constructed.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import AGENT_SPECS, create_agent, get_agent_executor, get_executor_stats  # noqa: E402
+from llms import get_llm_registry  # noqa: E402
+from tools import get_job_search_tool, ResumeExtractorTool  # noqa: E402
+
+CONFIG = {
+    "model": "gpt-4o-mini",
+    "model_provider": "openai",
+    "temperature": 0.3,
+    "DASHSCOPE_API_KEY": "sk-benchmark",
+}
+
+
+def uncached_setup(node: str):
+    # 旧路径：每次都新建 LLM、工具实例、提示模板和 AgentExecutor
+    from langchain_openai import ChatOpenAI
+
+    get_tools, get_prompt = AGENT_SPECS[node]
+    tools = [ResumeExtractorTool() if t.name == "resume_extractor" else t for t in get_tools()]
+    if node == "JobSearcher":
+        tools[0] = get_job_search_tool.__wrapped__()
+    llm = ChatOpenAI(model=CONFIG["model"], api_key=CONFIG["DASHSCOPE_API_KEY"], temperature=0.3)
+    return create_agent(llm, tools, get_prompt())
+
+
+def timed(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'node':<22}{'uncached (ms)':>15}{'cached (ms)':>15}{'speedup':>10}")
+    for node in AGENT_SPECS:
+        before = timed(lambda: uncached_setup(node), args.rounds)
+        get_agent_executor(node, CONFIG)  # 预热
+        after = timed(lambda: get_agent_executor(node, CONFIG), args.rounds)
+        print(f"{node:<22}{before * 1e3:>15.3f}{after * 1e3:>15.4f}{before / max(after, 1e-9):>9.0f}x")
+
+    print("executor cache:", get_executor_stats())
+    print("llm registry:", get_llm_registry().stats())
+
+
+if __name__ == "__main__":
+    main()
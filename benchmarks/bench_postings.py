@@ -0,0 +1,105 @@
+"""
+Benchmark: memory per posting and dedup throughput of postings.JobPosting / PostingMerger.
+
+Usage:
+    python benchmarks/bench_postings.py [--count 100000] [--dup-ratio 0.3]
+
+Synthetic postings include duplicates that differ only by tracking parameters,
+"www." prefixes, case and punctuation, as produced by overlapping query variants.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postings import JobPosting, PostingMerger  # noqa: E402
+
+TITLES = ["GenAI Engineer", "算法工程师", "Backend Developer", "数据分析师", "LLM Researcher", "前端开发"]
+COMPANIES = ["Alibaba", "Tencent", "ByteDance", "Baidu", "Meituan", "JD", "Huawei", "NetEase"]
+
+
+def synthetic_items(count: int, dup_ratio: float, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    unique = int(count * (1 - dup_ratio))
+    items = []
+    for i in range(count):
+        n = i if i < unique else rng.randrange(unique)
+        title = f"{TITLES[n % len(TITLES)]} {n}"
+        company = COMPANIES[n % len(COMPANIES)]
+        link = f"https://www.example.com/jobs/{n}"
+        if i >= unique:
+            # 重复项：大小写/跟踪参数/前缀各不相同
+            title = title.upper() if rng.random() < 0.5 else f"{title}!"
+            link = f"https://example.com/jobs/{n}/?utm_source=serper&trk={i}"
+        items.append(
+            {
+                "title": f"{title} at {company}",
+                "link": link,
+                "snippet": f"Snippet for posting {n} " * 4,
+                "date": f"{n % 30} days ago",
+            }
+        )
+    return items
+
+
+def measure_memory(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dup-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.count, args.dup_ratio)
+
+    # 仅比较记录本身的开销：字段字符串两种方式共享
+    shared = [JobPosting.from_serper_item(item) for item in items]
+    slots_bytes = measure_memory(
+        lambda: [JobPosting(p.job_title, p.company_name, p.job_location, p.job_desc_text, p.apply_link, p.time_posted) for p in shared]
+    )
+    dict_bytes = measure_memory(
+        lambda: [
+            {
+                "job_title": p.job_title,
+                "company_name": p.company_name,
+                "job_location": p.job_location,
+                "job_desc_text": p.job_desc_text,
+                "apply_link": p.apply_link,
+                "time_posted": p.time_posted,
+                "num_applicants": p.num_applicants,
+            }
+            for p in shared
+        ]
+    )
+
+    started = time.perf_counter()
+    postings = [JobPosting.from_serper_item(item) for item in items]
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    merger = PostingMerger().extend(postings)
+    merge_seconds = time.perf_counter() - started
+
+    print(f"postings:                {args.count:,}")
+    print(f"record bytes, __slots__: {slots_bytes / args.count:8.1f} per posting")
+    print(f"record bytes, dict:      {dict_bytes / args.count:8.1f} per posting")
+    print(f"build from Serper items: {args.count / build_seconds:12,.0f} postings/s")
+    print(f"dedup/merge:             {args.count / merge_seconds:12,.0f} postings/s")
+    print(f"unique after dedup:      {len(merger):,} ({merger.duplicates:,} duplicates folded)")
+
+
+if __name__ == "__main__":
+    main()
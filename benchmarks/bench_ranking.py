@@ -0,0 +1,84 @@
+"""
+Benchmark: resume-to-job ranking throughput of ranking.ResumeJobRanker.
+
+Usage:
+    python benchmarks/bench_ranking.py [--count 10000] [--repeat 5]
+
+Ranks synthetic postings against a synthetic resume and reports tokenization,
+vectorization (vocabulary + CSR build), scoring (vectorization plus IDF/cosine) and
+full rank() time separately.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import ResumeJobRanker  # noqa: E402
+
+ROLES = ["GenAI 工程师", "算法工程师", "Backend Developer", "数据分析师", "LLM Researcher", "前端开发",
+         "Machine Learning Engineer", "嵌入式软件工程师", "产品经理", "C++ Developer"]
+SKILLS = ["Python", "PyTorch", "Kubernetes", "大模型", "推荐系统", "React", "Go", "Spark", "RAG", "C++", "Linux",
+          "TensorFlow", "SQL", "Java", "微服务", "数据仓库"]
+COMPANIES = ["Alibaba", "Tencent", "ByteDance", "Baidu", "Meituan", "JD", "Huawei", "NetEase", "小米", "蚂蚁集团"]
+RESUME = (
+    "张三 算法工程师 五年经验。熟悉 Python、PyTorch、大模型微调与 RAG 检索增强生成，"
+    "负责推荐系统召回与排序模型，熟悉 Spark、SQL 与 Linux 环境下的模型部署。"
+)
+
+
+def synthetic_postings(count: int, seed: int = 13) -> list:
+    rng = random.Random(seed)
+    postings = []
+    for i in range(count):
+        role = rng.choice(ROLES)
+        company = rng.choice(COMPANIES)
+        skills = "、".join(rng.sample(SKILLS, 4))
+        postings.append({
+            "job_title": f"{role}",
+            "company_name": company,
+            "job_desc_text": f"{company} 招聘 {role}，要求熟悉 {skills}，有 {rng.randrange(1, 8)} 年以上相关经验。" * 3,
+        })
+    return postings
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    postings = synthetic_postings(args.count)
+    ranker = ResumeJobRanker(RESUME)
+    token_lists = [ranker._posting_tokens(posting) for posting in postings]
+
+    tokenize_ms = timed(lambda: [ranker._posting_tokens(posting) for posting in postings], args.repeat)
+    vocabulary = {token: i for i, token in enumerate(set(ranker.resume_tokens).union(*token_lists))}
+    csr_ms = timed(lambda: ranker._csr(token_lists, vocabulary), args.repeat)
+    score_ms = timed(lambda: ranker._score_tokens(token_lists), args.repeat)
+    rank_ms = timed(lambda: ranker.rank(postings), args.repeat)
+    top = ranker.rank(postings)[0]
+
+    print(f"postings:         {args.count:,}")
+    print(f"tokens:           {sum(map(len, token_lists)):,}")
+    print(f"tokenization:     {tokenize_ms:8.1f} ms")
+    print(f"CSR build:        {csr_ms:8.1f} ms")
+    print(f"scoring:          {score_ms:8.1f} ms (CSR build + IDF + cosine)")
+    print(f"full rank():      {rank_ms:8.1f} ms")
+    print(f"top match:        {top['job_title']} ({top['match_score']}) {top['matched_skills']}")
+
+
+if __name__ == "__main__":
+    main()
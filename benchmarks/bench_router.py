@@ -0,0 +1,77 @@
+"""
+Benchmark: local intent routing coverage, accuracy and latency of router.classify.
+
+Usage:
+    python benchmarks/bench_router.py [--repeat 2000] [--threshold 0.6]
+
+Classifies a labelled set of Chinese and English queries and reports the share that
+would be routed without a supervisor LLM call, the accuracy of those local decisions,
+and the time per classification.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from router import classify  # noqa: E402
+
+# (查询, 期望的 Agent)；期望为 None 表示需要结合上下文，应交给 LLM
+LABELLED = [
+    ("找深圳嵌入式 C++ 驱动开发岗位，偏车规", "JobSearcher"),
+    ("搜索北京的GenAI工程师职位", "JobSearcher"),
+    ("find me machine learning jobs in Singapore", "JobSearcher"),
+    ("继续搜索", "JobSearcher"),
+    ("杭州有哪些大模型招聘", "JobSearcher"),
+    ("用第 2 个岗位生成中文求职信", "CoverLetterGenerator"),
+    ("帮我写一封求职信", "CoverLetterGenerator"),
+    ("write a cover letter for the Google job", "CoverLetterGenerator"),
+    ("分析我的简历", "ResumeAnalyzer"),
+    ("根据我的简历帮我提炼 5 条量化成就", "ResumeAnalyzer"),
+    ("review my resume", "ResumeAnalyzer"),
+    ("调研字节跳动在 AI Infra 近期布局", "WebResearcher"),
+    ("最近大模型行业有什么新闻", "WebResearcher"),
+    ("what's the latest news about OpenAI", "WebResearcher"),
+    ("你好", "ChatBot"),
+    ("谢谢你的帮助", "ChatBot"),
+    ("分析我的简历并写求职信", "ResumeAnalyzer"),
+    ("根据简历推荐岗位", "ResumeAnalyzer"),
+    ("搜索适合我的工作", "ResumeAnalyzer"),
+    ("继续", None),
+    ("字节跳动怎么样", None),
+    ("Python 和 Java 哪个好", None),
+    ("帮我分析一下这个offer", None),
+    ("我想找实习", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    local = correct = 0
+    for query, expected in LABELLED:
+        route = classify(query)
+        routed = bool(route.agent) and route.confidence >= args.threshold
+        local += routed
+        correct += routed and route.agent == expected
+        mark = "local" if routed else "llm"
+        flag = "" if not routed or route.agent == expected else "  <-- mismatch"
+        print(f"{mark:<6} {route.agent or '-':<21} {route.confidence:4.2f}  {query}{flag}")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for query, _ in LABELLED:
+            classify(query)
+    per_query = (time.perf_counter() - started) / (args.repeat * len(LABELLED))
+
+    print(f"\nrouted locally: {local}/{len(LABELLED)} ({local / len(LABELLED):.0%}), "
+          f"accuracy of local decisions: {correct}/{local}")
+    print(f"classify: {per_query * 1e6:.1f} µs per query")
+
+
+if __name__ == "__main__":
+    main()
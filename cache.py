@@ -0,0 +1,354 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe in-memory LRU cache with an optional per-entry TTL.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept before the least recently used one is evicted.
+        ttl (float | None): Default time-to-live in seconds, None for entries that never expire.
+
+    Methods:
+        get(key, default): Return the cached value, or default when missing or expired.
+        set(key, value, ttl): Store a value, evicting the least recently used entry if full.
+        get_or_create(key, factory): Return the cached value, building it once with factory() on a miss.
+        pop(key, default): Remove and return a value.
+        clear(): Drop every entry.
+        stats(): Return hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = None) -> None:
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        # 构建在单独的锁内进行：并发未命中同一个键时只构建一次，且不阻塞其他键的读取
+        with self._build_lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = factory()
+                self.set(key, value)
+            return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    A persistent JSON key-value store backed by a single SQLite file.
+
+    Values are stored together with the time they were written, so callers can apply
+    their own freshness rules. Safe to share between threads of one process.
+
+    Methods:
+        get(key): Return (value, stored_at) or None.
+        set(key, value, stored_at): Store a JSON-serializable value.
+        compare_and_set(key, value, expected_stored_at, stored_at): Replace a value only if it
+            was last written at expected_stored_at; atomic across processes sharing the file.
+        delete(key): Remove a key.
+        purge(older_than): Delete entries written before the given timestamp.
+        len(cache): Return the number of stored entries.
+    """
+
+    def __init__(self, path: str, table: str = "cache") -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value, stored_at: float = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, payload, stored_at),
+            )
+
+    def compare_and_set(self, key: str, value, expected_stored_at: float, stored_at: float = None) -> bool:
+        stored_at = time.time() if stored_at is None else stored_at
+        payload = json.dumps(value, ensure_ascii=False)
+        # 单条 UPDATE 在 SQLite 的写锁内执行，多个进程同时写同一个键时只有一个能成功
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE {self.table} SET value = ?, stored_at = ? WHERE key = ? AND stored_at = ?",
+                (payload, stored_at, key, expected_stored_at),
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def purge(self, older_than: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE stored_at < ?", (older_than,)
+            )
+        return cursor.rowcount
+
+
+class TieredCache:
+    """
+    A TTL cache with an in-memory LRU front and an optional SQLite store behind it.
+
+    Entries younger than ttl are served as hits. Entries older than ttl but younger than
+    ttl + stale_ttl are served immediately while a background thread recomputes them
+    (stale-while-revalidate). Anything older is recomputed synchronously.
+
+    Methods:
+        get_or_compute(key, compute): Return the cached value for key, calling compute() when needed.
+        invalidate(key): Drop a key from both tiers.
+        stats(): Return hit/stale/miss counters, hit rate and bytes saved.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_size: int = 256,
+        store: SQLiteCache = None,
+    ) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.store = store
+        self._memory = LRUCache(max_size=max_size)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, stored_at = stored
+                entry = (value, stored_at, _payload_size(value))
+                self._memory.set(key, entry)
+        return entry
+
+    def _store(self, key: str, value) -> None:
+        stored_at = time.time()
+        self._memory.set(key, (value, stored_at, _payload_size(value)))
+        if self.store is not None:
+            self.store.set(key, value, stored_at)
+
+    async def _alookup(self, key: str):
+        # 内存命中直接返回；只有要读 SQLite 时才放到线程中，避免阻塞事件循环
+        entry = self._memory.get(key)
+        if entry is None and self.store is not None:
+            entry = await asyncio.to_thread(self._lookup, key)
+        return entry
+
+    async def _astore(self, key: str, value) -> None:
+        if self.store is None:
+            self._store(key, value)
+        else:
+            await asyncio.to_thread(self._store, key, value)
+
+    def _count(self, counter: str, size: int = 0) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.bytes_saved += size
+
+    def _revalidate(self, key: str, compute) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._store(key, compute())
+            except Exception as e:
+                print(f"缓存后台刷新失败: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get_or_compute(self, key: str, compute):
+        entry = self._lookup(key)
+        if entry is not None:
+            value, stored_at, size = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self._count("hits", size)
+                return copy.deepcopy(value)
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits", size)
+                self._revalidate(key, compute)
+                return copy.deepcopy(value)
+
+        self._count("misses")
+        value = compute()
+        self._store(key, value)
+        return copy.deepcopy(value)
+
+    async def aget_or_compute(self, key: str, coro_fn):
+        """
+        Async variant of get_or_compute; coro_fn() returns an awaitable producing the value.
+        Stale entries are refreshed in a background task on the running event loop, and
+        SQLite reads and writes run in a worker thread.
+        """
+        entry = await self._alookup(key)
+        if entry is not None:
+            value, stored_at, size = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self._count("hits", size)
+                return copy.deepcopy(value)
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits", size)
+                self._arevalidate(key, coro_fn)
+                return copy.deepcopy(value)
+
+        self._count("misses")
+        value = await coro_fn()
+        await self._astore(key, value)
+        return copy.deepcopy(value)
+
+    def _arevalidate(self, key: str, coro_fn) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def run():
+            try:
+                await self._astore(key, await coro_fn())
+            except Exception as e:
+                print(f"缓存后台刷新失败: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        # 保留任务引用，防止被垃圾回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def invalidate(self, key: str) -> None:
+        self._memory.pop(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.stale_hits
+            total = served + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": served / total if total else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "memory_size": len(self._memory),
+            }
+
+
+def _payload_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
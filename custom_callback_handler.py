@@ -5,12 +5,14 @@ from streamlit.external.langchain.streamlit_callback_handler import (
     LLMThought,
 )
 from langchain.schema import AgentAction
+from streaming import LatencyTracker
 
 
 class CustomStreamlitCallbackHandler(StreamlitCallbackHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.agent_sequence = []  # 记录agent执行顺序
+        self.latency = LatencyTracker()  # 首个 token 与总耗时
         
     def write_agent_name(self, name: str):
         self._parent_container.write(name)
@@ -23,6 +25,22 @@ class CustomStreamlitCallbackHandler(StreamlitCallbackHandler):
     def clear_agent_sequence(self):
         self.agent_sequence = []
         
+    def write_handoff(self, next_agent: str):
+        # Supervisor 完成路由后立即显示交接，不必等下一个 Agent 结束
+        self._parent_container.write(f"🔀 Supervisor → {next_agent}")
+        
+    def start_run(self):
+        self.clear_agent_sequence()
+        self.latency.start()
+        
+    def finish_run(self) -> dict:
+        return self.latency.finish()
+        
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # 仅在模型以 streaming=True 创建时触发；父类负责把 token 逐个写入界面
+        self.latency.on_token(token)
+        return super().on_llm_new_token(token, **kwargs)
+        
     def on_agent_action(self, action: AgentAction, **kwargs: Any) -> Any:
         # 显示agent正在执行的动作
         tool_name = action.tool
@@ -1,7 +1,103 @@
 from docx import Document
 from langchain_community.document_loaders import PyMuPDFLoader
+from cache import LRUCache
+import hashlib
+import json
 import os
 
+# 简历解析缓存：内存 LRU + 磁盘 sidecar，均以 PDF 字节的 SHA-256 为键
+RESUME_CACHE_DIR = os.environ.get("RESUME_CACHE_DIR", os.path.join("temp", ".resume_cache"))
+_parsed_resumes = LRUCache(max_size=64)
+# (路径, 大小, mtime) -> sha256，避免文件未变时重复计算哈希
+_path_digests = LRUCache(max_size=256)
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """
+    Returns the hex SHA-256 of a file, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resume_digest(file_path):
+    """
+    Returns the SHA-256 of a resume file, memoized by (path, size, mtime).
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    digest = _path_digests.get(key)
+    if digest is None:
+        digest = file_sha256(file_path)
+        _path_digests.set(key, digest)
+    return digest
+
+
+def _sidecar_path(digest):
+    return os.path.join(RESUME_CACHE_DIR, f"{digest}.json")
+
+
+def _read_sidecar(digest):
+    try:
+        with open(_sidecar_path(digest), "r", encoding="utf-8") as f:
+            parsed = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # sidecar 内容与文件名不一致时视为失效
+    return parsed if parsed.get("sha256") == digest else None
+
+
+def _write_sidecar(parsed):
+    try:
+        os.makedirs(RESUME_CACHE_DIR, exist_ok=True)
+        path = _sidecar_path(parsed["sha256"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(parsed, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"写入简历解析缓存失败: {e}")
+
+
+def parse_resume(file_path):
+    """
+    Parses a PDF resume, served from the content-hash keyed cache when possible.
+
+    Identical bytes are parsed at most once per cache directory; when the file
+    changes its digest changes too, so stale entries are never returned.
+
+    Returns:
+        dict: {"sha256": str, "text": str, "page_count": int}
+    """
+    digest = resume_digest(file_path)
+
+    parsed = _parsed_resumes.get(digest)
+    if parsed is not None:
+        return parsed
+
+    parsed = _read_sidecar(digest)
+    if parsed is None:
+        loader = PyMuPDFLoader(file_path)
+        pages = loader.load()
+        text = "\n".join(page.page_content for page in pages).strip()
+        parsed = {"sha256": digest, "text": text, "page_count": len(pages)}
+        if text:
+            _write_sidecar(parsed)
+
+    _parsed_resumes.set(digest, parsed)
+    return parsed
+
+
+def get_resume_cache_stats():
+    """
+    Returns hit/miss counters of the in-memory parsed-resume cache.
+    """
+    return _parsed_resumes.stats()
+
+
 def load_resume(file_path):
     """
     简单的简历加载函数
@@ -9,24 +105,19 @@ def load_resume(file_path):
     try:
         if not os.path.exists(file_path):
             return f"文件不存在: {file_path}"
-        
+
         file_size = os.path.getsize(file_path)
         if file_size == 0:
             return "PDF 文件为空"
-        
-        # 使用 PyMuPDFLoader
-        loader = PyMuPDFLoader(file_path)
-        pages = loader.load()
-        
-        content = ""
-        for page in pages:
-            content += page.page_content + "\n"
-        
+
+        # 使用 PyMuPDFLoader（按内容哈希缓存解析结果）
+        content = parse_resume(file_path)["text"]
+
         if content.strip():
             return content.strip()
         else:
             return "PDF 文件内容为空"
-        
+
     except Exception as e:
         return f"读取简历文件时出错: {str(e)}"
 
@@ -37,4 +128,4 @@ def write_cover_letter_to_doc(text, filename="temp/cover_letter.docx"):
         if para.strip():
             doc.add_paragraph(para.strip())
     doc.save(filename)
-    return filename
\ No newline at end of file
+    return filename
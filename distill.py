@@ -0,0 +1,226 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from html.parser import HTMLParser
+
+from textproc import estimate_tokens, normalize, tokenize
+
+# 蒸馏后交给 WebResearcher 的字符预算
+DISTILL_MAX_CHARS = int(os.environ.get("DISTILL_MAX_CHARS", "4000"))
+# 合并相邻段落得到的候选块大小、近重复判定阈值（词集合 Jaccard）与导航块的链接密度上限
+CHUNK_CHARS = 600
+DUPLICATE_THRESHOLD = 0.8
+MAX_LINK_DENSITY = 0.5
+BOILERPLATE_MAX_CHARS = 200
+
+_BOILERPLATE = re.compile(
+    r"cookie|accept all|privacy policy|terms of (?:use|service)|all rights reserved|©|copyright"
+    r"|newsletter|skip to (?:main )?content|back to top|follow us"
+    r"|隐私政策|隐私条款|用户协议|版权所有|返回顶部|关注我们|icp备",
+    re.IGNORECASE,
+)
+# 登录/注册/订阅类字样也常出现在正文里（"log in to the portal to apply"、"注册资本"），
+# 只有整块仅由这些词和分隔符组成时（如 "Sign in | Sign up"、"登录 / 注册"）才算导航
+_ACCOUNT_NAV = re.compile(
+    r"^(?:[\s|/·•,，、>»-]*(?:sign in|sign up|log in|log out|register|subscribe|my account"
+    r"|登录|注册|免费注册|退出|订阅|我的账户))+[\s|/·•,，、>»-]*$",
+    re.IGNORECASE,
+)
+_MD_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+_HEADING = re.compile(r"^#{1,6}\s")
+
+_SKIP_TAGS = {"script", "style", "nav", "footer", "header", "aside", "form", "noscript", "svg", "iframe", "button"}
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr", "br", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+}
+
+_stats = {"pages": 0, "tokens_before": 0, "tokens_after": 0}
+_stats_lock = threading.Lock()
+
+
+class _HTMLText(HTMLParser):
+    # 丢弃脚本、导航、页眉页脚等标签内的文本，块级标签处断段
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+            if tag[0] == "h" and tag[1:].isdigit():
+                self.parts.append("#" * int(tag[1:]) + " ")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Extracts paragraph-separated text from HTML, dropping scripts, navigation, headers and footers.
+    """
+    parser = _HTMLText()
+    parser.feed(html)
+    parser.close()
+    return "".join(parser.parts)
+
+
+def _looks_like_html(text: str) -> bool:
+    head = text.lstrip()[:1000].lower()
+    return head.startswith("<") and ("<html" in head or "<body" in head or "<div" in head or "<!doctype" in head)
+
+
+def _is_boilerplate(block: str) -> bool:
+    linked = sum(len(match.group(0)) for match in _MD_LINK.finditer(block))
+    text = _MD_LINK.sub(r"\1", block).strip()
+    if not tokenize(text):
+        return True
+    # 链接占比高的短块是菜单/面包屑；短块里出现 cookie、版权等字样的是横幅和页脚；
+    # 只有登录/注册等账户入口组成的短块是导航条
+    if len(text) < BOILERPLATE_MAX_CHARS and (
+        linked / len(block) > MAX_LINK_DENSITY or _BOILERPLATE.search(text) or _ACCOUNT_NAV.match(text)
+    ):
+        return True
+    return False
+
+
+def _clean(block: str) -> str:
+    # 图片整体删除，链接只保留锚文本，合并多余空白
+    block = _MD_LINK.sub(r"\1", _MD_IMAGE.sub("", block))
+    return "\n".join(line.strip() for line in block.splitlines() if line.strip())
+
+
+def _chunks(blocks: list) -> list:
+    # 每个标题开启新块，块内相邻段落合并到约 CHUNK_CHARS；标题总是和其后的正文放在同一块
+    chunks, current, size = [], [], 0
+    for block in blocks:
+        body_started = current and not _HEADING.match(current[-1])
+        if body_started and (_HEADING.match(block) or size + len(block) > CHUNK_CHARS):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _select(chunks: list, query_tokens: list, max_chars: int) -> list:
+    if not query_tokens:
+        scores = [0.0] * len(chunks)
+    else:
+        # 以块为文档做 BM25：稀有的查询词权重更高，长块不占便宜
+        chunk_counts = [Counter(tokenize(chunk)) for chunk in chunks]
+        lengths = [sum(counts.values()) for counts in chunk_counts]
+        avg_length = sum(lengths) / len(lengths) or 1.0
+        query = set(query_tokens)
+        df = Counter(token for counts in chunk_counts for token in query if token in counts)
+        idf = {token: math.log(1 + (len(chunks) - df[token] + 0.5) / (df[token] + 0.5)) for token in query}
+        scores = []
+        for counts, length in zip(chunk_counts, lengths):
+            norm = 1.2 * (0.25 + 0.75 * length / avg_length)
+            scores.append(sum(idf[t] * counts[t] * 2.2 / (counts[t] + norm) for t in query if t in counts))
+
+    # 相关块按得分优先、无关块按页面顺序兜底，最后恢复原文顺序输出
+    order = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+    selected, used = [], 0
+    for i in order:
+        if used + len(chunks[i]) > max_chars:
+            if not selected and max_chars > 0:
+                selected.append(i)
+                break
+            continue
+        selected.append(i)
+        used += len(chunks[i]) + 2
+    return sorted(selected)
+
+
+def distill(text: str, query: str = "", max_chars: int = DISTILL_MAX_CHARS) -> dict:
+    """
+    Reduces a scraped page to the passages worth sending to an LLM.
+
+    The pipeline converts HTML to text if needed, drops boilerplate blocks (menus,
+    cookie banners, footers), removes exact and near-duplicate paragraphs, merges the
+    rest into chunks and keeps the chunks most relevant to query (BM25 over the page's
+    own chunks) within max_chars, in page order. Without a query the leading chunks are kept.
+
+    Args:
+        text (str): Markdown, plain text or HTML as returned by FireCrawlClient.scrape.
+        query (str, optional): The question the page should answer.
+        max_chars (int, optional): Character budget of the distilled content.
+
+    Returns:
+        dict: content plus tokens_before, tokens_after, reduction, boilerplate_removed and duplicates_removed.
+    """
+    text = text or ""
+    tokens_before = estimate_tokens(text)
+    if _looks_like_html(text):
+        text = html_to_text(text)
+
+    blocks, boilerplate, duplicates = [], 0, 0
+    seen_exact, seen_sets = set(), []
+    for raw in _BLANK_LINES.split(text):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if _is_boilerplate(raw):
+            boilerplate += 1
+            continue
+        block = _clean(raw)
+        key = normalize(re.sub(r"\W+", "", block))
+        tokens = set(tokenize(block))
+        if not block or key in seen_exact:
+            duplicates += 1
+            continue
+        if len(tokens) >= 5 and any(
+            len(tokens & other) >= DUPLICATE_THRESHOLD * len(tokens | other) for other in seen_sets
+        ):
+            duplicates += 1
+            continue
+        seen_exact.add(key)
+        if len(tokens) >= 5:
+            seen_sets.append(tokens)
+        blocks.append(block)
+
+    chunks = _chunks(blocks)
+    selected = _select(chunks, tokenize(query or ""), max_chars)
+    content = "\n\n".join(chunks[i] for i in selected)[:max_chars]
+
+    tokens_after = estimate_tokens(content)
+    with _stats_lock:
+        _stats["pages"] += 1
+        _stats["tokens_before"] += tokens_before
+        _stats["tokens_after"] += tokens_after
+    return {
+        "content": content,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "reduction": 1 - tokens_after / tokens_before if tokens_before else 0.0,
+        "boilerplate_removed": boilerplate,
+        "duplicates_removed": duplicates,
+    }
+
+
+def get_distill_stats() -> dict:
+    """
+    Returns pages distilled and total estimated tokens before/after distillation.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    before = stats["tokens_before"]
+    stats["reduction"] = 1 - stats["tokens_after"] / before if before else 0.0
+    return stats
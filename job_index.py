@@ -0,0 +1,293 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from cache import LRUCache
+from postings import JobPosting
+from textproc import tokenize
+
+JOB_INDEX_PATH = os.environ.get("JOB_INDEX_PATH", os.path.join("temp", "job_index.sqlite3"))
+# 每次查询参与 BM25 排序的最新命中数
+JOB_INDEX_CANDIDATES = int(os.environ.get("JOB_INDEX_CANDIDATES", "100"))
+# BM25 参数与列权重（标题 > 公司 > 地点 > 描述）
+BM25_K1 = 1.2
+BM25_B = 0.75
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_RELATIVE_TIME = re.compile(
+    r"(\d+)\s*(minute|min|hour|hr|day|week|month|分钟|小时|天|周|星期|个月|月)s?\s*(?:ago|前)?",
+    re.IGNORECASE,
+)
+_UNIT_SECONDS = {
+    "minute": 60, "min": 60, "分钟": 60,
+    "hour": 3600, "hr": 3600, "小时": 3600,
+    "day": 86400, "天": 86400,
+    "week": 7 * 86400, "周": 7 * 86400, "星期": 7 * 86400,
+    "month": 30 * 86400, "个月": 30 * 86400, "月": 30 * 86400,
+}
+
+
+def estimate_posted_at(time_posted: str, now: float = None):
+    """
+    Estimates a posting timestamp from relative strings such as "3 days ago" or "2天前".
+
+    Returns:
+        float | None: Epoch seconds, or None when the string cannot be interpreted.
+    """
+    now = time.time() if now is None else now
+    text = (time_posted or "").strip().lower()
+    if not text:
+        return None
+    if text in ("just now", "today", "刚刚", "今天"):
+        return now
+    if text in ("yesterday", "昨天"):
+        return now - 86400
+    match = _RELATIVE_TIME.search(text)
+    if match:
+        return now - int(match.group(1)) * _UNIT_SECONDS[match.group(2).lower()]
+    return None
+
+
+def _match_expression(tokens: list, operator: str) -> str:
+    return f" {operator} ".join('"{}"'.format(token.replace('"', '""')) for token in tokens)
+
+
+class JobIndex:
+    """
+    A persistent, incrementally updated full-text index of every job posting ever fetched.
+
+    Postings are stored in SQLite with an FTS5 table over pre-tokenized text (see
+    textproc.tokenize, so Chinese titles are searchable by bigram). A query takes the
+    newest `candidates` matches and ranks them with BM25 using cached document
+    frequencies, which keeps latency flat as the index grows.
+    Each posting keeps first_seen/last_seen and an estimated posted_at so listed_at
+    filters can be answered locally.
+
+    Methods:
+        add(postings): Upsert postings, deduplicated by canonical URL or title/company fingerprint.
+        search(keywords, location_name, listed_at, limit): Return the best matching postings.
+        count(): Return the number of indexed postings.
+    """
+
+    def __init__(self, path: str = JOB_INDEX_PATH, candidates: int = JOB_INDEX_CANDIDATES) -> None:
+        self.candidates = candidates
+        self._idf_cache = LRUCache(max_size=4096, ttl=600)
+        self._total = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "id INTEGER PRIMARY KEY, url_key TEXT, fingerprint TEXT NOT NULL, data TEXT NOT NULL, "
+                "posted_at REAL NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_url ON postings (url_key)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_fp ON postings (fingerprint)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_posted ON postings (posted_at)")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5("
+                "title, company, location, body, tokenize = \"unicode61 tokenchars '+#.-'\")"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS postings_vocab USING fts5vocab(postings_fts, 'row')"
+            )
+
+    @staticmethod
+    def _fts_row(posting: JobPosting) -> tuple:
+        return (
+            " ".join(tokenize(posting.job_title)),
+            " ".join(tokenize(posting.company_name)),
+            " ".join(tokenize(posting.job_location)),
+            " ".join(tokenize(posting.job_desc_text)),
+        )
+
+    def add(self, postings) -> int:
+        """
+        Upserts postings into the index in one transaction.
+
+        Returns:
+            int: Number of postings that were not indexed before.
+        """
+        now = time.time()
+        added = 0
+        with self._lock, self._conn:
+            for posting in postings:
+                if isinstance(posting, dict):
+                    posting = JobPosting.from_dict(posting)
+                url_key = posting.url_key or None
+                row = self._conn.execute(
+                    "SELECT id, data, posted_at FROM postings WHERE url_key = ? OR fingerprint = ? LIMIT 1",
+                    (url_key, posting.fingerprint or None),
+                ).fetchone()
+                posted_at = estimate_posted_at(posting.time_posted, now)
+
+                if row is None:
+                    cursor = self._conn.execute(
+                        "INSERT INTO postings (url_key, fingerprint, data, posted_at, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (url_key, posting.fingerprint, json.dumps(posting.to_dict(), ensure_ascii=False),
+                         posted_at or now, now, now),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO postings_fts (rowid, title, company, location, body) VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, *self._fts_row(posting)),
+                    )
+                    added += 1
+                    if self._total is not None:
+                        self._total += 1
+                    continue
+
+                row_id, data, old_posted_at = row
+                merged = JobPosting.from_dict(json.loads(data)).merge(posting)
+                self._conn.execute(
+                    "UPDATE postings SET data = ?, last_seen = ?, posted_at = ?, url_key = COALESCE(url_key, ?) "
+                    "WHERE id = ?",
+                    (json.dumps(merged.to_dict(), ensure_ascii=False), now,
+                     posted_at or old_posted_at, url_key, row_id),
+                )
+                self._conn.execute("DELETE FROM postings_fts WHERE rowid = ?", (row_id,))
+                self._conn.execute(
+                    "INSERT INTO postings_fts (rowid, title, company, location, body) VALUES (?, ?, ?, ?, ?)",
+                    (row_id, *self._fts_row(merged)),
+                )
+        return added
+
+    def _idf(self, term: str) -> float:
+        # 文档频率变化缓慢，按词缓存，避免每次查询都扫描整条倒排表
+        idf = self._idf_cache.get(term)
+        if idf is None:
+            if self._total is None:
+                self._total = self.count()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT doc FROM postings_vocab WHERE term = ?", (term,)
+                ).fetchone()
+            df = row[0] if row else 0
+            idf = math.log(1 + (self._total - df + 0.5) / (df + 0.5))
+            self._idf_cache.set(term, idf)
+        return idf
+
+    def _query(self, expression: str, tokens: list, min_posted_at: float, limit: int) -> list:
+        # FTS5 按 rowid 倒序遍历倒排表时只需走到凑满候选集为止，耗时与索引总量无关；
+        # 候选集（最新的匹配）再在 Python 中按 BM25 排序
+        sql = (
+            "SELECT f.title, f.company, f.location, f.body, p.data FROM postings_fts f "
+            "JOIN postings p ON p.id = f.rowid "
+            "WHERE postings_fts MATCH ? AND p.posted_at >= ? ORDER BY f.rowid DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (expression, min_posted_at, self.candidates)).fetchall()
+        if not rows:
+            return []
+
+        idf = {token: self._idf(token) for token in tokens}
+        documents = []
+        for *columns, data in rows:
+            counts, length = {}, 0.0
+            for weight, text in zip(COLUMN_WEIGHTS, columns):
+                terms = text.split()
+                length += weight * len(terms)
+                for term in terms:
+                    if term in idf:
+                        counts[term] = counts.get(term, 0.0) + weight
+            documents.append((counts, length, data))
+
+        avg_length = sum(length for _, length, _ in documents) / len(documents) or 1.0
+        scored = []
+        for counts, length, data in documents:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            score = sum(idf[term] * tf * (BM25_K1 + 1) / (tf + norm) for term, tf in counts.items())
+            scored.append((score, data))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [json.loads(data) for _, data in scored[:limit]]
+
+    def search(self, keywords: str, location_name: str = None, listed_at=None, limit: int = 10,
+               relax: bool = True) -> list:
+        """
+        Searches the index with BM25, weighting title over company, location and description.
+
+        All keyword tokens are required first; if that yields fewer than limit postings and
+        relax is true, the query is relaxed to any token. location_name restricts the location column and
+        listed_at (seconds) restricts the estimated posting time.
+
+        Returns:
+            list[dict]: Postings in the JobPosting.to_dict shape, best match first.
+        """
+        tokens = list(dict.fromkeys(tokenize(keywords)))
+        if not tokens:
+            return []
+        try:
+            min_posted_at = time.time() - float(listed_at) if listed_at else 0.0
+        except (TypeError, ValueError):
+            min_posted_at = 0.0
+
+        location_filter = ""
+        location_tokens = list(dict.fromkeys(tokenize(location_name or "")))
+        if location_tokens:
+            location_filter = f" AND location : ({_match_expression(location_tokens, 'OR')})"
+
+        results = self._query(f"({_match_expression(tokens, 'AND')}){location_filter}", tokens, min_posted_at, limit)
+        if relax and len(results) < limit and len(tokens) > 1:
+            seen = {row.get("apply_link") or row.get("job_title") for row in results}
+            relaxed = self._query(f"({_match_expression(tokens, 'OR')}){location_filter}", tokens, min_posted_at, limit)
+            results += [row for row in relaxed if (row.get("apply_link") or row.get("job_title")) not in seen]
+        return results[:limit]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_job_index():
+    """
+    Returns the process-wide job index, or None when JOB_INDEX_PATH is empty.
+    """
+    global _index
+    if not JOB_INDEX_PATH:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex(JOB_INDEX_PATH)
+    return _index
+
+
+def index_postings(postings) -> None:
+    """
+    Feeds fetched postings into the local index; failures never break the caller.
+    """
+    index = get_job_index()
+    if index is None:
+        return
+    try:
+        index.add(postings)
+    except sqlite3.Error as e:
+        print(f"写入本地职位索引失败: {e}")
+
+
+def search_local_jobs(keywords: str, location_name: str = None, listed_at=None, limit: int = 10,
+                      relax: bool = True) -> list:
+    """
+    Answers a job search from the local index; returns [] when the index is disabled or fails.
+    """
+    index = get_job_index()
+    if index is None:
+        return []
+    try:
+        return index.search(keywords, location_name, listed_at, limit, relax)
+    except sqlite3.Error as e:
+        print(f"查询本地职位索引失败: {e}")
+        return []
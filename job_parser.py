@@ -0,0 +1,328 @@
+import asyncio
+import html as html_lib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree as _lxml_etree, html as _lxml_html
+except ImportError:  # pragma: no cover - 可选后端
+    _lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:  # pragma: no cover - 可选后端
+    _SelectolaxParser = None
+
+# 解析后端：auto 依次尝试 selectolax、lxml，最后回退到标准库单遍解析器
+JOB_PARSER_BACKEND = os.environ.get("JOB_PARSER_BACKEND", "auto")
+# 解析进程数：0 表示在线程中解析；批量不足 PARSE_POOL_MIN_BATCH 时不值得跨进程
+JOB_PARSER_WORKERS = int(os.environ.get("JOB_PARSER_WORKERS", "0"))
+PARSE_POOL_MIN_BATCH = 8
+FEED_CHUNK_CHARS = 16384
+
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+
+class _Selector:
+    # 标签名 + 必须包含的 class 集合；同一份定义编译成各后端的选择器
+    __slots__ = ("field", "tag", "classes", "attr", "css", "xpath")
+
+    def __init__(self, field: str, tag: str, classes: tuple, attr: str = None) -> None:
+        self.field = field
+        self.tag = tag
+        self.classes = frozenset(classes)
+        self.attr = attr
+        self.css = tag + "".join(f".{name}" for name in classes)
+        self.xpath = None
+        if _lxml_html is not None:
+            conditions = "".join(
+                f'[contains(concat(" ", normalize-space(@class), " "), " {name} ")]' for name in classes
+            )
+            self.xpath = _lxml_etree.XPath(f"(//{tag}{conditions})[1]")
+
+
+SELECTORS = (
+    _Selector("job_title", "h2", ("topcard__title",)),
+    _Selector("job_location", "span", ("topcard__flavor", "topcard__flavor--bullet")),
+    _Selector("company_name", "a", ("topcard__org-name-link",)),
+    _Selector("time_posted", "span", ("posted-time-ago__text",)),
+    _Selector("num_applicants", "span", ("num-applicants__caption",)),
+    _Selector("job_desc_text", "div", ("decorated-job-posting__details",)),
+    _Selector("apply_link", "a", ("topcard__link",), attr="href"),
+)
+FIELDS = tuple(dict.fromkeys(selector.field for selector in SELECTORS))
+_SELECTORS_BY_TAG = {}
+for _selector in SELECTORS:
+    _SELECTORS_BY_TAG.setdefault(_selector.tag, []).append(_selector)
+
+
+class _SinglePassParser(HTMLParser):
+    """
+    Collects every selector's match in one pass over the document.
+
+    Each start tag is checked only against the selectors for that tag name; matched
+    elements capture their text until the corresponding end tag. Parsing stops as soon
+    as every field is filled.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.fields = {}
+        self.json_ld = []
+        self._pending = {tag: list(selectors) for tag, selectors in _SELECTORS_BY_TAG.items()}
+        self._remaining = len(SELECTORS)
+        self._captures = []
+        self._script = None
+
+    @property
+    def done(self) -> bool:
+        return not self._remaining and not self._captures
+
+    def handle_starttag(self, tag, attrs):
+        for capture in self._captures:
+            if capture[1] == tag:
+                capture[2] += 1
+        if tag == "script":
+            if any(name == "type" and value == "application/ld+json" for name, value in attrs):
+                self._script = []
+            return
+        pending = self._pending.get(tag)
+        if not pending:
+            return
+        attributes = dict(attrs)
+        classes = set((attributes.get("class") or "").split())
+        for selector in list(pending):
+            if selector.classes <= classes:
+                pending.remove(selector)
+                self._remaining -= 1
+                if selector.attr:
+                    self.fields[selector.field] = attributes.get(selector.attr) or ""
+                else:
+                    self._captures.append([selector.field, tag, 1, []])
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            self.json_ld.append("".join(self._script))
+            self._script = None
+            return
+        for capture in list(self._captures):
+            if capture[1] == tag:
+                capture[2] -= 1
+                if capture[2] == 0:
+                    self.fields[capture[0]] = "".join(capture[3]).strip()
+                    self._captures.remove(capture)
+
+    def close(self):
+        super().close()
+        # 页面被截断、元素未闭合就结束时，提交尚未结束的捕获，与 lxml/selectolax 的容错结果一致
+        for field, _, _, parts in self._captures:
+            self.fields[field] = "".join(parts).strip()
+        self._captures = []
+        if self._script is not None:
+            self.json_ld.append("".join(self._script))
+            self._script = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+        for capture in self._captures:
+            capture[3].append(data)
+
+
+def _parse_stdlib(html: str):
+    parser = _SinglePassParser()
+    # 分块喂入，所有字段到齐后不再解析剩余文档
+    for start in range(0, len(html), FEED_CHUNK_CHARS):
+        parser.feed(html[start:start + FEED_CHUNK_CHARS])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.fields, parser.json_ld
+
+
+def _parse_lxml(html: str):
+    try:
+        document = _lxml_html.fromstring(html)
+    except _lxml_etree.ParserError:
+        # 只有注释、处理指令或控制字符的页面在 lxml 看来是空文档
+        return {}, []
+    fields = {}
+    for selector in SELECTORS:
+        found = selector.xpath(document)
+        if found:
+            element = found[0]
+            fields[selector.field] = (
+                element.get(selector.attr) or "" if selector.attr else "".join(element.itertext()).strip()
+            )
+    json_ld = [script.text or "" for script in document.iter("script") if script.get("type") == "application/ld+json"]
+    return fields, json_ld
+
+
+def _parse_selectolax(html: str):
+    tree = _SelectolaxParser(html)
+    fields = {}
+    for selector in SELECTORS:
+        node = tree.css_first(selector.css)
+        if node is not None:
+            fields[selector.field] = (
+                node.attributes.get(selector.attr) or "" if selector.attr else node.text(deep=True).strip()
+            )
+    json_ld = [node.text(deep=True) for node in tree.css('script[type="application/ld+json"]')]
+    return fields, json_ld
+
+
+_BACKENDS = {"html.parser": _parse_stdlib}
+if _lxml_html is not None:
+    _BACKENDS["lxml"] = _parse_lxml
+if _SelectolaxParser is not None:
+    _BACKENDS["selectolax"] = _parse_selectolax
+
+
+def available_backends() -> list:
+    """
+    Returns the parsing backends usable in this environment, fastest first.
+    """
+    return [name for name in ("selectolax", "lxml", "html.parser") if name in _BACKENDS]
+
+
+def _resolve_backend(backend: str = None):
+    backend = backend or JOB_PARSER_BACKEND
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown or unavailable job parser backend: {backend} (available: {available_backends()})")
+    return _BACKENDS[backend]
+
+
+def _html_text(fragment) -> str:
+    if not isinstance(fragment, str):
+        return ""
+    return _SPACES.sub(" ", html_lib.unescape(_TAGS.sub(" ", fragment))).strip()
+
+
+def _json_ld_items(data):
+    # JSON-LD 可以是对象、对象数组或带 @graph 的对象；标量和非对象元素直接跳过
+    for item in data if isinstance(data, list) else [data]:
+        if not isinstance(item, dict):
+            continue
+        graph = item.get("@graph")
+        if isinstance(graph, list):
+            yield from (node for node in graph if isinstance(node, dict))
+        elif graph is None:
+            yield item
+
+
+def _json_ld_posting(scripts: list) -> dict:
+    # 大多数招聘网站在 <script type="application/ld+json"> 中按 schema.org/JobPosting 给出结构化数据
+    for script in scripts:
+        try:
+            data = json.loads(script)
+        except ValueError:
+            continue
+        for item in _json_ld_items(data):
+            if item.get("@type") == "JobPosting":
+                return item
+    return {}
+
+
+def _apply_json_ld(fields: dict, scripts: list) -> None:
+    structured = _json_ld_posting(scripts)
+    if not structured:
+        return
+    organization = structured.get("hiringOrganization") or {}
+    location = structured.get("jobLocation") or {}
+    if isinstance(location, list):
+        location = location[0] if location else {}
+    address = location.get("address") or {} if isinstance(location, dict) else {}
+    fallback = {
+        "job_title": structured.get("title", ""),
+        "company_name": organization.get("name", "") if isinstance(organization, dict) else str(organization),
+        "job_location": address.get("addressLocality", "") if isinstance(address, dict) else str(address),
+        "time_posted": structured.get("datePosted", ""),
+        "job_desc_text": _html_text(structured.get("description")),
+        "apply_link": structured.get("url", ""),
+    }
+    for name, value in fallback.items():
+        if not fields.get(name) and value:
+            fields[name] = value
+
+
+def parse_job_html(html: str, url: str = "", backend: str = None) -> dict:
+    """
+    Extracts job details from a LinkedIn guest job page or any page with schema.org JobPosting data.
+
+    Args:
+        html (str): The page source.
+        url (str, optional): Used as apply_link when the page does not provide one.
+        backend (str, optional): "selectolax", "lxml" or "html.parser"; defaults to JOB_PARSER_BACKEND.
+
+    Returns:
+        dict: Every field in FIELDS; fields that cannot be found are empty strings.
+            A blank page yields empty fields with every backend.
+    """
+    parse = _resolve_backend(backend)
+    fields, json_ld = parse(html) if html and html.strip() else ({}, [])
+    if json_ld and not all(fields.get(name) for name in FIELDS):
+        _apply_json_ld(fields, json_ld)
+    parsed = {name: fields.get(name, "") for name in FIELDS}
+    if not parsed["apply_link"]:
+        parsed["apply_link"] = url
+    return parsed
+
+
+def _parse_page(page, backend: str = None) -> dict:
+    if isinstance(page, (tuple, list)):
+        return parse_job_html(page[0], page[1], backend)
+    return parse_job_html(page, "", backend)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool(workers: int = None):
+    """
+    Returns the process-wide parsing pool, created on first use with JOB_PARSER_WORKERS processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers or JOB_PARSER_WORKERS or os.cpu_count())
+    return _pool
+
+
+def parse_many(pages, backend: str = None, workers: int = None) -> list:
+    """
+    Parses a batch of pages, in a process pool when the batch is large enough.
+
+    Args:
+        pages (list): HTML strings or (html, url) pairs.
+        backend (str, optional): See parse_job_html.
+        workers (int, optional): Process count; defaults to JOB_PARSER_WORKERS (0 parses in-process).
+
+    Returns:
+        list[dict]: Parsed postings in input order.
+    """
+    pages = list(pages)
+    workers = JOB_PARSER_WORKERS if workers is None else workers
+    if workers <= 0 or len(pages) < PARSE_POOL_MIN_BATCH:
+        return [_parse_page(page, backend) for page in pages]
+    chunksize = max(1, len(pages) // (workers * 4))
+    return list(get_parse_pool(workers).map(_parse_page, pages, [backend] * len(pages), chunksize=chunksize))
+
+
+async def parse_job_html_async(html: str, url: str = "", backend: str = None) -> dict:
+    """
+    Parses a page without blocking the event loop: in the process pool when JOB_PARSER_WORKERS > 0,
+    otherwise in a worker thread.
+    """
+    if JOB_PARSER_WORKERS > 0:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_parse_pool(), parse_job_html, html, url, backend)
+    return await asyncio.to_thread(parse_job_html, html, url, backend)
@@ -1,48 +1,208 @@
 from langchain_community.chat_models import ChatTongyi
 from langchain_openai import ChatOpenAI
+from collections import OrderedDict
+import asyncio
+import hashlib
 import os
+import threading
+import time
+import weakref
 
-def get_llm(provider="tongyi", model="qwen-turbo", **kwargs):
+import httpx
+
+# 注册表容量：超过后按 LRU 淘汰最久未使用的客户端
+LLM_REGISTRY_MAX_SIZE = int(os.environ.get("LLM_REGISTRY_MAX_SIZE", "16"))
+
+
+def key_fingerprint(api_key) -> str:
     """
-    Returns an instance of the specified chat model provider with tool support.
+    Returns a short, non-reversible fingerprint of an API key for use in cache keys.
     """
-    #print(f"创建 LLM: provider={provider}, model={model}")
-    
+    if not api_key:
+        return ""
+    return hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()[:12]
+
+
+class LLMRegistry:
+    """
+    A bounded, thread-safe, process-wide registry of chat model clients.
+
+    Clients are keyed by (provider, model, temperature, streaming, key fingerprint), so every
+    node, turn and Streamlit session asking for the same configuration shares one instance and
+    therefore one HTTP connection pool.
+
+    Methods:
+        get_or_create(key, factory): Return the cached client for key, building it with factory on a miss.
+        stats(): Return hit/miss/eviction counters and the estimated construction time saved.
+        clear(): Drop every cached client and reset the counters.
+    """
+
+    def __init__(self, max_size: int = LLM_REGISTRY_MAX_SIZE) -> None:
+        self.max_size = max(1, max_size)
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._build_seconds = 0.0
+
+    def get_or_create(self, key: tuple, factory):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return client
+
+            started = time.perf_counter()
+            client = factory()
+            self._build_seconds += time.perf_counter() - started
+            self.misses += 1
+
+            self._clients[key] = client
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg_build = self._build_seconds / self.misses if self.misses else 0.0
+            total = self.hits + self.misses
+            return {
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "avg_build_seconds": avg_build,
+                # 命中即省下一次客户端构建（以及首个请求上的 TLS 握手）
+                "saved_build_seconds": avg_build * self.hits,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self.hits = self.misses = self.evictions = 0
+            self._build_seconds = 0.0
+
+
+_registry = LLMRegistry()
+
+# OpenAI 兼容客户端共享同一个 httpx 连接池（keep-alive），跨节点、跨会话复用
+_http_client = None
+_http_async_client = None
+_http_lock = threading.Lock()
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=16)
+
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    An async transport that keeps one connection pool per running event loop.
+
+    Pooled connections are bound to the loop that opened them, so a single pool shared by
+    every ChatOpenAI breaks as soon as a second loop (another asyncio.run, a batch worker)
+    reuses it. Like utils.get_http_session, each loop gets its own pool.
+    """
+
+    def __init__(self) -> None:
+        self._transports = weakref.WeakKeyDictionary()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=_HTTP_LIMITS)
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def _get_http_clients():
+    global _http_client, _http_async_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_HTTP_LIMITS, timeout=60.0)
+            _http_async_client = httpx.AsyncClient(transport=_LoopLocalTransport(), timeout=60.0)
+    return _http_client, _http_async_client
+
+
+def get_llm_registry() -> LLMRegistry:
+    """
+    Returns the process-wide LLM client registry.
+    """
+    return _registry
+
+
+def get_llm_stats() -> dict:
+    """
+    Returns hit/miss counters of the process-wide LLM client registry.
+    """
+    return _registry.stats()
+
+
+def _build_llm(provider, model, api_key, temperature, streaming):
     if provider == "tongyi":
-        api_key = kwargs.get("api_key") or os.environ.get("DASHSCOPE_API_KEY")
         if not api_key:
             raise ValueError("DASHSCOPE_API_KEY 未设置")
-        
+
         # 通义千问模型支持工具调用
-        llm = ChatTongyi(
+        return ChatTongyi(
             model_name=model,
             dashscope_api_key=api_key,
-            temperature=kwargs.get("temperature", 0.3),
-            streaming=kwargs.get("streaming", False),
+            temperature=temperature,
+            streaming=streaming,
         )
-        
-        # 验证模型是否支持工具调用
-        # if hasattr(llm, 'bind_tools'):
-        #     print(f"✅ {model} 支持工具调用")
-        # else:
-        #     print(f"⚠️ {model} 可能不支持工具调用，将使用基础模式")
-            
-        return llm
-    
+
     elif provider == "openai":
         # 备用 OpenAI 模型
-        api_key = kwargs.get("api_key") or os.environ.get("OPENAI_API_KEY")
+        http_client, http_async_client = _get_http_clients()
         return ChatOpenAI(
             model=model,
             api_key=api_key,
-            temperature=kwargs.get("temperature", 0.3),
-            streaming=kwargs.get("streaming", False),
+            temperature=temperature,
+            streaming=streaming,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
-    
+
     else:
         # 默认返回通义千问
         return ChatTongyi(
             model_name="qwen-turbo",
-            dashscope_api_key=kwargs.get("api_key"),
-            temperature=kwargs.get("temperature", 0.3),
-        )
\ No newline at end of file
+            dashscope_api_key=api_key,
+            temperature=temperature,
+        )
+
+
+def get_llm(provider="tongyi", model="qwen-turbo", **kwargs):
+    """
+    Returns an instance of the specified chat model provider with tool support.
+
+    Instances are served from the process-wide registry, so identical configurations
+    share one client (and its connection pool) across nodes, turns and sessions.
+    """
+    if provider == "tongyi":
+        api_key = kwargs.get("api_key") or os.environ.get("DASHSCOPE_API_KEY")
+        if not api_key:
+            raise ValueError("DASHSCOPE_API_KEY 未设置")
+    elif provider == "openai":
+        api_key = kwargs.get("api_key") or os.environ.get("OPENAI_API_KEY")
+    else:
+        api_key = kwargs.get("api_key")
+        model = "qwen-turbo"
+
+    temperature = kwargs.get("temperature", 0.3)
+    streaming = kwargs.get("streaming", False) if provider in ("tongyi", "openai") else False
+
+    key = (provider, model, temperature, streaming, key_fingerprint(api_key))
+    return _registry.get_or_create(
+        key, lambda: _build_llm(provider, model, api_key, temperature, streaming)
+    )
@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from textproc import estimate_tokens
+
+# 原样保留的最近轮数（一轮 = 一条用户消息 + 其后的 Agent 回复）
+MEMORY_WINDOW_TURNS = int(os.environ.get("MEMORY_WINDOW_TURNS", "3"))
+# 各 Agent 每次调用可用的历史消息 token 预算（估算值，不含系统提示词和工具输出）
+AGENT_TOKEN_BUDGETS = {
+    "Supervisor": 1500,
+    "ResumeAnalyzer": 2500,
+    "JobSearcher": 3000,
+    "CoverLetterGenerator": 4000,
+    "WebResearcher": 3000,
+    "ChatBot": 3000,
+}
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("MEMORY_TOKEN_BUDGET", "3000"))
+# 滚动摘要的上限和每条摘要的长度
+SUMMARY_MAX_TOKENS = 600
+SUMMARY_LINE_CHARS = 120
+TRUNCATED_MARK = "\n…（内容过长，已截断）"
+
+# 回复中提到的已保存文件（求职信等），折叠时以引用的形式保留
+_ARTIFACT = re.compile(r"[\w./\\:-]+\.(?:docx|pdf|md)\b")
+_MARKDOWN = re.compile(r"^[#>*\-|\s]+")
+
+
+def message_tokens(message) -> int:
+    """
+    Estimated tokens of one chat message, including a small per-message overhead.
+    """
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return estimate_tokens(content) + 4
+
+
+def split_turns(messages) -> list:
+    """
+    Groups messages into turns, each starting with a human message.
+    Leading non-human messages form a turn of their own.
+    """
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _first_line(text: str) -> str:
+    for line in text.splitlines():
+        line = _MARKDOWN.sub("", line).strip()
+        if line:
+            return line[:SUMMARY_LINE_CHARS]
+    return ""
+
+
+def _summarize_turn(turn) -> list:
+    lines = []
+    for message in turn:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            lines.append(f"- 用户: {content.strip()[:SUMMARY_LINE_CHARS]}")
+            continue
+        name = getattr(message, "name", None) or "Assistant"
+        if name == "ResumeAnalyzer":
+            # 简历分析报告保存在分析存储中，需要时由节点读取，不必留在历史里
+            summary = "已完成简历分析（报告已保存，可直接复用）"
+        else:
+            summary = _first_line(content)
+        artifacts = list(dict.fromkeys(_ARTIFACT.findall(content)))
+        if artifacts:
+            summary += f"；已保存文件: {', '.join(artifacts)}"
+        lines.append(f"- {name}: {summary}")
+    return lines
+
+
+def _truncate(message, max_tokens: int):
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if estimate_tokens(content) <= max_tokens:
+        return message
+    # 估算按每个字符至少 1/4 token，先粗截再逐步收紧
+    cut = max_tokens * 4
+    while cut > 0 and estimate_tokens(content[:cut]) > max_tokens:
+        cut = int(cut * 0.8)
+    return message.model_copy(update={"content": content[:cut] + TRUNCATED_MARK})
+
+
+class MemoryStats:
+    """
+    Counts history tokens before and after compaction per agent.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._agents = {}
+
+    def record(self, agent: str, before: int, after: int) -> None:
+        with self._lock:
+            entry = self._agents.setdefault(agent, {"calls": 0, "tokens_before": 0, "tokens_after": 0})
+            entry["calls"] += 1
+            entry["tokens_before"] += before
+            entry["tokens_after"] += after
+
+    def stats(self) -> dict:
+        with self._lock:
+            agents = {name: dict(entry) for name, entry in self._agents.items()}
+        before = sum(entry["tokens_before"] for entry in agents.values())
+        after = sum(entry["tokens_after"] for entry in agents.values())
+        for entry in agents.values():
+            entry["reduction"] = 1 - entry["tokens_after"] / entry["tokens_before"] if entry["tokens_before"] else 0.0
+        return {
+            "calls": sum(entry["calls"] for entry in agents.values()),
+            "tokens_before": before,
+            "tokens_after": after,
+            "reduction": 1 - after / before if before else 0.0,
+            "agents": agents,
+        }
+
+
+_memory_stats = MemoryStats()
+
+
+def get_memory_stats() -> dict:
+    """
+    Returns history tokens before and after compaction, overall and per agent.
+    """
+    return _memory_stats.stats()
+
+
+def compact_history(messages, agent: str = "", budget: int = None, window: int = None) -> list:
+    """
+    Fits a conversation into an agent's token budget.
+
+    The last `window` turns are kept verbatim; older turns are folded into a rolling
+    summary message (one line per message, with references to saved files and stored
+    resume analyses instead of their content). If the recent turns alone exceed the
+    budget, the oldest of them are folded as well, and as a last resort long replies in
+    the current turn are truncated. The current user message is never dropped.
+
+    Args:
+        messages (list[BaseMessage]): The full conversation, oldest first.
+        agent (str, optional): Selects the budget from AGENT_TOKEN_BUDGETS and the stats bucket.
+        budget (int, optional): Overrides the agent's token budget.
+        window (int, optional): Overrides MEMORY_WINDOW_TURNS.
+
+    Returns:
+        list[BaseMessage]: The messages to send; the input list is not modified.
+    """
+    messages = list(messages)
+    budget = budget or AGENT_TOKEN_BUDGETS.get(agent, DEFAULT_TOKEN_BUDGET)
+    window = MEMORY_WINDOW_TURNS if window is None else window
+    sizes = [message_tokens(message) for message in messages]
+    before = sum(sizes)
+    if before <= budget:
+        _memory_stats.record(agent or "default", before, before)
+        return messages
+
+    turns = split_turns(messages)
+    turn_sizes = []
+    position = 0
+    for turn in turns:
+        turn_sizes.append(sum(sizes[position:position + len(turn)]))
+        position += len(turn)
+
+    keep = min(max(1, window), len(turns))
+    summary_budget = min(SUMMARY_MAX_TOKENS, budget // 4)
+    while keep > 1 and sum(turn_sizes[-keep:]) > budget - summary_budget:
+        keep -= 1
+
+    summary_lines = []
+    for turn in turns[:-keep]:
+        summary_lines.extend(_summarize_turn(turn))
+    # 滚动摘要超出上限时丢弃最早的条目
+    while summary_lines and estimate_tokens("\n".join(summary_lines)) > summary_budget:
+        summary_lines.pop(0)
+
+    compacted = []
+    if summary_lines:
+        compacted.append(SystemMessage(content="此前对话摘要：\n" + "\n".join(summary_lines)))
+    recent = [message for turn in turns[-keep:] for message in turn]
+    used = sum(map(message_tokens, compacted))
+    remaining = budget - used - sum(message_tokens(message) for message in recent[:1])
+    # 当前轮仍超预算时截断较长的回复，用户消息保持完整
+    for index, message in enumerate(recent):
+        if index and not isinstance(message, HumanMessage):
+            share = max(remaining // max(1, len(recent) - index), 50)
+            message = _truncate(message, share)
+        if index:
+            remaining -= message_tokens(message)
+        compacted.append(message)
+
+    _memory_stats.record(agent or "default", before, sum(map(message_tokens, compacted)))
+    return compacted
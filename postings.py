@@ -0,0 +1,259 @@
+import hashlib
+import itertools
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 链接中与岗位本身无关的跟踪参数，规范化时去掉
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "trk", "trkinfo", "refid", "trackingid", "position", "pagenum", "src", "from", "spm",
+}
+
+_PUNCTUATION = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Returns a canonical form of a posting URL used for deduplication.
+
+    The scheme and "www." prefix are dropped, the host is lower-cased, tracking parameters
+    and fragments are removed, remaining query parameters are sorted and a trailing slash
+    is stripped.
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if "?" not in url and "#" not in url:
+        # 快速路径：大多数岗位链接没有查询参数
+        _, _, rest = url.partition("://")
+        host, _, path = (rest or url).partition("/")
+        host = host.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        path = path.rstrip("/")
+        return f"{host}/{path}" if path else host
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+def _normalize_text(text: str) -> str:
+    return _PUNCTUATION.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def posting_fingerprint(job_title: str, company_name: str) -> str:
+    """
+    Returns a fingerprint of a posting's title and company, insensitive to case,
+    punctuation, width and a trailing " at <company>" in the title.
+
+    Returns "" when the company name is empty: a bare title such as "Software Engineer"
+    does not identify a posting, so such postings are deduplicated by URL only.
+    """
+    if not _normalize_text(company_name):
+        return ""
+    title = job_title or ""
+    if company_name and title.lower().endswith(f" at {company_name.lower()}"):
+        title = title[: -len(company_name) - 4]
+    raw = f"{_normalize_text(title)}|{_normalize_text(company_name)}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class JobPosting:
+    """
+    A compact job posting record shared by every search source.
+
+    Attributes:
+        job_title, company_name, job_location, job_desc_text, apply_link, time_posted:
+            The core fields returned to agents.
+        num_applicants, company_url, work_remote_allowed:
+            Optional fields, only emitted by to_dict when set.
+        source (str): Where the posting came from (serper, linkedin, ...).
+
+    Methods:
+        from_serper_item(item, location_name, missing): Build a posting from a Serper organic result.
+        url_key / fingerprint: Deduplication keys, computed once.
+        merge(other): Fill empty fields from a duplicate of this posting.
+        to_dict(): Return the dict shape handed to agents.
+    """
+
+    __slots__ = (
+        "job_title",
+        "company_name",
+        "job_location",
+        "job_desc_text",
+        "apply_link",
+        "time_posted",
+        "num_applicants",
+        "company_url",
+        "work_remote_allowed",
+        "source",
+        "_url_key",
+        "_fingerprint",
+    )
+
+    CORE_FIELDS = ("job_title", "company_name", "job_location", "job_desc_text", "apply_link", "time_posted")
+    OPTIONAL_FIELDS = ("num_applicants", "company_url", "work_remote_allowed")
+
+    def __init__(
+        self,
+        job_title: str = "",
+        company_name: str = "",
+        job_location: str = "",
+        job_desc_text: str = "",
+        apply_link: str = "",
+        time_posted: str = "",
+        num_applicants: str = "",
+        company_url: str = "",
+        work_remote_allowed="",
+        source: str = "",
+    ) -> None:
+        self.job_title = job_title or ""
+        self.company_name = company_name or ""
+        self.job_location = job_location or ""
+        self.job_desc_text = job_desc_text or ""
+        self.apply_link = apply_link or ""
+        self.time_posted = time_posted or ""
+        self.num_applicants = num_applicants or ""
+        self.company_url = company_url or ""
+        self.work_remote_allowed = work_remote_allowed
+        self.source = source
+        self._url_key = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_serper_item(cls, item: dict, location_name: str = None, missing: str = "", source: str = "serper"):
+        title = item.get("title", "")
+
+        # 提取公司名称（如果可能）：假设标题格式为 "Job Title at Company Name"
+        company_name = ""
+        if " at " in title:
+            company_name = title.split(" at ")[-1]
+
+        return cls(
+            job_title=title,
+            company_name=company_name,
+            job_location=location_name or missing,
+            job_desc_text=item.get("snippet", ""),
+            apply_link=item.get("link", ""),
+            time_posted=item.get("date") or missing,
+            source=source,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict, source: str = ""):
+        fields = {name: data.get(name, "") for name in cls.CORE_FIELDS + cls.OPTIONAL_FIELDS}
+        return cls(source=data.get("source", source), **fields)
+
+    @property
+    def url_key(self) -> str:
+        if self._url_key is None:
+            self._url_key = canonical_url(self.apply_link)
+        return self._url_key
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = posting_fingerprint(self.job_title, self.company_name)
+        return self._fingerprint
+
+    def merge(self, other: "JobPosting") -> "JobPosting":
+        for name in self.CORE_FIELDS + self.OPTIONAL_FIELDS:
+            if not getattr(self, name) and getattr(other, name):
+                setattr(self, name, getattr(other, name))
+        # 详情页描述通常比搜索摘要完整，保留较长的一份
+        if len(other.job_desc_text) > len(self.job_desc_text):
+            self.job_desc_text = other.job_desc_text
+        return self
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.CORE_FIELDS}
+        for name in self.OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value not in ("", None):
+                data[name] = value
+        return data
+
+    def __repr__(self) -> str:
+        return f"JobPosting({self.job_title!r}, {self.company_name!r}, {self.apply_link!r})"
+
+
+class PostingMerger:
+    """
+    Streaming dedup/merge engine for job postings from any source.
+
+    Each posting is looked up by canonical URL and, when it names a company, by
+    title/company fingerprint in O(1), so folding n postings costs O(n). Duplicates are merged into the first occurrence.
+
+    Methods:
+        add(posting): Fold one posting in; returns True if it was new.
+        extend(postings): Fold an iterable of postings in.
+        results(): Return the deduplicated postings in arrival order.
+    """
+
+    def __init__(self, max_results: int = None) -> None:
+        self.max_results = max_results
+        self._postings = []
+        self._by_url = {}
+        self._by_fingerprint = {}
+        self.duplicates = 0
+
+    def add(self, posting: JobPosting) -> bool:
+        url_key = posting.url_key
+        fingerprint = posting.fingerprint
+        existing = self._by_url.get(url_key) if url_key else None
+        if existing is None and fingerprint:
+            existing = self._by_fingerprint.get(fingerprint)
+        if existing is not None:
+            existing.merge(posting)
+            self.duplicates += 1
+            if url_key:
+                self._by_url.setdefault(url_key, existing)
+            return False
+
+        if self.max_results is not None and len(self._postings) >= self.max_results:
+            return False
+        self._postings.append(posting)
+        if url_key:
+            self._by_url[url_key] = posting
+        if fingerprint:
+            self._by_fingerprint[fingerprint] = posting
+        return True
+
+    def extend(self, postings) -> "PostingMerger":
+        for posting in postings:
+            self.add(posting)
+        return self
+
+    def results(self) -> list:
+        return list(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+
+def interleave(*sources):
+    """
+    Yields items round-robin from several iterables, so each source's top results come first.
+    """
+    for row in itertools.zip_longest(*sources):
+        for item in row:
+            if item is not None:
+                yield item
+
+
+def merge_postings(*sources, max_results: int = None) -> list:
+    """
+    Interleaves and deduplicates several lists of postings.
+
+    Returns:
+        list[JobPosting]: The merged postings.
+    """
+    return PostingMerger(max_results=max_results).extend(interleave(*sources)).results()
@@ -60,12 +60,12 @@ def get_search_agent_prompt_template():
     指南：
     1. 使用提供的工具搜索与用户需求匹配的职位。
     2. 如果要搜索特定公司的职位，在关键词中包含公司名称。
-    3. 如果初次搜索没有返回结果，最多用替代关键词重试三次。
+    3. JobSearchTool 会自动按地点、经验、类型和同义关键词扩展查询并合并去重，一次调用即可得到完整列表；只有在返回为空时才用替代关键词重试一次。
     4. 如果已经获取到职位列表数据，避免重复调用工具。
-    5. 如果用户提供了简历分析结果，请根据简历中的技能和经验推荐相关职位。
+    5. 如果用户上传了简历，JobSearchTool 返回的职位已按与简历的匹配度（match_score，0-100）从高到低排好序，并附带 matched_skills；请保持该顺序，不要自行重新排序。
 
-    以表格形式返回：
-    | 职位名称 | 公司 | 地点 | 职位角色(摘要) | 申请网址 | 发布时间 |
+    以表格形式返回（无 match_score 时省略匹配度列）：
+    | 职位名称 | 公司 | 地点 | 匹配度 | 匹配技能 | 职位角色(摘要) | 申请网址 | 发布时间 |
 
     如果你成功找到职位列表，以上述格式返回。如果没有，继续执行重试策略。
     """
@@ -96,6 +96,8 @@ def researcher_agent_prompt_template():
     指南：
     1. 对相同的参数只使用一次提供的工具；不要重复查询。
     2. 如果要抓取网站上的公司信息，确保数据相关且简洁。
+    3. 调用 scrape_website 时在 query 参数中写明要从该页面回答的问题，工具只返回与之相关的段落。
+    4. 需要抓取多个网页（例如比较几家公司）时，用 scrape_websites 一次传入全部网址并发抓取，不要逐个调用 scrape_website；超时的页面会被标注，可只对其重试一次。
 
     收集到必要信息后，返回输出，不再进行额外的工具调用。
     """
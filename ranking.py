@@ -0,0 +1,125 @@
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+
+from textproc import is_cjk, tokenize
+
+TITLE_WEIGHT = 2
+MAX_MATCHED_SKILLS = 5
+
+
+class ResumeJobRanker:
+    """
+    Scores job postings against a resume with TF-IDF and batched cosine similarity.
+
+    The resume and every posting (title counted TITLE_WEIGHT times, plus company and
+    description) are mapped onto a vocabulary built from the candidate set; IDF is fitted
+    on the candidates themselves, and all cosine scores are computed in one vectorized
+    NumPy pass over a CSR layout. No LLM call or network access is involved.
+
+    Methods:
+        score(postings): Return a float32 array of cosine similarities in [0, 1].
+        rank(postings): Return copies of the postings sorted by match, with match_score and matched_skills.
+    """
+
+    def __init__(self, resume_text: str) -> None:
+        self.resume_tokens = tokenize(resume_text)
+        self._resume_counts = Counter(self.resume_tokens)
+
+    @staticmethod
+    def _posting_tokens(posting: dict) -> list:
+        return (
+            tokenize(posting.get("job_title", "")) * TITLE_WEIGHT
+            + tokenize(posting.get("company_name", ""))
+            + tokenize(posting.get("job_desc_text", ""))
+        )
+
+    @staticmethod
+    def _csr(token_lists: list, vocabulary: dict):
+        # 词到编号的映射和 (文档, 词) 计数都在 C 层完成，不逐词跑 Python 循环
+        n_docs, n_terms = len(token_lists), len(vocabulary)
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=n_docs)
+        ids = np.fromiter(
+            map(vocabulary.__getitem__, chain.from_iterable(token_lists)), dtype=np.int64, count=int(lengths.sum())
+        )
+        keys, counts = np.unique(np.repeat(np.arange(n_docs), lengths) * n_terms + ids, return_counts=True)
+        docs, indices = np.divmod(keys, n_terms)
+        indptr = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(docs, minlength=n_docs), out=indptr[1:])
+        return indptr, indices, counts.astype(np.float32)
+
+    def _score_tokens(self, token_lists: list) -> np.ndarray:
+        n_docs = len(token_lists)
+        if not n_docs or not self._resume_counts:
+            return np.zeros(n_docs, dtype=np.float32)
+
+        vocabulary = {token: i for i, token in enumerate(set(self._resume_counts).union(*token_lists))}
+        indptr, indices, counts = self._csr(token_lists, vocabulary)
+        if not len(indices):
+            return np.zeros(n_docs, dtype=np.float32)
+
+        # 以候选集（加上简历本身）拟合平滑 IDF；(文档, 词) 已去重，bincount 即文档频率
+        resume_idx = np.fromiter(map(vocabulary.__getitem__, self._resume_counts), dtype=np.int64)
+        df = np.bincount(indices, minlength=len(vocabulary)).astype(np.float32)
+        df[resume_idx] += 1
+        idf = np.log((n_docs + 2) / (df + 1)) + 1
+
+        query = np.zeros(len(vocabulary), dtype=np.float32)
+        resume_tf = np.fromiter(self._resume_counts.values(), dtype=np.float32)
+        query[resume_idx] = (1 + np.log(resume_tf)) * idf[resume_idx]
+        query /= np.linalg.norm(query) or 1.0
+
+        weights = (1 + np.log(counts)) * idf[indices]
+        lengths = np.diff(indptr)
+        starts = np.minimum(indptr[:-1], len(weights))
+        # 末尾补 0 使所有起点都是合法下标；reduceat 对空区间返回起始元素，用文档长度掩码清零
+        contributions = np.append(weights * query[indices], 0.0)
+        squares = np.append(weights * weights, 0.0)
+        dots = np.where(lengths > 0, np.add.reduceat(contributions, starts), 0.0)
+        norms = np.sqrt(np.where(lengths > 0, np.add.reduceat(squares, starts), 0.0))
+        return np.divide(dots, norms, out=np.zeros(n_docs, dtype=np.float32), where=norms > 0).astype(np.float32)
+
+    def score(self, postings: list) -> np.ndarray:
+        return self._score_tokens([self._posting_tokens(posting) for posting in postings])
+
+    def matched_skills(self, tokens: list, limit: int = MAX_MATCHED_SKILLS) -> list:
+        # 相邻且重叠的中文二元组拼回原词（"大模" + "模型" -> "大模型"）再计数
+        resume_terms = set(self.resume_tokens)
+        matched = Counter()
+        phrase, previous = "", -2
+        for i, token in enumerate(tokens):
+            if token not in resume_terms:
+                continue
+            if phrase and i == previous + 1 and is_cjk(token) and is_cjk(phrase) and phrase[-1] == token[0]:
+                phrase += token[1:]
+            else:
+                if len(phrase) > 1:
+                    matched[phrase] += 1
+                phrase = token
+            previous = i
+        if len(phrase) > 1:
+            matched[phrase] += 1
+        return [term for term, _ in matched.most_common(limit)]
+
+    def rank(self, postings: list) -> list:
+        token_lists = [self._posting_tokens(posting) for posting in postings]
+        scores = self._score_tokens(token_lists)
+        order = np.argsort(-scores, kind="stable")
+        ranked = []
+        for i in order:
+            posting = dict(postings[i])
+            posting["match_score"] = round(float(scores[i]) * 100, 1)
+            posting["matched_skills"] = self.matched_skills(token_lists[i])
+            ranked.append(posting)
+        return ranked
+
+
+def rank_postings_for_resume(postings: list, resume_text: str) -> list:
+    """
+    Sorts postings by relevance to the resume text, adding match_score (0-100) and matched_skills.
+    Returns the postings unchanged when there is no usable resume text.
+    """
+    if not postings or not resume_text or not resume_text.strip():
+        return postings
+    return ResumeJobRanker(resume_text).rank(postings)
@@ -0,0 +1,281 @@
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+
+from cache import LRUCache
+
+# 置信度不低于该阈值的查询直接本地路由，不调用 Supervisor LLM
+ROUTER_CONFIDENCE_THRESHOLD = float(os.environ.get("ROUTER_CONFIDENCE_THRESHOLD", "0.6"))
+# 得分达到该值才算证据充分；单个弱关键词（如“分析”）不足以本地路由
+ROUTER_MIN_EVIDENCE = 2.0
+# 至少命中这么多个不同的关键词才可能本地路由；单个关键词（哪怕权重高）只能交给 Supervisor 判断
+ROUTER_MIN_HITS = 2
+# Supervisor LLM 路由结果缓存：进程内共享，所有会话复用
+ROUTE_CACHE_SIZE = int(os.environ.get("ROUTE_CACHE_SIZE", "1024"))
+ROUTE_CACHE_TTL = float(os.environ.get("ROUTE_CACHE_TTL", "3600"))
+# 会话形态签名只取最近几个 Agent，避免长会话的键永远不重复
+ROUTE_SIGNATURE_DEPTH = 4
+
+AGENTS = ("ResumeAnalyzer", "CoverLetterGenerator", "JobSearcher", "WebResearcher", "ChatBot")
+
+# 关键词 -> 各 Agent 的权重；“搜索/查找”等同时可能指向岗位和资讯的词不计分，只参与复合任务判定
+INTENT_WEIGHTS = {
+    "ResumeAnalyzer": {
+        "简历": 2, "resume": 2, "履历": 2, "cv": 2, "分析": 1, "总结": 1, "评估": 1, "点评": 1,
+        "优化": 1, "提炼": 1, "亮点": 1, "analyze": 1, "analyse": 1, "review": 1, "summarize": 1,
+    },
+    "CoverLetterGenerator": {
+        "求职信": 5, "自荐信": 5, "申请信": 5, "cover letter": 5, "motivation letter": 5,
+        "写": 1, "生成": 1, "撰写": 1, "write": 1, "draft": 1,
+    },
+    "JobSearcher": {
+        "岗位": 2, "职位": 2, "招聘": 2, "职缺": 2, "job": 2, "jobs": 2, "hiring": 2, "vacanc": 2, "找工作": 3,
+        "继续搜索": 3, "工作": 1, "实习": 1, "intern": 1, "opening": 1, "position": 1,
+    },
+    "WebResearcher": {
+        "研究": 2, "调研": 2, "新闻": 2, "趋势": 2, "资讯": 2, "news": 2, "research": 2, "trend": 2,
+        "新兴": 2, "影响": 2, "前沿": 2, "emerging": 2, "impact": 2,
+        "动态": 1, "布局": 1, "行业": 1, "公司": 1, "最新": 1, "技术": 1, "industry": 1, "company": 1,
+        "latest": 1, "technolog": 1,
+    },
+    "ChatBot": {
+        "你好": 2, "您好": 2, "谢谢": 2, "感谢": 2, "再见": 2, "hello": 2, "hi": 2, "thanks": 2,
+        "thank you": 2, "bye": 2,
+    },
+}
+
+# 复合任务判定用的特征词（与原 supervisor_node 中的子串规则一致）
+FEATURE_KEYWORDS = {
+    "resume": ("简历", "resume"),
+    "cover": ("求职信", "cover letter"),
+    "my_analysis": ("分析我的",),
+    "job": ("岗位", "job", "jobs", "职位", "工作"),
+    "recommend": ("推荐", "招聘"),
+    "search": ("搜索", "查找"),
+    "my": ("我的",),
+}
+
+# 需要整词匹配的短英文词，避免 "hi" 命中 "hiring"、"job" 命中 "JobPilot" 等；
+# 用前后不是英文字母判定边界（\b 在中文字符旁不成立）
+_WORD_BOUNDARY = {"cv", "hi", "bye", "intern", "job", "jobs"}
+
+
+class Route(NamedTuple):
+    agent: str        # 路由目标；无法判断时为空字符串
+    confidence: float  # 0-1
+    followup: str     # 复合任务的后续 Agent，单一任务为空字符串
+    reason: str       # "compound" / "keywords" / "none"
+
+
+def _build_index():
+    keywords = {}
+    for agent, weights in INTENT_WEIGHTS.items():
+        for keyword, weight in weights.items():
+            keywords.setdefault(keyword, [{}, set()])[0][agent] = weight
+    for feature, words in FEATURE_KEYWORDS.items():
+        for keyword in words:
+            keywords.setdefault(keyword, [{}, set()])[1].add(feature)
+
+    # 合并正则一次扫描时较长的关键词优先匹配，被包含的短关键词的权重和特征要并入长关键词
+    # （整词匹配的短词不会出现在长词内部，不参与合并）
+    for keyword, (weights, features) in keywords.items():
+        for other, (other_weights, other_features) in keywords.items():
+            if other != keyword and other not in _WORD_BOUNDARY and other in keyword:
+                for agent, weight in other_weights.items():
+                    weights[agent] = max(weights.get(agent, 0), weight)
+                features |= other_features
+
+    alternatives = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        pattern = re.escape(keyword)
+        alternatives.append(rf"(?<![a-z]){pattern}(?![a-z])" if keyword in _WORD_BOUNDARY else pattern)
+    return re.compile("|".join(alternatives)), {k: (w, frozenset(f)) for k, (w, f) in keywords.items()}
+
+
+_PATTERN, _KEYWORDS = _build_index()
+
+
+def classify(query: str) -> Route:
+    """
+    Classifies a user query with one scan of a combined keyword regex.
+
+    Compound tasks (resume analysis followed by a cover letter or a job search) are
+    detected with the same rules supervisor_node used; anything else is scored per
+    agent and the confidence reflects how clearly the best agent beats the runner-up
+    and whether there is enough evidence at all: a single matched keyword always stays
+    below ROUTER_CONFIDENCE_THRESHOLD, so such queries are left to the supervisor LLM.
+
+    Returns:
+        Route: agent, confidence in [0, 1], followup agent and reason.
+    """
+    scores = dict.fromkeys(AGENTS, 0.0)
+    hits = {agent: set() for agent in AGENTS}
+    features = set()
+    for match in _PATTERN.finditer((query or "").lower()):
+        keyword = match.group(0)
+        weights, matched_features = _KEYWORDS[keyword]
+        features |= matched_features
+        for agent, weight in weights.items():
+            scores[agent] += weight
+            hits[agent].add(keyword)
+
+    # 复合任务规则：顺序与判定条件保持不变
+    if "resume" in features and "cover" in features:
+        return Route("ResumeAnalyzer", 1.0, "CoverLetterGenerator", "compound")
+    if ("resume" in features or "my_analysis" in features) and ("job" in features or "recommend" in features):
+        return Route("ResumeAnalyzer", 1.0, "JobSearcher", "compound")
+    if "search" in features and "job" in features and ("resume" in features or "my" in features):
+        return Route("ResumeAnalyzer", 1.0, "JobSearcher", "compound")
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (agent, top), (_, second) = ranked[0], ranked[1]
+    if top <= 0:
+        return Route("", 0.0, "", "none")
+    confidence = (top - second) / top * min(1.0, top / ROUTER_MIN_EVIDENCE)
+    # 同一个关键词重复出现不算独立证据
+    confidence *= min(1.0, len(hits[agent]) / ROUTER_MIN_HITS)
+    return Route(agent, round(confidence, 3), "", "keywords")
+
+
+class RouterStats:
+    """
+    Counts how supervisor turns were routed and estimates the LLM latency saved.
+
+    The saving of a locally routed or cached turn is estimated from the running average latency
+    of the supervisor LLM calls that did happen.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.local = 0
+        self.cached = 0
+        self.llm = 0
+        self.local_seconds = 0.0
+        self.cached_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def record_local(self, seconds: float) -> None:
+        with self._lock:
+            self.local += 1
+            self.local_seconds += seconds
+
+    def record_cached(self, seconds: float) -> None:
+        with self._lock:
+            self.cached += 1
+            self.cached_seconds += seconds
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm += 1
+            self.llm_seconds += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.local + self.cached + self.llm
+            avg_llm = self.llm_seconds / self.llm if self.llm else 0.0
+            avg_local = self.local_seconds / self.local if self.local else 0.0
+            avg_cached = self.cached_seconds / self.cached if self.cached else 0.0
+            return {
+                "turns": total,
+                "routed_locally": self.local,
+                "routed_from_cache": self.cached,
+                "routed_by_llm": self.llm,
+                "local_share": self.local / total if total else 0.0,
+                "cache_share": self.cached / total if total else 0.0,
+                "avg_llm_route_seconds": avg_llm,
+                "avg_local_route_seconds": avg_local,
+                "avg_cached_route_seconds": avg_cached,
+                "saved_seconds": self.local * max(0.0, avg_llm - avg_local)
+                + self.cached * max(0.0, avg_llm - avg_cached),
+            }
+
+
+_router_stats = RouterStats()
+
+
+def get_router_stats() -> dict:
+    """
+    Returns the share of supervisor turns routed without an LLM call and the latency saved.
+    """
+    return _router_stats.stats()
+
+
+_route_cache = None
+_route_cache_lock = threading.Lock()
+
+
+def get_route_cache() -> LRUCache:
+    """
+    Returns the process-wide cache of supervisor LLM routing decisions, created on first use.
+    """
+    global _route_cache
+    with _route_cache_lock:
+        if _route_cache is None:
+            _route_cache = LRUCache(max_size=ROUTE_CACHE_SIZE, ttl=ROUTE_CACHE_TTL)
+    return _route_cache
+
+
+def get_route_cache_stats() -> dict:
+    """
+    Returns hit/miss/eviction counters of the routing decision cache.
+    """
+    return get_route_cache().stats()
+
+
+def conversation_signature(messages) -> str:
+    """
+    Returns a compact signature of the agents that already answered in a conversation,
+    e.g. "ResumeAnalyzer>JobSearcher"; an empty string for a fresh conversation.
+    """
+    names = [message.name for message in messages if getattr(message, "name", None)]
+    return ">".join(names[-ROUTE_SIGNATURE_DEPTH:])
+
+
+def route_cache_key(normalized_query: str, messages, model: str) -> tuple:
+    """
+    Builds the routing cache key from the normalized user query, the conversation
+    signature and the model, so that a decision is only reused for the same question
+    asked at the same point of a conversation by the same supervisor model.
+    """
+    return normalized_query, conversation_signature(messages), model
+
+
+def cached_llm_route(key):
+    """
+    Returns a cached supervisor decision for key, or None. Hits are counted in get_router_stats.
+    """
+    started = time.perf_counter()
+    next_action = get_route_cache().get(key)
+    if next_action is not None:
+        _router_stats.record_cached(time.perf_counter() - started)
+    return next_action
+
+
+def remember_llm_route(key, next_action: str) -> None:
+    """
+    Stores a valid supervisor decision for later turns of any session.
+    """
+    get_route_cache().set(key, next_action)
+
+
+def route_locally(query: str, threshold: float = None):
+    """
+    Returns the Route for a query when it is confident enough to skip the LLM, otherwise None.
+    Locally routed turns are counted in get_router_stats.
+    """
+    started = time.perf_counter()
+    route = classify(query)
+    threshold = ROUTER_CONFIDENCE_THRESHOLD if threshold is None else threshold
+    if route.agent and route.confidence >= threshold:
+        _router_stats.record_local(time.perf_counter() - started)
+        return route
+    return None
+
+
+def record_llm_route(seconds: float) -> None:
+    """
+    Records the latency of a supervisor LLM routing call.
+    """
+    _router_stats.record_llm(seconds)
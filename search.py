@@ -1,10 +1,15 @@
 import aiohttp
 import os
 import asyncio
+import random
 import requests
 from typing import List, Literal, Union, Optional
-from bs4 import BeautifulSoup
-from utils import SerperClient
+from linkedin_api import Linkedin
+from asgiref.sync import sync_to_async
+from utils import SerperClient, get_http_session
+from postings import JobPosting, merge_postings
+from job_index import index_postings
+from job_parser import parse_job_html, parse_job_html_async
 
 employment_type_mapping = {
     "full-time": "F",
@@ -31,54 +36,88 @@ job_type_mapping = {
     "hybrid": "3",
 }
 
+# 职位详情抓取配置：详情页地址前缀（可指向本地测试服务）、单条超时、重试次数与摘要判定长度
+JOB_DETAIL_BASE_URL = os.environ.get(
+    "JOB_DETAIL_BASE_URL", "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting"
+)
+JOB_DETAIL_TIMEOUT = float(os.environ.get("JOB_DETAIL_TIMEOUT", "10"))
+JOB_DETAIL_RETRIES = int(os.environ.get("JOB_DETAIL_RETRIES", "2"))
+SNIPPET_MAX_CHARS = 300
 
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
-def search_jobs_with_serper(keywords: str, location_name: str = None, limit: int = 10):
+def _serper_job_query(keywords: str, location_name: str = None) -> str:
+    query = f"job {keywords}"
+    if location_name:
+        query += f" in {location_name}"
+    return query
+
+
+def _serper_postings(response, location_name: str = None) -> list:
+    # 解析搜索结果：与 tools.job_search 共用 JobPosting 记录与去重逻辑
+    return merge_postings(
+        [JobPosting.from_serper_item(item, location_name) for item in response.get("items", [])]
+    )
+
+
+def _serper_jobs(postings) -> list:
+    # 所有抓取到的岗位都写入本地索引，供后续查询直接命中
+    index_postings(postings)
+    jobs = []
+    for posting in postings:
+        job_info = posting.to_dict()
+        job_info.setdefault("num_applicants", "")  # 搜索结果中可能没有此信息
+        jobs.append(job_info)
+    return jobs
+
+
+def search_jobs_with_serper(keywords: str, location_name: str = None, limit: int = 10, enrich: bool = False):
     """
     使用Serper API搜索职位信息
+
+    enrich=True 时会并发抓取各岗位的详情页，用完整职位描述替换搜索摘要（见 enrich_postings）。
+    详情抓取通过 asyncio.run 执行，不能在运行中的事件循环里调用；异步调用方请使用
+    search_jobs_with_serper_async。
     """
+    if enrich:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "search_jobs_with_serper(enrich=True) cannot run inside an event loop; "
+                "await search_jobs_with_serper_async instead"
+            )
     try:
-        # 构造搜索查询
-        query = f"job {keywords}"
-        if location_name:
-            query += f" in {location_name}"
-            
         # 使用SerperClient进行搜索
         client = SerperClient()
-        response = client.search(query, num_results=limit)
-        
-        # 解析搜索结果
-        jobs = []
-        items = response.get("items", [])
-        
-        for item in items:
-            # 尝试从搜索结果中提取职位相关信息
-            title = item.get("title", "")
-            link = item.get("link", "")
-            snippet = item.get("snippet", "")
-            
-            # 简单的职位信息提取逻辑
-            job_info = {
-                "job_title": title,
-                "company_name": "",  # 需要从snippet或其他地方提取
-                "job_location": location_name or "",
-                "job_desc_text": snippet,
-                "apply_link": link,
-                "time_posted": "",  # 搜索结果中可能没有此信息
-                "num_applicants": "",  # 搜索结果中可能没有此信息
-            }
-            
-            # 尝试从标题或片段中提取公司名称
-            if " at " in title:
-                # 假设标题格式为 "Job Title at Company Name"
-                parts = title.split(" at ")
-                if len(parts) >= 2:
-                    job_info["company_name"] = parts[-1]
-                    
-            jobs.append(job_info)
-            
-        return jobs
+        response = client.search(_serper_job_query(keywords, location_name), num_results=limit)
+        postings = _serper_postings(response, location_name)
+        if enrich:
+            postings = asyncio.run(_enrich_with_own_session(postings))
+        return _serper_jobs(postings)
+    except Exception as e:
+        print(f"使用Serper搜索职位时出错: {e}")
+        return []
+
+
+async def search_jobs_with_serper_async(
+    keywords: str, location_name: str = None, limit: int = 10, enrich: bool = False
+):
+    """
+    Async variant of search_jobs_with_serper for callers already running an event loop.
+    The search and the detail fetches use the pooled aiohttp session of the running loop.
+    """
+    try:
+        client = SerperClient()
+        response = await client.search_async(_serper_job_query(keywords, location_name), num_results=limit)
+        postings = _serper_postings(response, location_name)
+        if enrich:
+            postings = await enrich_postings(postings)
+        # 写索引是同步的 SQLite 操作，放到线程中执行
+        return await asyncio.to_thread(_serper_jobs, postings)
     except Exception as e:
         print(f"使用Serper搜索职位时出错: {e}")
         return []
@@ -126,82 +165,67 @@ def get_job_ids(
         return []
 
 
-async def fetch_job_details(session, job_id):
-    # Construct the URL for each job using the job ID
-    job_url = f"https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+def _job_detail_url(job_id) -> str:
+    job_id = str(job_id).strip()
+    if job_id.startswith(("http://", "https://")):
+        return job_id
+    return f"{JOB_DETAIL_BASE_URL.rstrip('/')}/{job_id}"
 
-    # Send a GET request to the job URL
-    async with session.get(job_url) as response:
-        job_soup = BeautifulSoup(await response.text(), "html.parser")
 
-        # Create a dictionary to store job details
-        job_post = {}
+def parse_job_details(html: str, url: str = "") -> dict:
+    """
+    Extracts job details from a LinkedIn guest job page or any page with schema.org JobPosting data.
+    Parsing is done by job_parser (single pass, optional lxml/selectolax backends).
 
-        # Try to extract and store the job title
-        try:
-            job_post["job_title"] = job_soup.find(
-                "h2",
-                {
-                    "class": "top-card-layout__title font-sans text-lg papabear:text-xl font-bold leading-open text-color-text mb-0 topcard__title"
-                },
-            ).text.strip()
-        except Exception as exc:
-            job_post["job_title"] = ""
+    Returns:
+        dict: A posting in the JobPosting.to_dict shape; fields that cannot be found are empty.
+    """
+    return JobPosting.from_dict(parse_job_html(html, url), source="linkedin").to_dict()
 
-        try:
-            job_post["job_location"] = job_soup.find(
-                "span",
-                {"class": "topcard__flavor topcard__flavor--bullet"},
-            ).text.strip()
-        except Exception as exc:
-            job_post["job_location"] = ""
-
-        # Try to extract and store the company name
-        try:
-            job_post["company_name"] = job_soup.find(
-                "a", {"class": "topcard__org-name-link topcard__flavor--black-link"}
-            ).text.strip()
-        except Exception as exc:
-            job_post["company_name"] = ""
 
-        # Try to extract and store the time posted
-        try:
-            job_post["time_posted"] = job_soup.find(
-                "span", {"class": "posted-time-ago__text topcard__flavor--metadata"}
-            ).text.strip()
-        except Exception as exc:
-            job_post["time_posted"] = ""
+async def fetch_job_details(
+    session,
+    job_id,
+    timeout: float = JOB_DETAIL_TIMEOUT,
+    retries: int = JOB_DETAIL_RETRIES,
+):
+    """
+    Fetches and parses one job detail page.
 
-        # Try to extract and store the number of applicants
-        try:
-            job_post["num_applicants"] = job_soup.find(
-                "span",
-                {
-                    "class": "num-applicants__caption topcard__flavor--metadata topcard__flavor--bullet"
-                },
-            ).text.strip()
-        except Exception as exc:
-            job_post["num_applicants"] = ""
-
-        # Try to extract and store the job description
-        try:
-            job_description = job_soup.find(
-                "div", {"class": "decorated-job-posting__details"}
-            ).text.strip()
-            job_post["job_desc_text"] = job_description
-        except Exception as exc:
-            job_post["job_desc_text"] = ""
+    job_id may be a LinkedIn job id (resolved against JOB_DETAIL_BASE_URL) or a full URL.
+    Timeouts, connection errors, 429 and 5xx responses are retried with exponential
+    backoff; each attempt is bounded by timeout seconds. A page that fails to parse is
+    not retried.
 
+    Returns:
+        dict | None: The parsed posting, or None when every attempt failed or parsing failed.
+    """
+    job_url = _job_detail_url(job_id)
+    for attempt in range(retries + 1):
         try:
-            # Try to extract and store the apply link
-            apply_link_tag = job_soup.find("a", class_="topcard__link")
-            if apply_link_tag:
-                apply_link = apply_link_tag.get("href")
-                job_post["apply_link"] = apply_link
-        except Exception as exc:
-            job_post["apply_link"] = ""
-
-        return job_post
+            async with session.get(job_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status in _RETRY_STATUSES and attempt < retries:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history, status=response.status
+                    )
+                response.raise_for_status()
+                html = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = getattr(e, "status", None)
+            if attempt >= retries or (status is not None and status not in _RETRY_STATUSES):
+                print(f"获取职位详情失败 {job_url}: {str(e) or type(e).__name__}")
+                return None
+            await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.1)
+            continue
+        # HTML 解析是 CPU 密集型的，放到线程或解析进程池中以免阻塞事件循环；
+        # 解析失败只影响这一条岗位，不重试也不让整批 gather 失败
+        try:
+            parsed = await parse_job_html_async(html, job_url)
+        except Exception as e:
+            print(f"解析职位详情失败 {job_url}: {str(e) or type(e).__name__}")
+            return None
+        return JobPosting.from_dict(parsed, source="linkedin").to_dict()
+    return None
 
 
 async def get_job_details_from_linkedin_api(job_id):
@@ -212,45 +236,92 @@ async def get_job_details_from_linkedin_api(job_id):
         )  # Assuming this function is async and fetches job data
 
         # Construct the job data dictionary with defaults
-        job_data_dict = {
-            "company_name": job_data.get("companyDetails", {})
-            .get(
-                "com.linkedin.voyager.deco.jobs.web.shared.WebCompactJobPostingCompany",
-                {},
-            )
-            .get("companyResolutionResult", {})
-            .get("name", ""),
-            "company_url": job_data.get("companyDetails", {})
+        company = (
+            job_data.get("companyDetails", {})
             .get(
                 "com.linkedin.voyager.deco.jobs.web.shared.WebCompactJobPostingCompany",
                 {},
             )
             .get("companyResolutionResult", {})
-            .get("url", ""),
-            "job_desc_text": job_data.get("description", {}).get("text", ""),
-            "work_remote_allowed": job_data.get("workRemoteAllowed", ""),
-            "job_title": job_data.get("title", ""),
-            "company_apply_url": job_data.get("applyMethod", {})
+        )
+        job_data_dict = JobPosting(
+            job_title=job_data.get("title", ""),
+            company_name=company.get("name", ""),
+            company_url=company.get("url", ""),
+            job_location=job_data.get("formattedLocation", ""),
+            job_desc_text=job_data.get("description", {}).get("text", ""),
+            apply_link=job_data.get("applyMethod", {})
             .get("com.linkedin.voyager.jobs.OffsiteApply", {})
             .get("companyApplyUrl", ""),
-            "job_location": job_data.get("formattedLocation", ""),
-        }
+            work_remote_allowed=job_data.get("workRemoteAllowed", ""),
+            source="linkedin",
+        ).to_dict()
     except Exception as e:
         # Handle exceptions or errors in fetching or parsing the job data
-        job_data_dict = {
-            "company_name": "",
-            "company_url": "",
-            "job_desc_text": "",
-            "work_remote_allowed": "",
-            "job_title": "",
-            "apply_link": "",
-            "job_location": "",
-        }
+        job_data_dict = JobPosting(source="linkedin").to_dict()
 
     return job_data_dict
 
 
-async def fetch_all_jobs(job_ids, batch_size=5):
-    # 由于我们直接使用Serper获取职位详情，这里直接返回空列表
-    # 实际的职位信息将在工具调用中直接返回
-    return []
+async def fetch_all_jobs(job_ids, batch_size=5, session=None):
+    """
+    Fetches job detail pages concurrently over one shared aiohttp session.
+
+    At most batch_size requests are in flight at any time; a new one starts as soon as
+    another finishes instead of waiting for the whole batch. Failed postings are skipped.
+
+    Args:
+        job_ids (list): LinkedIn job ids or detail page URLs.
+        batch_size (int, optional): Maximum number of concurrent requests.
+        session (aiohttp.ClientSession, optional): Defaults to the pooled session of the running loop.
+
+    Returns:
+        list[dict]: Parsed postings in the order of job_ids.
+    """
+    if not job_ids:
+        return []
+    session = session or get_http_session()[0]
+    semaphore = asyncio.Semaphore(max(1, batch_size))
+
+    async def fetch(job_id):
+        async with semaphore:
+            return await fetch_job_details(session, job_id)
+
+    details = await asyncio.gather(*(fetch(job_id) for job_id in job_ids))
+    return [detail for detail in details if detail]
+
+
+async def _enrich_with_own_session(postings):
+    # asyncio.run 会新建事件循环，用完即关闭的独立会话避免遗留未关闭的连接池
+    async with aiohttp.ClientSession() as session:
+        return await enrich_postings(postings, session=session)
+
+
+async def enrich_postings(postings, batch_size=5, session=None):
+    """
+    Replaces search-snippet descriptions with the full description from each posting's detail page.
+
+    Only postings whose description is shorter than SNIPPET_MAX_CHARS and that have an
+    apply_link are fetched; the detail is merged into the posting (JobPosting.merge keeps
+    the longer description and fills empty fields).
+
+    Returns:
+        list: The same postings (JobPosting or dict, matching the input), enriched in place where possible.
+    """
+    records = [JobPosting.from_dict(p) if isinstance(p, dict) else p for p in postings]
+    targets = [p for p in records if p.apply_link and len(p.job_desc_text) < SNIPPET_MAX_CHARS]
+    if targets:
+        session = session or get_http_session()[0]
+        semaphore = asyncio.Semaphore(max(1, batch_size))
+
+        async def fetch(posting):
+            async with semaphore:
+                return await fetch_job_details(session, posting.apply_link)
+
+        details = await asyncio.gather(*(fetch(p) for p in targets))
+        for posting, detail in zip(targets, details):
+            if detail:
+                posting.merge(JobPosting.from_dict(detail))
+    if postings and isinstance(postings[0], dict):
+        return [p.to_dict() for p in records]
+    return records
@@ -0,0 +1,470 @@
+"""
+Headless HTTP service for the agent graph.
+
+Usage:
+    python service.py [--host 0.0.0.0] [--port 8080]
+
+Endpoints:
+    POST   /sessions                      Create a session, returns {"session_id"}.
+    GET    /sessions/{id}                 Conversation history of a session.
+    DELETE /sessions/{id}                 Drop a session.
+    PUT    /sessions/{id}/resume          Upload the session's resume (raw PDF body).
+    POST   /sessions/{id}/messages        Run one turn: {"message": str, "stream": bool}.
+                                          With "stream" or "Accept: text/event-stream" the turn is
+                                          sent as Server-Sent Events (agent, handoff, tool, token,
+                                          done, error); otherwise a JSON answer is returned.
+    GET    /healthz                       Liveness probe.
+    GET    /stats                         Worker pool, session and cache counters.
+
+Conversation state lives in the server-side session store, never in the client, so any
+replica sharing the store (SESSION_STORE_PATH on a shared volume) can serve any turn.
+Sessions are saved with compare-and-set on their "updated_at" stamp: when two replicas
+run a turn on the same session at once, the turn that finishes second is rejected with
+409 instead of overwriting the other's history. Store calls run in worker threads so a
+locked store file never stalls the event loop.
+Turns run on the async graph under a bounded worker pool: requests beyond
+SERVICE_WORKERS wait in a queue of SERVICE_QUEUE_SIZE, a full queue answers 429 and a
+request that cannot start within SERVICE_QUEUE_TIMEOUT answers 503.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+
+from aiohttp import web
+from langchain_core.messages import HumanMessage, messages_from_dict, messages_to_dict
+
+from cache import LRUCache, SQLiteCache
+from streaming import EventCallbackHandler, astream_graph
+
+# 同时执行的对话轮数；超出的请求排队，队列满时返回 429
+SERVICE_WORKERS = int(os.environ.get("SERVICE_WORKERS", "32"))
+SERVICE_QUEUE_SIZE = int(os.environ.get("SERVICE_QUEUE_SIZE", "64"))
+# 排队超过该时间仍未开始执行则返回 503，由负载均衡转给其他实例
+SERVICE_QUEUE_TIMEOUT = float(os.environ.get("SERVICE_QUEUE_TIMEOUT", "30"))
+SERVICE_RECURSION_LIMIT = 15
+# 会话存储：为空时保存在进程内存中；设为 SQLite 路径可在重启后保留，或由多个实例共享
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH", "")
+SESSION_TTL = float(os.environ.get("SESSION_TTL", str(7 * 86400)))
+SESSION_MAX = int(os.environ.get("SESSION_MAX", "10000"))
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+
+
+def default_model_config() -> dict:
+    return {
+        "model": os.environ.get("SERVICE_MODEL", "qwen-plus"),
+        "model_provider": os.environ.get("SERVICE_MODEL_PROVIDER", "tongyi"),
+        "temperature": float(os.environ.get("SERVICE_TEMPERATURE", "0.3")),
+        "DASHSCOPE_API_KEY": os.environ.get("DASHSCOPE_API_KEY", ""),
+    }
+
+
+class SessionConflict(Exception):
+    """Raised when a session was saved by another request since it was read."""
+
+
+def _next_stamp(previous: float = None) -> float:
+    # 保证新的版本戳与旧值不同，即使两次保存落在同一个时钟刻度内
+    stamp = time.time()
+    return stamp if previous is None or stamp > previous else previous + 1e-6
+
+
+class SessionStore:
+    """
+    Server-side conversation state, in memory with an LRU bound and a TTL.
+
+    A session is a JSON-serializable dict: {"messages": [...], "resume_path": str,
+    "resume_sha256": str, "created_at": float, "updated_at": float}; messages are stored
+    with messages_to_dict.
+
+    Methods:
+        get(session_id): Return the session dict, or None when unknown or expired.
+        save(session_id, session, expected_updated_at): Store a session and stamp its
+            updated_at. With expected_updated_at, raise SessionConflict unless the stored
+            session still carries that stamp (compare-and-set).
+        delete(session_id): Remove a session.
+    """
+
+    def __init__(self, max_size: int = SESSION_MAX, ttl: float = SESSION_TTL) -> None:
+        self._sessions = LRUCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str):
+        session = self._sessions.get(session_id)
+        # 返回副本：调用方在保存前修改会话，不能影响存储中用于比较的版本
+        return dict(session) if session is not None else None
+
+    def save(self, session_id: str, session: dict, expected_updated_at: float = None) -> None:
+        with self._lock:
+            if expected_updated_at is not None:
+                current = self._sessions.get(session_id)
+                if current is None or current.get("updated_at") != expected_updated_at:
+                    raise SessionConflict(session_id)
+            session["updated_at"] = _next_stamp(expected_updated_at)
+            self._sessions.set(session_id, dict(session))
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+    def __len__(self) -> int:
+        return self._sessions.stats()["size"]
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    A SessionStore persisted in SQLite, shared by every process that opens the same file.
+    """
+
+    def __init__(self, path: str, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self._store = SQLiteCache(path, table="sessions")
+
+    def get(self, session_id: str):
+        stored = self._store.get(session_id)
+        if stored is None:
+            return None
+        session, stored_at = stored
+        if time.time() - stored_at >= self.ttl:
+            self._store.delete(session_id)
+            return None
+        session["updated_at"] = stored_at
+        return session
+
+    def save(self, session_id: str, session: dict, expected_updated_at: float = None) -> None:
+        # updated_at 与 SQLite 中的 stored_at 相同，比较与写入在一条 UPDATE 中完成
+        stamp = _next_stamp(expected_updated_at)
+        session["updated_at"] = stamp
+        if expected_updated_at is None:
+            self._store.set(session_id, session, stored_at=stamp)
+        elif not self._store.compare_and_set(session_id, session, expected_updated_at, stored_at=stamp):
+            raise SessionConflict(session_id)
+
+    def delete(self, session_id: str) -> None:
+        self._store.delete(session_id)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+class WorkerPool:
+    """
+    Bounds concurrent turns with a semaphore and a bounded wait queue.
+
+    Methods:
+        slot(): Async context manager holding one worker slot for the duration of a turn;
+            raises QueueFull when the queue is full and QueueTimeout when no slot frees up
+            within queue_timeout.
+        stats(): Return running/waiting/rejected counters.
+    """
+
+    def __init__(
+        self,
+        workers: int = SERVICE_WORKERS,
+        queue_size: int = SERVICE_QUEUE_SIZE,
+        queue_timeout: float = SERVICE_QUEUE_TIMEOUT,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.workers)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        # 按计数判断而不是 Semaphore.locked()：同一轮事件循环中到达的请求尚未真正拿到槽位
+        if self.running + self.waiting >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise QueueFull()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise QueueTimeout() from None
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _json_error(status: int, message: str, **headers) -> web.Response:
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+
+async def _session_or_404(request):
+    # SQLite 会话存储的读写可能因文件锁阻塞，一律放到线程中执行
+    session = await asyncio.to_thread(request.app["sessions"].get, request.match_info["session_id"])
+    if session is None:
+        raise web.HTTPNotFound(
+            text=json.dumps({"error": "session not found"}), content_type="application/json"
+        )
+    return session
+
+
+def _public_messages(messages) -> list:
+    return [
+        {"role": message.type, "name": getattr(message, "name", None), "content": message.content}
+        for message in messages
+    ]
+
+
+async def create_session(request):
+    session_id = uuid.uuid4().hex
+    await asyncio.to_thread(
+        request.app["sessions"].save,
+        session_id, {"messages": [], "resume_path": "", "resume_sha256": "", "created_at": time.time()},
+    )
+    return web.json_response({"session_id": session_id}, status=201)
+
+
+async def get_session(request):
+    session = await _session_or_404(request)
+    return web.json_response({
+        "session_id": request.match_info["session_id"],
+        "resume_sha256": session["resume_sha256"],
+        "messages": _public_messages(messages_from_dict(session["messages"])),
+    })
+
+
+async def delete_session(request):
+    await _session_or_404(request)
+    await asyncio.to_thread(request.app["sessions"].delete, request.match_info["session_id"])
+    return web.Response(status=204)
+
+
+async def upload_resume(request):
+    from artifacts import get_artifact_store
+
+    session = await _session_or_404(request)
+    body = await request.read()
+    if not body:
+        return _json_error(400, "empty resume body")
+    if len(body) > MAX_RESUME_BYTES:
+        return _json_error(413, "resume too large")
+    # 简历按内容哈希存入制品库，与 Streamlit 界面共用同一份存储
+    digest, path = await asyncio.to_thread(get_artifact_store().put_stream, io.BytesIO(body), ".pdf")
+    expected = session.get("updated_at")
+    session["resume_sha256"], session["resume_path"] = digest, path
+    try:
+        await asyncio.to_thread(request.app["sessions"].save, request.match_info["session_id"], session, expected)
+    except SessionConflict:
+        return _json_error(409, "the session was modified by another request; retry")
+    return web.json_response({"resume_sha256": digest})
+
+
+async def _run_turn(app, session_id: str, session: dict, text: str, callback, streaming: bool) -> dict:
+    graph = app["graph"]
+    inputs = {
+        "messages": messages_from_dict(session["messages"]) + [HumanMessage(content=text)],
+        "user_input": text,
+        "config": {**app["model_config"], "streaming": streaming},
+        "callback": callback,
+        "resume_path": session["resume_path"],
+        "resume_sha256": session["resume_sha256"],
+    }
+    callback.start_run()
+    state = inputs
+    async for node, state in astream_graph(graph, inputs, {"recursion_limit": SERVICE_RECURSION_LIMIT}):
+        if node == "Supervisor" and state.get("next_step") not in (None, "", "Finish"):
+            callback.write_handoff(state["next_step"])
+    latency = callback.finish_run()
+
+    messages = state["messages"]
+    expected = session.get("updated_at")
+    session["messages"] = messages_to_dict(messages)
+    # 其他实例在本轮执行期间保存过该会话时抛出 SessionConflict，本轮结果不写入
+    await asyncio.to_thread(app["sessions"].save, session_id, session, expected)
+    return {
+        "answer": messages[-1].content if messages else "",
+        "agents": callback.get_agent_sequence(),
+        "ttft_seconds": latency["ttft_seconds"],
+        "total_seconds": latency["total_seconds"],
+    }
+
+
+async def post_message(request):
+    app = request.app
+    session_id = request.match_info["session_id"]
+    session = await _session_or_404(request)
+    try:
+        payload = await request.json()
+    except ValueError:
+        return _json_error(400, "invalid JSON body")
+    text = str(payload.get("message") or "").strip()
+    if not text:
+        return _json_error(400, "message is required")
+    streaming = bool(payload.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+    # 同一会话同一时间只执行一轮，保证历史按顺序追加；锁在没有请求持有时自动回收
+    lock = app["session_locks"].get(session_id)
+    if lock is None:
+        lock = app["session_locks"][session_id] = asyncio.Lock()
+    if lock.locked():
+        return _json_error(409, "a turn is already running for this session")
+
+    pool = app["pool"]
+    try:
+        async with lock, pool.slot():
+            if not streaming:
+                try:
+                    result = await _run_turn(app, session_id, session, text, EventCallbackHandler(), False)
+                except SessionConflict:
+                    raise
+                except Exception as e:
+                    # 与流式接口的 error 事件一致，返回 JSON 错误而不是 aiohttp 默认的 500 页面
+                    print(f"执行对话轮次出错 {session_id}: {e!r}")
+                    return _json_error(500, str(e) or type(e).__name__)
+                return web.json_response(result)
+            return await _stream_turn(request, session_id, session, text)
+    except SessionConflict:
+        return _json_error(409, "the session was modified by another request; retry")
+    except QueueFull:
+        return _json_error(429, "too many queued requests", **{"Retry-After": "1"})
+    except QueueTimeout:
+        return _json_error(503, "no worker available", **{"Retry-After": "5"})
+
+
+async def _stream_turn(request, session_id: str, session: dict, text: str):
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def emit(event, data):
+        # 回调可能在执行同步工具的线程中触发
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def run():
+        try:
+            result = await _run_turn(request.app, session_id, session, text, EventCallbackHandler(emit), True)
+            emit("done", result)
+        except SessionConflict:
+            emit("error", {"error": "the session was modified by another request; retry"})
+        except Exception as e:
+            emit("error", {"error": str(e) or type(e).__name__})
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            event, data = await events.get()
+            await response.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+            if event in ("done", "error"):
+                break
+    finally:
+        # 客户端断开时取消本轮执行，释放工作槽
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await response.write_eof()
+    return response
+
+
+async def healthz(request):
+    return web.json_response({"status": "ok"})
+
+
+async def stats(request):
+    from router import get_route_cache_stats, get_router_stats
+    from streaming import get_latency_stats
+
+    return web.json_response({
+        "pool": request.app["pool"].stats(),
+        "sessions": await asyncio.to_thread(len, request.app["sessions"]),
+        "latency": get_latency_stats(),
+        "router": get_router_stats(),
+        "route_cache": get_route_cache_stats(),
+    })
+
+
+def create_app(graph=None, graph_factory=None, session_store: SessionStore = None,
+               model_config: dict = None, workers: int = SERVICE_WORKERS,
+               queue_size: int = SERVICE_QUEUE_SIZE, queue_timeout: float = SERVICE_QUEUE_TIMEOUT) -> web.Application:
+    """
+    Builds the aiohttp application.
+
+    Args:
+        graph (optional): A compiled async graph; tests pass one built from stub agents.
+        graph_factory (callable, optional): Builds the graph when graph is not given;
+            defaults to agents.get_async_graph.
+        session_store (SessionStore, optional): Defaults to SQLite at SESSION_STORE_PATH, or memory.
+        model_config (dict, optional): The graph's "config" entry; defaults to SERVICE_* env vars.
+        workers, queue_size, queue_timeout: Worker pool limits.
+
+    Returns:
+        web.Application: The application, ready for web.run_app or a test client.
+    """
+    if graph is None:
+        if graph_factory is None:
+            from agents import get_async_graph as graph_factory
+        graph = graph_factory()
+    if session_store is None:
+        session_store = SQLiteSessionStore(SESSION_STORE_PATH) if SESSION_STORE_PATH else SessionStore()
+
+    app = web.Application(client_max_size=MAX_RESUME_BYTES + 1024)
+    app["graph"] = graph
+    app["sessions"] = session_store
+    app["session_locks"] = weakref.WeakValueDictionary()
+    app["model_config"] = model_config or default_model_config()
+    app["pool"] = WorkerPool(workers, queue_size, queue_timeout)
+    app.add_routes([
+        web.post("/sessions", create_session),
+        web.get("/sessions/{session_id}", get_session),
+        web.delete("/sessions/{session_id}", delete_session),
+        web.put("/sessions/{session_id}/resume", upload_resume),
+        web.post("/sessions/{session_id}/messages", post_message),
+        web.get("/healthz", healthz),
+        web.get("/stats", stats),
+    ])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobPilot headless agent service")
+    parser.add_argument("--host", default=os.environ.get("SERVICE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SERVICE_PORT", "8080")))
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
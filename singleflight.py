@@ -0,0 +1,93 @@
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import Future
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leader was cancelled; waiters retry instead of sharing it."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls so that only one of them does the work.
+
+    While a call for a key is in flight, other callers with the same key wait for it and
+    share its result (or exception). Cancellation is never shared: when the leader is
+    cancelled, its waiters run the call again themselves. Thread callers and asyncio callers share the same
+    in-flight table, so a coroutine can wait on a call started by a thread and vice versa.
+
+    Methods:
+        do(key, fn): Run fn() once per in-flight key from a thread and return its result.
+        do_async(key, coro_fn): Await coro_fn() once per in-flight key and return its result.
+        stats(): Return call, execution and coalesced-waiter counters.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _join_or_lead(self, key):
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        if isinstance(error, (asyncio.CancelledError, concurrent.futures.CancelledError)):
+            future.set_exception(_LeaderCancelled())
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            try:
+                return future.result()
+            except _LeaderCancelled:
+                return self.do(key, fn)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key, coro_fn):
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            try:
+                # shield：等待方自己被取消时不能连带取消共享的 Future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderCancelled:
+                return await self.do_async(key, coro_fn)
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
@@ -0,0 +1,176 @@
+import threading
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class LatencyTracker:
+    """
+    Measures one conversation turn: time to the first visible LLM token and total latency.
+
+    Tool-calling steps of an agent emit empty tokens, so only non-empty tokens count as
+    the first token. Without streaming the first token arrives with the whole answer and
+    the time-to-first-token equals the total latency.
+
+    Methods:
+        start(): Mark the start of the turn.
+        on_token(token): Record the first non-empty token.
+        finish(): Return {"ttft_seconds", "total_seconds", "tokens"} and record it in get_latency_stats.
+    """
+
+    def __init__(self) -> None:
+        self.started = None
+        self.first_token = None
+        self.tokens = 0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.tokens = 0
+
+    def on_token(self, token: str) -> None:
+        if not token or self.started is None:
+            return
+        self.tokens += 1
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def finish(self) -> dict:
+        if self.started is None:
+            return {"ttft_seconds": 0.0, "total_seconds": 0.0, "tokens": 0}
+        total = time.perf_counter() - self.started
+        ttft = self.first_token - self.started if self.first_token is not None else total
+        self.started = None
+        _latency_stats.record(ttft, total, self.tokens)
+        return {"ttft_seconds": ttft, "total_seconds": total, "tokens": self.tokens}
+
+
+class LatencyStats:
+    """
+    Aggregates time-to-first-token and total latency over turns.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.streamed_turns = 0
+        self.ttft_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def record(self, ttft: float, total: float, tokens: int) -> None:
+        with self._lock:
+            self.turns += 1
+            self.streamed_turns += tokens > 0
+            self.ttft_seconds += ttft
+            self.total_seconds += total
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg_ttft = self.ttft_seconds / self.turns if self.turns else 0.0
+            avg_total = self.total_seconds / self.turns if self.turns else 0.0
+            return {
+                "turns": self.turns,
+                "streamed_turns": self.streamed_turns,
+                "avg_ttft_seconds": avg_ttft,
+                "avg_total_seconds": avg_total,
+                # 用户开始看到输出的时间比等待完整回答提前的比例
+                "ttft_share": avg_ttft / avg_total if avg_total else 0.0,
+            }
+
+
+_latency_stats = LatencyStats()
+
+
+class EventCallbackHandler(BaseCallbackHandler):
+    """
+    A headless session callback that reports progress as events instead of drawing a UI.
+
+    It offers the same interface the graph nodes and the Streamlit handler use
+    (write_agent_name, write_handoff, start_run, finish_run, agent sequence). Every agent
+    start, hand-off, tool call and LLM token is passed to emit(event, data). Handlers are
+    run inline, so emit must be cheap and thread-safe. Sync tools call it from executor
+    threads.
+
+    Args:
+        emit (callable): Receives (event name, JSON-serializable dict).
+    """
+
+    run_inline = True
+
+    def __init__(self, emit=None) -> None:
+        self.emit = emit or (lambda event, data: None)
+        self.agent_sequence = []
+        self.latency = LatencyTracker()
+
+    def write_agent_name(self, name: str) -> None:
+        self.agent_sequence.append(name)
+        self.emit("agent", {"name": name})
+
+    def write_handoff(self, next_agent: str) -> None:
+        self.emit("handoff", {"to": next_agent})
+
+    def get_agent_sequence(self) -> list:
+        return self.agent_sequence
+
+    def clear_agent_sequence(self) -> None:
+        self.agent_sequence = []
+
+    def start_run(self) -> None:
+        self.clear_agent_sequence()
+        self.latency.start()
+
+    def finish_run(self) -> dict:
+        return self.latency.finish()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.latency.on_token(token)
+        if token:
+            self.emit("token", {"text": token})
+
+    def on_agent_action(self, action, **kwargs: Any) -> None:
+        self.emit("tool", {"name": action.tool})
+
+
+def get_latency_stats() -> dict:
+    """
+    Returns average time-to-first-token and total latency of the tracked turns.
+    """
+    return _latency_stats.stats()
+
+
+def stream_graph(graph, inputs: dict, config: dict = None):
+    """
+    Runs the agent graph step by step.
+
+    Yields a (node, state) pair as soon as each node finishes, so callers can show
+    supervisor hand-offs while the next agent is still running. LLM tokens reach the
+    UI through the callback in the state, which must be created with streaming enabled
+    in the model config ("streaming": True).
+
+    Args:
+        graph: The compiled graph from agents.get_graph().
+        inputs (dict): The initial agent state.
+        config (dict, optional): Runnable config such as {"recursion_limit": 15}.
+
+    Yields:
+        tuple[str, dict]: The node that just finished and the full state after it.
+    """
+    node = None
+    for mode, chunk in graph.stream(inputs, config, stream_mode=["updates", "values"]):
+        if mode == "updates":
+            node = next(iter(chunk), None)
+        elif node is not None:
+            yield node, chunk
+
+
+async def astream_graph(graph, inputs: dict, config: dict = None):
+    """
+    Async counterpart of stream_graph for the graph from agents.get_async_graph().
+    """
+    node = None
+    async for mode, chunk in graph.astream(inputs, config, stream_mode=["updates", "values"]):
+        if mode == "updates":
+            node = next(iter(chunk), None)
+        elif node is not None:
+            yield node, chunk
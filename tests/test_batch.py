@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+
+
+class StubGraph:
+    """Answers every query; the query "crash" kills the worker process."""
+
+    async def ainvoke(self, inputs, config=None):
+        if inputs["user_input"] == "crash":
+            os._exit(1)
+        return {"messages": inputs["messages"] + [AIMessage(content="ok")]}
+
+
+def stub_graph():
+    return StubGraph()
+
+
+def write_jobs(path, lines):
+    path.write_text("\n".join(json.dumps(line, ensure_ascii=False) for line in lines), encoding="utf-8")
+    return str(path)
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_line_without_query_needs_query_option(tmp_path):
+    path = write_jobs(tmp_path / "jobs.jsonl", [{"id": "a", "query": "总结我的简历"}, {"id": "b"}])
+    with pytest.raises(ValueError, match=r"jobs.jsonl:2: no query"):
+        batch.load_jobs(path)
+    assert [job["id"] for job in batch.load_jobs(path, ["总结我的简历"])] == ["a", "b#1"]
+
+
+def test_failed_future_is_recorded_and_batch_keeps_draining(tmp_path, monkeypatch):
+    run_job = batch.run_job
+
+    def flaky_run_job(job, *args):
+        if job["id"] == "2":
+            raise RuntimeError("worker lost")
+        return run_job(job, *args)
+
+    monkeypatch.setattr(batch, "run_job", flaky_run_job)
+    jobs = [{"id": str(number), "resume": "", "query": "hi"} for number in range(1, 6)]
+    output = str(tmp_path / "out.jsonl")
+    summary = batch.run_batch(jobs, output, {}, workers=1, factory_path="test_batch:stub_graph")
+
+    assert (summary["ok"], summary["error"]) == (4, 1)
+    records = {record["id"]: record for record in read_records(output)}
+    assert sorted(records) == ["1", "2", "3", "4", "5"]
+    assert records["2"]["status"] == "error" and records["2"]["error"] == "worker lost"
+
+
+def test_crashed_process_worker_records_every_job(tmp_path):
+    jobs = [{"id": str(number), "resume": "", "query": query} for number, query in enumerate(["crash", "hi", "hi"], 1)]
+    output = str(tmp_path / "out.jsonl")
+    summary = batch.run_batch(jobs, output, {}, workers=1, executor="process", factory_path="test_batch:stub_graph")
+
+    records = read_records(output)
+    assert sorted(record["id"] for record in records) == ["1", "2", "3"]
+    assert summary["ok"] + summary["error"] == 3
+    assert {record["id"]: record["status"] for record in records}["1"] == "error"
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search  # noqa: E402
+from postings import JobPosting  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+with open(os.path.join(FIXTURES_DIR, "linkedin_job.html"), encoding="utf-8") as f:
+    LINKEDIN_JOB = f.read()
+SHORT_JOB = '<div class="decorated-job-posting__details">短</div>'
+
+
+def fixture_app():
+    hits = {}
+
+    async def job(request):
+        name = request.match_info["name"]
+        hits[name] = hits.get(name, 0) + 1
+        if name == "flaky" and hits[name] == 1:
+            return web.Response(status=429)
+        if name == "missing":
+            return web.Response(status=404)
+        if name == "slow":
+            await asyncio.sleep(1)
+        page = SHORT_JOB if name == "short" else LINKEDIN_JOB
+        return web.Response(text=page, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/jobs/{name}", job)
+    return app, hits
+
+
+def run(scenario):
+    async def main():
+        app, hits = fixture_app()
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                result = await scenario(session, lambda name: str(server.make_url(f"/jobs/{name}")))
+        finally:
+            await server.close()
+        return result, hits
+
+    return asyncio.run(main())
+
+
+def test_rate_limited_page_is_retried():
+    detail, hits = run(lambda session, url: search.fetch_job_details(session, url("flaky"), retries=1))
+    assert hits["flaky"] == 2
+    assert detail["company_name"] == "Example Corp"
+
+
+def test_non_retryable_status_returns_none_without_retry():
+    detail, hits = run(lambda session, url: search.fetch_job_details(session, url("missing"), retries=2))
+    assert detail is None
+    assert hits["missing"] == 1
+
+
+def test_timeout_returns_none():
+    detail, hits = run(lambda session, url: search.fetch_job_details(session, url("slow"), timeout=0.1, retries=0))
+    assert detail is None
+    assert hits["slow"] == 1
+
+
+def test_fetch_all_jobs_skips_failed_postings():
+    async def scenario(session, url):
+        return await search.fetch_all_jobs([url("ok"), url("missing"), url("flaky")], session=session)
+
+    details, _ = run(scenario)
+    assert [detail["company_name"] for detail in details] == ["Example Corp", "Example Corp"]
+
+
+def test_enrich_postings_keeps_the_longer_description():
+    snippet = "搜索摘要：负责搜索相关性模型的训练与上线。"
+
+    async def scenario(session, url):
+        postings = [
+            JobPosting(job_title="ML Engineer", job_desc_text=snippet, apply_link=url("ok")),
+            JobPosting(job_title="ML Engineer", job_desc_text=snippet, apply_link=url("short")),
+            JobPosting(job_title="ML Engineer", job_desc_text="完整描述" * 100, apply_link=url("unused")),
+        ]
+        return await search.enrich_postings(postings, session=session)
+
+    (replaced, kept, long_enough), hits = run(scenario)
+    assert len(replaced.job_desc_text) > len(snippet)
+    assert replaced.company_name == "Example Corp"
+    assert kept.job_desc_text == snippet
+    assert long_enough.job_desc_text == "完整描述" * 100
+    assert "unused" not in hits
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import job_parser  # noqa: E402
+import search  # noqa: E402
+
+BLANK_PAGES = ["", "   \n\t", "<!-- removed -->", "\x00"]
+
+
+@pytest.mark.parametrize("backend", job_parser.available_backends())
+@pytest.mark.parametrize("html", BLANK_PAGES)
+def test_blank_page_yields_empty_fields(backend, html):
+    parsed = job_parser.parse_job_html(html, "https://example.com/job/1", backend)
+    assert parsed == {**{name: "" for name in job_parser.FIELDS}, "apply_link": "https://example.com/job/1"}
+
+
+@pytest.mark.parametrize("backend", job_parser.available_backends())
+def test_backend_error_on_empty_body_is_not_raised(backend):
+    # 直接调用后端（绕过 parse_job_html 的空白判断），lxml 不得抛出 "Document is empty"
+    fields, json_ld = job_parser._BACKENDS[backend]("<!-- removed -->")
+    assert json_ld == []
+    assert not any(fields.values())
+
+
+def test_parse_error_skips_only_that_posting(monkeypatch):
+    async def parse(html, url="", backend=None):
+        if "broken" in url:
+            raise ValueError("unparseable")
+        return job_parser.parse_job_html(html, url)
+
+    class Response:
+        status = 200
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        async def text(self):
+            return '<h2 class="topcard__title">Engineer</h2>'
+
+    class Session:
+        def get(self, url, timeout=None):
+            return Response()
+
+    monkeypatch.setattr(search, "parse_job_html_async", parse)
+    jobs = asyncio.run(
+        search.fetch_all_jobs(["https://example.com/ok", "https://example.com/broken"], session=Session())
+    )
+    assert [(job["job_title"], job["apply_link"]) for job in jobs] == [("Engineer", "https://example.com/ok")]
+
+
+@pytest.mark.parametrize("backend", job_parser.available_backends())
+@pytest.mark.parametrize("payload", [
+    '"x"',
+    "42",
+    "null",
+    '[1, "a", null]',
+    '{"@graph": "not a list"}',
+    '[{"@graph": [2, "b"]}, "c"]',
+])
+def test_non_object_json_ld_is_ignored(backend, payload):
+    html = f'<script type="application/ld+json">{payload}</script>'
+    parsed = job_parser.parse_job_html(html, "https://example.com/job/1", backend)
+    assert parsed["apply_link"] == "https://example.com/job/1"
+    assert parsed["job_title"] == ""
+
+
+@pytest.mark.parametrize("backend", job_parser.available_backends())
+def test_job_posting_is_found_among_non_object_items(backend):
+    payload = '[1, {"@graph": ["x", {"@type": "JobPosting", "title": "Data Engineer", "description": ["odd"]}]}]'
+    parsed = job_parser.parse_job_html(f'<script type="application/ld+json">{payload}</script>', "u", backend)
+    assert parsed["job_title"] == "Data Engineer"
+    assert parsed["job_desc_text"] == ""
+
+
+TRUNCATED_PAGES = [
+    ('<html><h2 class="topcard__title">Engineer', "Engineer"),
+    ('<html><body><h2 class="topcard__title">Senior <b>ML</b> Engineer', "Senior ML Engineer"),
+]
+
+
+@pytest.mark.parametrize("backend", job_parser.available_backends())
+@pytest.mark.parametrize("html, title", TRUNCATED_PAGES)
+def test_truncated_page_keeps_unclosed_fields(backend, html, title):
+    assert job_parser.parse_job_html(html, "u", backend)["job_title"] == title
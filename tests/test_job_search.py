@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools  # noqa: E402
+
+
+class StubSerper:
+    """Returns ten distinct postings per query after an optional delay."""
+
+    delay = 0.0
+
+    def search(self, query, num_results=5):
+        time.sleep(self.delay)
+        return self._response(query)
+
+    async def search_async(self, query, num_results=5):
+        await asyncio.sleep(self.delay)
+        return self._response(query)
+
+    @staticmethod
+    def _response(query):
+        return {"items": [
+            {"title": f"{query} {i} - ACME {i}", "link": f"https://jobs.example.com/{query}/{i}", "snippet": "x"}
+            for i in range(10)
+        ]}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(tools, "SerperClient", StubSerper)
+    monkeypatch.setattr(tools, "search_local_jobs", lambda *args, **kwargs: [])
+    monkeypatch.setattr(tools, "index_postings", lambda postings: None)
+    monkeypatch.setattr(tools, "get_current_resume_path", lambda: "")
+
+
+def search(use_async: bool, **kwargs):
+    if use_async:
+        return asyncio.run(tools.ajob_search(**kwargs))
+    return tools.job_search(**kwargs)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_results_are_cut_to_limit(use_async):
+    jobs = search(use_async, keywords="GenAI", location_name="北京/上海", limit=5)
+    assert isinstance(jobs, list)
+    assert len(jobs) == 5
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_no_variant_within_deadline_is_an_error(use_async, monkeypatch):
+    monkeypatch.setattr(tools, "JOB_SEARCH_DEADLINE", 0.05)
+    monkeypatch.setattr(StubSerper, "delay", 0.5)
+    result = search(use_async, keywords="GenAI", limit=5)
+    assert isinstance(result, dict) and "error" in result
+
+
+def test_async_local_search_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def search_local_jobs(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return []
+
+    monkeypatch.setattr(tools, "search_local_jobs", search_local_jobs)
+    search(True, keywords="GenAI", limit=5)
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+
+@pytest.mark.parametrize("url", [
+    "http://169.254.169.254/latest/meta-data/",
+    "http://127.0.0.1:8080/admin",
+    "http://10.0.0.1/",
+    "http://192.168.1.1/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "file:///etc/passwd",
+    "ftp://93.184.216.34/",
+])
+def test_internal_targets_are_rejected(url):
+    assert not utils._is_public_url(url)
+
+
+def test_public_address_is_allowed():
+    assert utils._is_public_url("https://93.184.216.34/jobs")
+
+
+def test_no_head_request_unless_enabled(monkeypatch):
+    def head(*args, **kwargs):
+        raise AssertionError("HEAD request sent")
+
+    monkeypatch.setattr(utils.requests, "head", head)
+    monkeypatch.setattr(utils, "FIRECRAWL_REVALIDATE", False)
+    assert utils._page_validators("https://93.184.216.34/jobs") == (None, {})
+    monkeypatch.setattr(utils, "FIRECRAWL_REVALIDATE", True)
+    assert utils._page_validators("http://169.254.169.254/latest/meta-data/") == (None, {})
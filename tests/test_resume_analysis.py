@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+from langchain_core.agents import AgentAction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents  # noqa: E402
+from analysis_store import ResumeAnalysisStore  # noqa: E402
+
+RESUME = "张三，五年 Python 后端开发经验，熟悉 FastAPI 与 PostgreSQL。"
+# 真实报告里用 ❌ 标记短板、建议上传更新后的简历都是正常内容
+REPORT = "## 简历分析\n✅ 后端经验扎实\n❌ 缺少云原生项目经验\n建议补充项目后重新上传更新版简历。"
+
+
+class StubExecutor:
+    max_iterations = 15
+
+
+class StubCallback:
+    def write_agent_name(self, name):
+        pass
+
+
+def extractor_step(observation):
+    return AgentAction("resume_extractor", {}, ""), observation
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ResumeAnalysisStore(path="")
+    monkeypatch.setattr(agents, "get_analysis_store", lambda: store)
+    monkeypatch.setattr(agents, "get_agent_executor", lambda node, config: StubExecutor())
+    return store
+
+
+def run_analyzer(output):
+    state = {
+        "messages": [],
+        "config": {"model": "stub", "model_provider": "openai"},
+        "callback": StubCallback(),
+        "resume_sha256": "abc",
+    }
+    steps = agents._resume_analyzer_steps(state)
+    next(steps)
+    with pytest.raises(StopIteration):
+        steps.send(output)
+    return state
+
+
+def test_report_with_failure_like_text_is_stored(store):
+    run_analyzer({"output": REPORT, "intermediate_steps": [extractor_step(RESUME)]})
+    assert store.get("abc", "openai:stub") == REPORT
+
+
+def test_tool_error_is_not_stored(store):
+    state = run_analyzer({"output": "请先上传简历。", "intermediate_steps": [extractor_step("❌ 未上传简历")]})
+    assert state["resume_analysis"] == "请先上传简历。"
+    assert store.get("abc", "openai:stub") is None
+
+
+def test_run_without_reading_the_resume_is_not_stored(store):
+    run_analyzer({"output": REPORT, "intermediate_steps": []})
+    assert store.get("abc", "openai:stub") is None
+
+
+def test_run_stopped_by_iteration_limit_is_not_stored(store):
+    steps = [extractor_step(RESUME)] * StubExecutor.max_iterations
+    run_analyzer({"output": "Agent stopped due to iteration limit or time limit.", "intermediate_steps": steps})
+    assert store.get("abc", "openai:stub") is None
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from router import ROUTER_CONFIDENCE_THRESHOLD, classify, route_locally  # noqa: E402
+
+# app.py 中的预设问题 -> 期望的 Agent 与复合任务后续 Agent
+PRESET_PILLS = [
+    ("识别与GenAI相关的科技行业最新趋势", "WebResearcher", ""),
+    ("查找新兴技术及其对岗位机会的影响", "WebResearcher", ""),
+    ("总结我的简历", "ResumeAnalyzer", ""),
+    ("根据我的简历技能和兴趣生成职业路径可视化", "ResumeAnalyzer", ""),
+    ("阿里的GenAI相关岗位", "JobSearcher", ""),
+    ("在中国搜索GenAI相关岗位", "JobSearcher", ""),
+    ("分析我的简历并推荐合适岗位及相关职位列表", "ResumeAnalyzer", "JobSearcher"),
+    ("为我的简历生成求职信", "ResumeAnalyzer", "CoverLetterGenerator"),
+]
+
+
+@pytest.mark.parametrize("query, agent, followup", PRESET_PILLS)
+def test_preset_pills_route_to_expected_agent(query, agent, followup):
+    route = classify(query)
+    assert (route.agent, route.followup) == (agent, followup)
+
+
+@pytest.mark.parametrize("query, agent, followup", PRESET_PILLS)
+def test_preset_pills_are_never_routed_locally_to_another_agent(query, agent, followup):
+    route = route_locally(query)
+    assert route is None or (route.agent, route.followup) == (agent, followup)
+
+
+def test_research_pill_is_not_sent_to_job_searcher():
+    route = route_locally("查找新兴技术及其对岗位机会的影响")
+    assert route is not None and route.agent == "WebResearcher"
+
+
+@pytest.mark.parametrize("query", ["找工作", "有什么新闻", "你好", "求职信", "岗位 岗位 岗位"])
+def test_single_keyword_stays_below_threshold(query):
+    assert classify(query).confidence < ROUTER_CONFIDENCE_THRESHOLD
+    assert route_locally(query) is None
+
+
+def test_two_independent_keywords_route_locally():
+    route = route_locally("前端技术岗位招聘")
+    assert route is not None and route.agent == "JobSearcher"
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+
+class FakeSerper:
+    """A local stand-in for google.serper.dev that records load and can be slowed down or fail."""
+
+    def __init__(self, delay: float = 0.0, status: int = 200) -> None:
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle(self, request):
+        payload = await request.json()
+        self.requests.append(payload["q"])
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.status != 200:
+            return web.json_response({"message": "fail"}, status=self.status)
+        return web.json_response({"organic": [{"title": payload["q"], "link": "https://example.com/1"}]})
+
+
+def run(fake: FakeSerper, scenario):
+    async def main():
+        app = web.Application()
+        app.router.add_post("/search", fake.handle)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            client = utils.SerperClient("test-key", base_url=str(server.make_url("")))
+            return await scenario(client)
+        finally:
+            await utils.close_http_session()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_organic_results_are_returned_as_items():
+    fake = FakeSerper()
+    data = run(fake, lambda client: client.search_async("python jobs", use_cache=False))
+    assert data["items"] == [{"title": "python jobs", "link": "https://example.com/1"}]
+    assert "organic" not in data
+
+
+def test_identical_concurrent_searches_are_coalesced():
+    fake = FakeSerper(delay=0.2)
+
+    async def scenario(client):
+        return await asyncio.gather(*(client.search_async("coalesce me", use_cache=False) for _ in range(5)))
+
+    results = run(fake, scenario)
+    assert fake.requests == ["coalesce me"]
+    assert all(result == results[0] for result in results)
+
+
+def test_pooled_session_is_bounded_by_the_semaphore(monkeypatch):
+    monkeypatch.setattr(utils, "SERPER_MAX_CONCURRENCY", 2)
+    fake = FakeSerper(delay=0.1)
+
+    async def scenario(client):
+        await asyncio.gather(*(client.search_async(f"query {i}", use_cache=False) for i in range(6)))
+        return utils.get_http_session()[0]
+
+    session = run(fake, scenario)
+    assert len(fake.requests) == 6
+    assert fake.peak == 2
+    assert session.closed
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    fake = FakeSerper(delay=0.2)
+
+    async def scenario(client):
+        leader = asyncio.ensure_future(client.search_async("cancel me", use_cache=False))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(client.search_async("cancel me", use_cache=False))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    data = run(fake, scenario)
+    assert data["items"][0]["title"] == "cancel me"
+    # 领头请求被取消后，等待方自己重新发出请求
+    assert fake.requests == ["cancel me", "cancel me"]
+
+
+def test_http_errors_are_raised_to_every_coalesced_caller():
+    fake = FakeSerper(delay=0.1, status=500)
+
+    async def scenario(client):
+        return await asyncio.gather(
+            *(client.search_async("broken", use_cache=False) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = run(fake, scenario)
+    assert fake.requests == ["broken"]
+    assert all(isinstance(error, aiohttp.ClientResponseError) and error.status == 500 for error in errors)
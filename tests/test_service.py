@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.messages import AIMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import service  # noqa: E402
+
+
+class StubGraph:
+    """An async graph stand-in: Supervisor hands off to ChatBot, which streams two tokens."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.release = None
+
+    async def astream(self, inputs, config=None, stream_mode=None):
+        callback = inputs["callback"]
+        yield "updates", {"Supervisor": {}}
+        yield "values", {**inputs, "next_step": "ChatBot"}
+        if self.release is not None:
+            await self.release.wait()
+        await asyncio.sleep(self.delay)
+        callback.write_agent_name("ChatBot")
+        for token in ("你", "好"):
+            callback.on_llm_new_token(token)
+        messages = inputs["messages"] + [AIMessage(content="你好", name="ChatBot")]
+        yield "updates", {"ChatBot": {}}
+        yield "values", {**inputs, "messages": messages, "next_step": "Finish"}
+
+
+def run(scenario, graph=None, **app_options):
+    async def main():
+        app_options.setdefault("model_config", {})
+        stub = graph or StubGraph()
+        client = TestClient(TestServer(service.create_app(graph=stub, **app_options)))
+        await client.start_server()
+        try:
+            return await scenario(client, stub)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+async def new_session(client) -> str:
+    response = await client.post("/sessions")
+    assert response.status == 201
+    return (await response.json())["session_id"]
+
+
+async def wait_running(client, count: int = 1) -> None:
+    pool = client.server.app["pool"]
+    for _ in range(200):
+        if pool.running >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("turn did not start")
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_json_turn_answers_and_keeps_history():
+    async def scenario(client, graph):
+        session_id = await new_session(client)
+        response = await client.post(f"/sessions/{session_id}/messages", json={"message": "hi"})
+        assert response.status == 200
+        result = await response.json()
+        history = await (await client.get(f"/sessions/{session_id}")).json()
+        return result, history
+
+    result, history = run(scenario)
+    assert result["answer"] == "你好"
+    assert result["agents"] == ["ChatBot"]
+    assert [message["content"] for message in history["messages"]] == ["hi", "你好"]
+
+
+def test_stream_turn_sends_events_in_order():
+    async def scenario(client, graph):
+        session_id = await new_session(client)
+        response = await client.post(f"/sessions/{session_id}/messages", json={"message": "hi", "stream": True})
+        assert response.headers["Content-Type"] == "text/event-stream"
+        return parse_events(await response.text())
+
+    events = run(scenario)
+    assert [event for event, _ in events] == ["handoff", "agent", "token", "token", "done"]
+    assert events[0][1] == {"to": "ChatBot"}
+    assert "".join(data["text"] for event, data in events if event == "token") == "你好"
+    assert events[-1][1]["answer"] == "你好"
+
+
+def test_unknown_session_is_404():
+    async def scenario(client, graph):
+        message = await client.post("/sessions/missing/messages", json={"message": "hi"})
+        history = await client.get("/sessions/missing")
+        return message.status, history.status, await message.json()
+
+    message_status, history_status, body = run(scenario)
+    assert message_status == history_status == 404
+    assert body == {"error": "session not found"}
+
+
+def test_full_queue_is_429():
+    async def scenario(client, graph):
+        graph.release = asyncio.Event()
+        first, second = await new_session(client), await new_session(client)
+        running = asyncio.create_task(client.post(f"/sessions/{first}/messages", json={"message": "hi"}))
+        await wait_running(client)
+        rejected = await client.post(f"/sessions/{second}/messages", json={"message": "hi"})
+        graph.release.set()
+        return (await running).status, rejected.status, rejected.headers.get("Retry-After")
+
+    assert run(scenario, workers=1, queue_size=0) == (200, 429, "1")
+
+
+def test_queue_timeout_is_503():
+    async def scenario(client, graph):
+        graph.release = asyncio.Event()
+        first, second = await new_session(client), await new_session(client)
+        running = asyncio.create_task(client.post(f"/sessions/{first}/messages", json={"message": "hi"}))
+        await wait_running(client)
+        timed_out = await client.post(f"/sessions/{second}/messages", json={"message": "hi"})
+        graph.release.set()
+        return (await running).status, timed_out.status
+
+    assert run(scenario, workers=1, queue_size=1, queue_timeout=0.05) == (200, 503)
+
+
+def test_concurrent_turn_on_same_session_is_409():
+    async def scenario(client, graph):
+        graph.release = asyncio.Event()
+        session_id = await new_session(client)
+        running = asyncio.create_task(client.post(f"/sessions/{session_id}/messages", json={"message": "hi"}))
+        await wait_running(client)
+        conflict = await client.post(f"/sessions/{session_id}/messages", json={"message": "again"})
+        graph.release.set()
+        return (await running).status, conflict.status
+
+    assert run(scenario) == (200, 409)
+
+
+def test_turn_saved_second_on_shared_store_is_409(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+
+    async def main():
+        # 两个“实例”共享同一个 SQLite 会话存储，同时在同一会话上执行一轮
+        fast, slow = (
+            TestClient(TestServer(service.create_app(
+                graph=StubGraph(delay), session_store=service.SQLiteSessionStore(path), model_config={},
+            )))
+            for delay in (0.0, 0.3)
+        )
+        await fast.start_server()
+        await slow.start_server()
+        release = asyncio.Event()
+        for client in (fast, slow):
+            client.server.app["graph"].release = release
+        try:
+            session_id = await new_session(fast)
+            turns = asyncio.gather(
+                fast.post(f"/sessions/{session_id}/messages", json={"message": "hi"}),
+                slow.post(f"/sessions/{session_id}/messages", json={"message": "hey"}),
+            )
+            # 两轮都读到同一版本的会话后再放行，快的一轮先保存
+            await wait_running(fast)
+            await wait_running(slow)
+            release.set()
+            first, second = await turns
+            history = await (await slow.get(f"/sessions/{session_id}")).json()
+            return first.status, second.status, history
+        finally:
+            await fast.close()
+            await slow.close()
+
+    first, second, history = asyncio.run(main())
+    assert (first, second) == (200, 409)
+    # 被拒绝的一轮没有覆盖先完成的那一轮
+    assert [message["content"] for message in history["messages"]] == ["hi", "你好"]
+
+
+class RecordingStore(service.SessionStore):
+    """In-memory session store that records the threads it is called from."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = []
+
+    def get(self, session_id):
+        self.threads.append(threading.get_ident())
+        return super().get(session_id)
+
+    def save(self, session_id, session, expected_updated_at=None):
+        self.threads.append(threading.get_ident())
+        return super().save(session_id, session, expected_updated_at)
+
+
+def test_session_store_runs_off_the_event_loop():
+    store = RecordingStore()
+
+    async def scenario(client, graph):
+        session_id = await new_session(client)
+        await client.post(f"/sessions/{session_id}/messages", json={"message": "hi"})
+        return threading.get_ident()
+
+    loop_thread = run(scenario, session_store=store)
+    assert len(store.threads) == 3
+    assert loop_thread not in store.threads
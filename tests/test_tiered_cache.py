@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import SQLiteCache, TieredCache  # noqa: E402
+
+
+class RecordingStore(SQLiteCache):
+    """SQLiteCache that records the threads its reads and writes run on."""
+
+    def __init__(self, path):
+        super().__init__(path, table="recording")
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, stored_at=None):
+        self.threads.append(threading.get_ident())
+        return super().set(key, value, stored_at)
+
+
+def test_async_sqlite_tier_runs_off_the_event_loop(tmp_path):
+    store = RecordingStore(str(tmp_path / "cache.sqlite3"))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"value": 1}
+
+    async def main():
+        first = await TieredCache(ttl=60, store=store).aget_or_compute("k", compute)
+        # 新实例内存为空，只能从 SQLite 读到
+        second = await TieredCache(ttl=60, store=store).aget_or_compute("k", compute)
+        return first, second, threading.get_ident()
+
+    first, second, loop_thread = asyncio.run(main())
+    assert first == second == {"value": 1}
+    assert len(calls) == 1
+    assert store.threads and loop_thread not in store.threads
@@ -0,0 +1,61 @@
+import re
+import unicodedata
+
+# 拉丁词/数字按词切分，中日韩连续字符按二元组（bigram）切分
+_TOKEN_PATTERN = re.compile(
+    r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]"
+    r"|[぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]+"
+)
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]")
+
+STOPWORDS = {
+    "a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with", "job", "jobs",
+    "的", "和", "与", "及", "在", "是",
+}
+
+
+def normalize(text: str) -> str:
+    """
+    NFKC-normalizes and lower-cases text (full-width letters and digits become ASCII).
+    """
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def is_cjk(token: str) -> bool:
+    """
+    Returns True when the token starts with a CJK character (i.e. it is a CJK bigram/unigram).
+    """
+    return bool(_CJK.match(token))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap LLM token estimate: one token per CJK character, one per four other characters.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str, stopwords: set = STOPWORDS) -> list:
+    """
+    CJK-aware tokenizer shared by the job index, the ranker and the distiller.
+
+    Latin words keep symbols common in skill names (c++, c#, node.js); runs of
+    CJK characters are split into overlapping bigrams, single characters are kept
+    as unigrams.
+
+    Returns:
+        list[str]: Tokens in document order.
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(normalize(text)):
+        if _CJK.match(match):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        elif match not in stopwords:
+            tokens.append(match)
+    return [token for token in tokens if token not in stopwords]
@@ -1,12 +1,24 @@
 # define tools
 import os
+import re
 import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Annotated
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 from pydantic import Field
 from langchain.tools import BaseTool, tool, StructuredTool
-from data_loader import load_resume, write_cover_letter_to_doc
+from data_loader import load_resume, parse_resume, write_cover_letter_to_doc
 from schemas import JobSearchInput
 from utils import SerperClient,FireCrawlClient
+from artifacts import get_current_resume_path
+from postings import JobPosting, merge_postings
+from job_index import index_postings, search_local_jobs
+from ranking import rank_postings_for_resume
+from distill import DISTILL_MAX_CHARS, distill
 import json
 
 load_dotenv()
@@ -14,6 +26,141 @@ load_dotenv()
 
 # Job search tools
 
+# 查询变体扩展：一次工具调用覆盖多个地点/经验/类型/同义词，替代 Agent 的串行重试
+JOB_SEARCH_DEADLINE = float(os.environ.get("JOB_SEARCH_DEADLINE", "8"))
+JOB_SEARCH_MAX_VARIANTS = int(os.environ.get("JOB_SEARCH_MAX_VARIANTS", "6"))
+JOB_SEARCH_MAX_RESULTS = int(os.environ.get("JOB_SEARCH_MAX_RESULTS", "30"))
+
+KEYWORD_SYNONYMS = {
+    "genai": ["生成式AI", "AIGC"],
+    "生成式ai": ["GenAI", "AIGC"],
+    "aigc": ["GenAI", "生成式AI"],
+    "llm": ["大模型"],
+    "大模型": ["LLM"],
+    "机器学习": ["machine learning"],
+    "machine learning": ["机器学习"],
+    "算法": ["algorithm engineer"],
+    "前端": ["frontend"],
+    "后端": ["backend"],
+    "数据分析": ["data analyst"],
+    "嵌入式": ["embedded"],
+}
+
+_LOCATION_SEPARATORS = re.compile(r"\s*(?:/|、|;|；|，|\bor\b|或)\s*")
+
+
+def _as_list(value) -> list:
+    if not value:
+        return [None]
+    if isinstance(value, (list, tuple, set)):
+        return list(value) or [None]
+    return [value]
+
+
+def _keyword_variants(keywords: str) -> list:
+    variants = [keywords]
+    lowered = keywords.lower()
+    for term, synonyms in KEYWORD_SYNONYMS.items():
+        position = lowered.find(term)
+        if position < 0:
+            continue
+        for synonym in synonyms:
+            variant = keywords[:position] + synonym + keywords[position + len(term):]
+            if variant.lower() not in {v.lower() for v in variants}:
+                variants.append(variant)
+    return variants
+
+
+def expand_job_queries(
+    keywords,
+    location_name=None,
+    job_type=None,
+    employment_type=None,
+    experience=None,
+    max_variants: int = JOB_SEARCH_MAX_VARIANTS,
+) -> list:
+    """
+    Expands one job search request into concurrent query variants.
+
+    Every combination of location, experience level, employment type and job type is
+    generated for the original keywords first; synonym keywords are added for the
+    primary combination afterwards, up to max_variants queries.
+
+    Returns:
+        list[tuple[str, str | None]]: (query, location) pairs.
+    """
+    locations = [loc for loc in _LOCATION_SEPARATORS.split(location_name or "") if loc] or [None]
+    combos = list(
+        itertools.product(locations, _as_list(experience), _as_list(employment_type), _as_list(job_type))
+    )
+    keyword_variants = _keyword_variants(keywords)
+
+    planned = [(keyword_variants[0], combo) for combo in combos]
+    planned += [(variant, combos[0]) for variant in keyword_variants[1:]]
+
+    variants, seen = [], set()
+    for words, (location, level, employment, work_type) in planned:
+        query = f"job {words}"
+        if location:
+            query += f" in {location}"
+        if work_type:
+            query += f" {work_type}"
+        if employment:
+            query += f" {employment}"
+        if level:
+            query += f" {level} experience"
+        if query not in seen:
+            seen.add(query)
+            variants.append((query, location))
+        if len(variants) >= max_variants:
+            break
+    return variants
+
+
+def _parse_job_items(response, location_name=None) -> list:
+    return [
+        JobPosting.from_serper_item(item, location_name, missing="Not specified")
+        for item in response.get("items", [])
+    ]
+
+
+def _merge_job_results(result_lists: list, max_results: int = JOB_SEARCH_MAX_RESULTS) -> list:
+    # 轮询合并各变体结果，使每个变体的靠前结果都能进入列表，再按规范链接/标题+公司去重
+    return [posting.to_dict() for posting in merge_postings(*result_lists, max_results=max_results)]
+
+
+def _rank_for_resume(jobs: list) -> list:
+    # 本地向量化排序：按与当前会话简历的匹配度排序，无需 LLM 往返
+    resume_path = get_current_resume_path()
+    if not resume_path or not os.path.exists(resume_path):
+        return jobs
+    try:
+        resume_text = parse_resume(resume_path)["text"]
+    except Exception as e:
+        print(f"读取简历用于岗位排序失败: {e}")
+        return jobs
+    return rank_postings_for_resume(jobs, resume_text)
+
+
+def _search_local(keywords, location_name, listed_at, limit) -> list:
+    # 只取全部关键词都命中的本地结果；放宽为任一关键词时，"岗位"之类的常见词就能凑满结果
+    return search_local_jobs(keywords, location_name, listed_at, limit, relax=False)
+
+
+def _local_is_enough(local: list, limit: int, job_type, employment_type, experience) -> bool:
+    # 本地索引无法校验工作类型、雇佣类型和经验要求，带这些条件时总是走网络搜索
+    return len(local) >= limit and not (job_type or employment_type or experience)
+
+
+def _require_variant_results(results: list, done) -> None:
+    # 没有任何变体成功：有失败的变体时抛出其异常；全部超时也要报错，而不是悄悄只返回本地结果
+    if results:
+        return
+    if done:
+        raise next(iter(done)).exception()
+    raise TimeoutError(f"{JOB_SEARCH_DEADLINE:g} 秒内没有任何查询返回结果")
+
+
 def job_search(
     keywords: str,
     location_name: str = None,
@@ -26,70 +173,118 @@ def job_search(
 ) -> dict:  # type: ignore
     """
     Search for job postings based on specified criteria using Serper API. Returns detailed job listings.
+
+    The local job index is consulted first and answers on its own when at least limit
+    postings match every keyword and no job type, employment type or experience filter is
+    given (the index cannot check those). Otherwise the request is expanded into query
+    variants (per location, experience level, employment type and keyword synonym) that
+    run concurrently under JOB_SEARCH_DEADLINE seconds; the results of every variant that finished in time are
+    indexed, merged with the local matches, deduplicated, ranked and cut to limit postings.
+    When no variant finishes in time, an error is returned.
     """
+    limit = limit or 5
     try:
-        # 构造搜索查询
-        query = f"job {keywords}"
-        if location_name:
-            query += f" in {location_name}"
-        if job_type:
-            query += f" {job_type}"
-        if employment_type:
-            query += f" {employment_type}"
-        if experience:
-            query += f" {experience} experience"
-            
-        # 使用SerperClient进行搜索
+        local = _search_local(keywords, location_name, listed_at, limit)
+        if _local_is_enough(local, limit, job_type, employment_type, experience):
+            return _rank_for_resume(local)
+
+        variants = expand_job_queries(keywords, location_name, job_type, employment_type, experience)
+
+        # 使用SerperClient并发搜索所有查询变体
         client = SerperClient()
-        response = client.search(query, num_results=limit)
-        
-        # 解析搜索结果
-        jobs = []
-        items = response.get("items", [])
-        
-        for item in items:
-            title = item.get("title", "")
-            link = item.get("link", "")
-            snippet = item.get("snippet", "")
-            
-            # 提取公司名称（如果可能）
-            company_name = ""
-            if " at " in title:
-                parts = title.split(" at ")
-                if len(parts) >= 2:
-                    company_name = parts[-1]
-            
-            job_info = {
-                "job_title": title,
-                "company_name": company_name,
-                "job_location": location_name or "Not specified",
-                "job_desc_text": snippet,
-                "apply_link": link,
-                "time_posted": item.get("date", "Not specified"),
-            }
-            
-            jobs.append(job_info)
-            
-        return jobs
+        pool = ThreadPoolExecutor(max_workers=len(variants))
+        futures = {
+            pool.submit(client.search, query, num_results=limit): location
+            for query, location in variants
+        }
+        done, _ = wait(futures, timeout=JOB_SEARCH_DEADLINE)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        # 解析搜索结果（按变体顺序），超时或失败的变体直接跳过
+        results = []
+        for future, location in futures.items():
+            if future in done and future.exception() is None:
+                results.append(_parse_job_items(future.result(), location or location_name))
+        _require_variant_results(results, done)
+        index_postings(itertools.chain.from_iterable(results))
+        jobs = _merge_job_results(results + [[JobPosting.from_dict(job) for job in local]])
+        # 先在合并后的全部结果上按简历排序，再截取前 limit 条
+        return _rank_for_resume(jobs)[:limit]
+    except Exception as e:
+        print(f"搜索职位时出错: {e}")
+        return {"error": f"搜索职位时出错: {str(e)}"}
+
+
+async def ajob_search(
+    keywords: str,
+    location_name: str = None,
+    job_type: str = None,
+    limit: int = 5,
+    employment_type: str = None,
+    listed_at=None,
+    experience=None,
+    distance=None,
+) -> dict:  # type: ignore
+    """
+    Async variant of job_search that never blocks the event loop.
+    """
+    limit = limit or 5
+    try:
+        # 本地 FTS5 查询是同步 SQLite 调用，放到线程中执行
+        local = await asyncio.to_thread(_search_local, keywords, location_name, listed_at, limit)
+        if _local_is_enough(local, limit, job_type, employment_type, experience):
+            return await asyncio.to_thread(_rank_for_resume, local)
+
+        variants = expand_job_queries(keywords, location_name, job_type, employment_type, experience)
+        client = SerperClient()
+        tasks = {
+            asyncio.ensure_future(client.search_async(query, num_results=limit)): location
+            for query, location in variants
+        }
+        done, pending = await asyncio.wait(tasks, timeout=JOB_SEARCH_DEADLINE)
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for task, location in tasks.items():
+            if task in done and task.exception() is None:
+                results.append(_parse_job_items(task.result(), location or location_name))
+        _require_variant_results(results, done)
+        await asyncio.to_thread(index_postings, list(itertools.chain.from_iterable(results)))
+        jobs = _merge_job_results(results + [[JobPosting.from_dict(job) for job in local]])
+        return (await asyncio.to_thread(_rank_for_resume, jobs))[:limit]
     except Exception as e:
         print(f"搜索职位时出错: {e}")
         return {"error": f"搜索职位时出错: {str(e)}"}
 
 
+@lru_cache(maxsize=None)
 def get_job_search_tool():
     """
-    Create a tool for the JobPipeline function.
+    Create a tool for the JobPipeline function. The tool (and its pydantic schema) is built once per process.
     Returns:
     StructuredTool: A structured tool for the JobPipeline function.
     """
     job_pipeline_tool = StructuredTool.from_function(
         func=job_search,
+        coroutine=ajob_search,
         name="JobSearchTool",
         description="Search for job postings based on specified criteria using Serper API. Returns detailed job listings",
         args_schema=JobSearchInput,
     )
     return job_pipeline_tool
 
+# resume_extractor 读取失败时的输出前缀（工具自身的输出约定，与 Agent 生成的报告文本无关）
+RESUME_ERROR_PREFIX = "❌"
+
+
+def is_resume_extraction_error(observation) -> bool:
+    """
+    Returns True when a resume_extractor observation reports that no resume could be read.
+    """
+    return not isinstance(observation, str) or observation.startswith(RESUME_ERROR_PREFIX)
+
+
 class ResumeExtractorTool(BaseTool):
     name: str = "resume_extractor"
     description: str = "提取已上传的简历内容进行分析。不需要输入参数。"
@@ -97,25 +292,37 @@ class ResumeExtractorTool(BaseTool):
     def _run(self, query: str = "") -> str:
         """提取简历内容"""
         try:
-            resume_path = "temp/resume.pdf"
+            # 每个会话的简历按内容哈希存储，路径由图节点绑定到当前上下文
+            resume_path = get_current_resume_path()
+            if not resume_path:
+                return f"{RESUME_ERROR_PREFIX} 未上传简历"
             
             if os.path.exists(resume_path):
                 file_size = os.path.getsize(resume_path)
                 if file_size == 0:
-                    return "❌ 简历文件为空"
+                    return f"{RESUME_ERROR_PREFIX} 简历文件为空"
                 resume_content = load_resume(resume_path)
                 if resume_content and len(resume_content.strip()) > 10:
                     return resume_content
                 else:
-                    return "❌ 简历文件内容为空或读取失败"
+                    return f"{RESUME_ERROR_PREFIX} 简历文件内容为空或读取失败"
             else:
-                return "❌ 未找到简历文件"
+                return f"{RESUME_ERROR_PREFIX} 未找到简历文件"
                     
         except Exception as e:
-            return f"❌ 读取简历时出错: {str(e)}"
+            return f"{RESUME_ERROR_PREFIX} 读取简历时出错: {str(e)}"
     
     async def _arun(self, query: str = "") -> str:
-        return self._run(query)
+        # PDF 解析放到线程中执行；contextvars 会随之复制，会话简历绑定仍然有效
+        return await asyncio.to_thread(self._run, query)
+
+
+@lru_cache(maxsize=None)
+def get_resume_extractor_tool():
+    """
+    Returns the shared ResumeExtractorTool instance.
+    """
+    return ResumeExtractorTool()
 
 # Cover Letter Generation Tool
 @tool
@@ -143,14 +350,7 @@ def save_cover_letter_for_specific_job(
 
 
 # Web Search Tools
-@tool("google_search")
-def get_google_search_results(
-    query: str = Field(..., description="Search query for web")
-) -> str:
-    """
-    search the web for the given query and return the search results.
-    """
-    response = SerperClient().search(query)
+def _format_search_results(response) -> str:
     items = response.get("items")
     string = []
     for result in items:
@@ -172,13 +372,163 @@ def get_google_search_results(
     return content
 
 
-@tool("scrape_website")
-def scrape_website(url: str = Field(..., description="Url to be scraped")) -> str:
+def google_search(
+    query: str = Field(..., description="Search query for web")
+) -> str:
+    """
+    search the web for the given query and return the search results.
+    """
+    return _format_search_results(SerperClient().search(query))
+
+
+async def agoogle_search(
+    query: str = Field(..., description="Search query for web")
+) -> str:
     """
-    Scrape the content of a website and return the text.
+    search the web for the given query and return the search results.
+    """
+    return _format_search_results(await SerperClient().search_async(query))
+
+
+get_google_search_results = StructuredTool.from_function(
+    func=google_search,
+    coroutine=agoogle_search,
+    name="google_search",
+)
+
+
+def _distilled(url: str, content: str, query: str, max_chars: int = DISTILL_MAX_CHARS) -> str:
+    # 去掉导航、横幅、页脚和重复段落，只保留与问题相关的片段
+    result = distill(content, query, max_chars)
+    print(
+        f"🧹 {url}: {result['tokens_before']} → {result['tokens_after']} tokens "
+        f"(-{result['reduction']:.0%})"
+    )
+    return result["content"]
+
+
+def _scrape_website(
+    url: str = Field(..., description="Url to be scraped"),
+    query: Annotated[str, Field(description="The question the page should answer; only relevant passages are kept")] = "",
+) -> str:
+    """
+    Scrape the content of a website and return the text relevant to the query.
     """
     try:
         content = FireCrawlClient().scrape(url)
     except Exception as exc:
         return f"Failed to scrape {url}"
-    return content
\ No newline at end of file
+    return _distilled(url, content, query)
+
+
+async def _ascrape_website(
+    url: str = Field(..., description="Url to be scraped"),
+    query: Annotated[str, Field(description="The question the page should answer; only relevant passages are kept")] = "",
+) -> str:
+    """
+    Scrape the content of a website and return the text relevant to the query.
+    """
+    try:
+        content = await FireCrawlClient().scrape_async(url)
+    except Exception as exc:
+        return f"Failed to scrape {url}"
+    return _distilled(url, content, query)
+
+
+scrape_website = StructuredTool.from_function(
+    func=_scrape_website,
+    coroutine=_ascrape_website,
+    name="scrape_website",
+)
+
+
+# 批量抓取：多个网址并发抓取，每个主机限流，整体有截止时间，超时的页面直接跳过
+SCRAPE_DEADLINE = float(os.environ.get("SCRAPE_DEADLINE", "30"))
+SCRAPE_PER_HOST_CONCURRENCY = int(os.environ.get("SCRAPE_PER_HOST_CONCURRENCY", "2"))
+SCRAPE_MAX_URLS = int(os.environ.get("SCRAPE_MAX_URLS", "8"))
+
+
+def _unique_urls(urls) -> list:
+    urls = [url.strip() for url in _as_list(urls) if url and url.strip()]
+    return list(dict.fromkeys(urls))[:SCRAPE_MAX_URLS]
+
+
+def _host(url: str) -> str:
+    return urlsplit(url if "://" in url else f"https://{url}").netloc.lower()
+
+
+def _format_scrapes(urls: list, outcomes: dict, query: str) -> str:
+    # 页面越多每页预算越小，总量约为单页预算的三倍，但每页不少于单页预算的一半
+    budget = max(DISTILL_MAX_CHARS // 2, 3 * DISTILL_MAX_CHARS // max(len(urls), 1))
+    sections = []
+    for url in urls:
+        outcome = outcomes.get(url)
+        if outcome is None:
+            body = f"Timed out after {SCRAPE_DEADLINE:g}s"
+        elif isinstance(outcome, BaseException):
+            body = f"Failed to scrape {url}"
+        else:
+            body = _distilled(url, outcome, query, budget)
+        sections.append(f"### {url}\n{body}")
+    return "\n\n".join(sections)
+
+
+def _scrape_websites(
+    urls: Annotated[list[str], Field(description="Urls to be scraped in one call")],
+    query: Annotated[str, Field(description="The question the pages should answer; only relevant passages are kept")] = "",
+) -> str:
+    """
+    Scrape several websites concurrently and return the text relevant to the query for each.
+    Pages that do not finish within the deadline are reported as timed out.
+    """
+    urls = _unique_urls(urls)
+    if not urls:
+        return "No urls to scrape"
+
+    client = FireCrawlClient()
+    host_limits = {_host(url): threading.Semaphore(SCRAPE_PER_HOST_CONCURRENCY) for url in urls}
+
+    def scrape(url):
+        with host_limits[_host(url)]:
+            return client.scrape(url)
+
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {pool.submit(scrape, url): url for url in urls}
+    done, _ = wait(futures, timeout=SCRAPE_DEADLINE)
+    pool.shutdown(wait=False, cancel_futures=True)
+    outcomes = {futures[future]: future.exception() or future.result() for future in done}
+    return _format_scrapes(urls, outcomes, query)
+
+
+async def _ascrape_websites(
+    urls: Annotated[list[str], Field(description="Urls to be scraped in one call")],
+    query: Annotated[str, Field(description="The question the pages should answer; only relevant passages are kept")] = "",
+) -> str:
+    """
+    Scrape several websites concurrently and return the text relevant to the query for each.
+    Pages that do not finish within the deadline are reported as timed out.
+    """
+    urls = _unique_urls(urls)
+    if not urls:
+        return "No urls to scrape"
+
+    client = FireCrawlClient()
+    host_limits = {_host(url): asyncio.Semaphore(SCRAPE_PER_HOST_CONCURRENCY) for url in urls}
+
+    async def scrape(url):
+        async with host_limits[_host(url)]:
+            return await client.scrape_async(url)
+
+    tasks = {asyncio.ensure_future(scrape(url)): url for url in urls}
+    done, pending = await asyncio.wait(tasks, timeout=SCRAPE_DEADLINE)
+    for task in pending:
+        task.cancel()
+    outcomes = {tasks[task]: task.exception() or task.result() for task in done}
+    return _format_scrapes(urls, outcomes, query)
+
+
+scrape_websites = StructuredTool.from_function(
+    func=_scrape_websites,
+    coroutine=_ascrape_websites,
+    name="scrape_websites",
+)
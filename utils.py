@@ -1,11 +1,215 @@
+import asyncio
+import ipaddress
 import os
+import re
+import socket
+import threading
+import time
+import unicodedata
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import urlsplit
+import aiohttp
+import requests
 from langchain_community.utilities import GoogleSerperAPIWrapper
 from langchain_community.document_loaders import FireCrawlLoader
 
 from dotenv import load_dotenv
+from cache import SQLiteCache, TieredCache
+from postings import canonical_url
+from singleflight import SingleFlight
 
 load_dotenv()
 
+# Serper 搜索结果缓存配置（秒）
+SERPER_CACHE_TTL = float(os.environ.get("SERPER_CACHE_TTL", "3600"))
+SERPER_CACHE_STALE_TTL = float(os.environ.get("SERPER_CACHE_STALE_TTL", "86400"))
+SERPER_CACHE_SIZE = int(os.environ.get("SERPER_CACHE_SIZE", "512"))
+SERPER_CACHE_PATH = os.environ.get("SERPER_CACHE_PATH", os.path.join("temp", "serper_cache.sqlite3"))
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+# 相同的搜索/抓取请求同时到达时只发出一次网络调用
+_search_flights = SingleFlight()
+_scrape_flights = SingleFlight()
+
+
+def get_search_cache() -> TieredCache:
+    """
+    Returns the process-wide Serper response cache (in-memory LRU in front of SQLite).
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            store = SQLiteCache(SERPER_CACHE_PATH, table="serper") if SERPER_CACHE_PATH else None
+            _search_cache = TieredCache(
+                ttl=SERPER_CACHE_TTL,
+                stale_ttl=SERPER_CACHE_STALE_TTL,
+                max_size=SERPER_CACHE_SIZE,
+                store=store,
+            )
+    return _search_cache
+
+
+def get_search_cache_stats() -> dict:
+    """
+    Returns hit rate and bytes saved by the Serper response cache.
+    """
+    return get_search_cache().stats()
+
+
+# 异步 Serper 客户端：每个事件循环一个带 keep-alive 连接池的 aiohttp 会话
+SERPER_BASE_URL = os.environ.get("SERPER_BASE_URL", "https://google.serper.dev")
+SERPER_TIMEOUT = float(os.environ.get("SERPER_TIMEOUT", "15"))
+SERPER_MAX_CONCURRENCY = int(os.environ.get("SERPER_MAX_CONCURRENCY", "8"))
+
+_http_sessions = weakref.WeakKeyDictionary()
+
+
+def get_http_session():
+    """
+    Returns the shared aiohttp session and concurrency semaphore of the running event loop.
+
+    aiohttp sessions are bound to the loop that created them, so one pooled session is
+    kept per loop and reused by every async Serper call made on it.
+
+    Returns:
+        tuple[aiohttp.ClientSession, asyncio.Semaphore]
+    """
+    loop = asyncio.get_running_loop()
+    pooled = _http_sessions.get(loop)
+    if pooled is None or pooled[0].closed:
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=SERPER_MAX_CONCURRENCY * 2, keepalive_timeout=60)
+        session = aiohttp.ClientSession(connector=connector)
+        pooled = (session, asyncio.Semaphore(SERPER_MAX_CONCURRENCY))
+        _http_sessions[loop] = pooled
+    return pooled
+
+
+async def close_http_session() -> None:
+    """
+    Closes the pooled aiohttp session of the running event loop, if any.
+    """
+    pooled = _http_sessions.pop(asyncio.get_running_loop(), None)
+    if pooled is not None and not pooled[0].closed:
+        await pooled[0].close()
+
+
+def get_singleflight_stats() -> dict:
+    """
+    Returns coalescing metrics of the Serper and FireCrawl single-flight layers.
+    """
+    return {"serper": _search_flights.stats(), "firecrawl": _scrape_flights.stats()}
+
+
+# FireCrawl 抓取结果磁盘缓存配置：按规范化 URL 缓存，过期后先做条件请求再决定是否重新抓取
+FIRECRAWL_CACHE_TTL = float(os.environ.get("FIRECRAWL_CACHE_TTL", "86400"))
+FIRECRAWL_CACHE_PATH = os.environ.get("FIRECRAWL_CACHE_PATH", os.path.join("temp", "firecrawl_cache.sqlite3"))
+FIRECRAWL_MAX_CHARS = int(os.environ.get("FIRECRAWL_MAX_CHARS", "10000"))
+# 过期页面的条件请求由本服务直接向目标站点发出 HEAD，默认关闭（过期即重新抓取）；
+# 开启后也只请求解析到公网地址的 http(s) URL，不跟随重定向，避免服务端请求伪造（SSRF）
+FIRECRAWL_REVALIDATE = os.environ.get("FIRECRAWL_REVALIDATE", "").lower() in ("1", "true", "yes")
+FIRECRAWL_REVALIDATE_TIMEOUT = float(os.environ.get("FIRECRAWL_REVALIDATE_TIMEOUT", "5"))
+# 抓取完成后最多再等待 HEAD 请求这么久；超时则不带校验信息缓存页面
+FIRECRAWL_VALIDATORS_GRACE = float(os.environ.get("FIRECRAWL_VALIDATORS_GRACE", "0.5"))
+
+_scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+_scrape_stats = {"hits": 0, "revalidated": 0, "misses": 0, "chars_saved": 0}
+
+
+def get_scrape_cache():
+    """
+    Returns the process-wide FireCrawl page cache, or None when FIRECRAWL_CACHE_PATH is empty.
+    """
+    global _scrape_cache
+    if not FIRECRAWL_CACHE_PATH:
+        return None
+    with _scrape_cache_lock:
+        if _scrape_cache is None:
+            _scrape_cache = SQLiteCache(FIRECRAWL_CACHE_PATH, table="firecrawl")
+    return _scrape_cache
+
+
+def get_scrape_cache_stats() -> dict:
+    """
+    Returns fresh hits, conditional revalidations, misses and characters served from the page cache.
+    """
+    with _scrape_cache_lock:
+        stats = dict(_scrape_stats)
+    total = stats["hits"] + stats["revalidated"] + stats["misses"]
+    stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / total if total else 0.0
+    return stats
+
+
+def _count_scrape(counter: str, chars: int = 0) -> None:
+    with _scrape_cache_lock:
+        _scrape_stats[counter] += 1
+        _scrape_stats["chars_saved"] += chars
+
+
+def _is_public_url(url: str) -> bool:
+    """
+    Returns True when url is http(s) and every address its host resolves to is public,
+    i.e. not private, loopback, link-local (cloud metadata), reserved or multicast.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        return False
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            return False
+    return bool(infos)
+
+
+def _page_validators(url: str, headers: dict = None):
+    """
+    Sends a HEAD request and returns (status_code, {"etag", "last_modified"}); (None, {}) on
+    failure, when revalidation is disabled (FIRECRAWL_REVALIDATE) or the URL is not public.
+    """
+    if not FIRECRAWL_REVALIDATE or not _is_public_url(url):
+        return None, {}
+    try:
+        response = requests.head(
+            url, headers=headers or {}, timeout=FIRECRAWL_REVALIDATE_TIMEOUT, allow_redirects=False
+        )
+    except requests.RequestException:
+        return None, {}
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return response.status_code, {name: value for name, value in validators.items() if value}
+
+
+def _page_unchanged(url: str, validators: dict) -> bool:
+    # 没有 ETag/Last-Modified 的页面无法确认未变化，只能重新抓取
+    if not validators:
+        return False
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    status, current = _page_validators(url, headers)
+    if status == 304:
+        return True
+    return status is not None and 200 <= status < 300 and current == validators
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a search query for cache keys: NFKC, lower case, collapsed whitespace.
+    """
+    query = unicodedata.normalize("NFKC", str(query))
+    return re.sub(r"\s+", " ", query).strip().lower()
+
 class SerperClient:
     """
     A client for performing Google searches using the Serper API.
@@ -21,26 +225,96 @@ class SerperClient:
         search_async(query, num_results): Asynchronously perform a Google search for the given query and return the search results.
     """
 
-    def __init__(self, serper_api_key: str = os.environ.get("SERPER_API_KEY")) -> None:
-        self.serper_api_key = serper_api_key
+    def __init__(self, serper_api_key: str = None, base_url: str = None) -> None:
+        self.serper_api_key = serper_api_key or os.environ.get("SERPER_API_KEY")
+        self.base_url = (base_url or SERPER_BASE_URL).rstrip("/")
 
     def search(
         self,
         query,
         num_results: int = 5,
+        use_cache: bool = True,
+        **params,
     ):
         """
         Perform a Google search for the given query and return the search results.
 
+        Responses are cached on the normalized (query, num_results, params); see get_search_cache.
+
         Args:
             query (str): The search query.
             num_results (int, optional): The number of search results to retrieve. Defaults to GOOGLE_SEARCH_DEFAULT_RESULT_COUNT.
+            use_cache (bool, optional): Set to False to bypass the response cache.
+            **params: Extra GoogleSerperAPIWrapper settings such as gl, hl or tbs.
 
         Returns:
             dict: The search results as a dictionary.
 
         """
-        response = GoogleSerperAPIWrapper(k=num_results).results(query=query)
+        key = TieredCache.make_key("serper", normalize_query(query), num_results, params)
+
+        def fetch():
+            return _search_flights.do(key, lambda: self._search(query, num_results, **params))
+
+        if not use_cache:
+            return fetch()
+        return get_search_cache().get_or_compute(key, fetch)
+
+    async def search_async(
+        self,
+        query,
+        num_results: int = 5,
+        use_cache: bool = True,
+        timeout: float = SERPER_TIMEOUT,
+        **params,
+    ):
+        """
+        Asynchronously perform a Google search for the given query and return the search results.
+
+        Uses the pooled aiohttp session of the running loop and shares the response cache and
+        single-flight layer with search, so sync and async callers never duplicate a request.
+
+        Args:
+            query (str): The search query.
+            num_results (int, optional): The number of search results to retrieve.
+            use_cache (bool, optional): Set to False to bypass the response cache.
+            timeout (float, optional): Per-request timeout in seconds.
+            **params: Extra Serper parameters such as gl, hl or tbs.
+
+        Returns:
+            dict: The search results as a dictionary.
+        """
+        key = TieredCache.make_key("serper", normalize_query(query), num_results, params)
+
+        def fetch():
+            return _search_flights.do_async(
+                key, lambda: self._search_async(query, num_results, timeout, **params)
+            )
+
+        if not use_cache:
+            return await fetch()
+        return await get_search_cache().aget_or_compute(key, fetch)
+
+    async def _search_async(self, query, num_results: int, timeout: float, **params):
+        session, semaphore = get_http_session()
+        search_type = params.pop("type", "search")
+        payload = {"q": query, "num": num_results, "gl": "us", "hl": "en", **params}
+        headers = {"X-API-KEY": self.serper_api_key or "", "Content-Type": "application/json"}
+        async with semaphore:
+            async with session.post(
+                f"{self.base_url}/{search_type}",
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        items = data.pop("organic", [])
+        data["items"] = items
+        return data
+
+    def _search(self, query, num_results: int = 5, **params):
+        response = GoogleSerperAPIWrapper(k=num_results, **params).results(query=query)
         # this is to make the response compatible with the response from the google search client
         items = response.pop("organic", [])
         response["items"] = items
@@ -48,20 +322,91 @@ class SerperClient:
 
 
 class FireCrawlClient:
+    """
+    A client for scraping web pages through FireCrawl, with a persistent per-URL page cache.
+
+    Methods:
+        scrape(url, max_chars, use_cache): Return up to max_chars characters of the page content.
+        scrape_async(url, max_chars, use_cache): Asynchronous variant of scrape.
+    """
 
     def __init__(
         self, firecrawl_api_key: str = os.environ.get("FIRECRAWL_API_KEY")
     ) -> None:
         self.firecrawl_api_key = firecrawl_api_key
 
-    def scrape(self, url):
+    def scrape(self, url, max_chars: int = FIRECRAWL_MAX_CHARS, use_cache: bool = True):
+        """
+        Scrape a page, serving it from the disk cache when possible.
+
+        Pages younger than FIRECRAWL_CACHE_TTL are served without any network access. Older
+        pages are re-scraped; with FIRECRAWL_REVALIDATE enabled, public pages are first
+        revalidated with a conditional HEAD request (ETag / Last-Modified) and only re-scraped
+        when the site reports a change or offers no validators.
+
+        Args:
+            url (str): The page to scrape; tracking parameters do not affect the cache key.
+            max_chars (int, optional): Character budget; scraping stops once it is reached.
+            use_cache (bool, optional): Set to False to bypass the page cache.
+
+        Returns:
+            str: The page content, at most max_chars characters.
+        """
+        key = TieredCache.make_key("firecrawl", canonical_url(url) or url)
+        cache = get_scrape_cache() if use_cache else None
+        stored = cache.get(key) if cache is not None else None
+        if stored is not None:
+            entry, stored_at = stored
+            content = entry.get("content", "")
+            # 缓存内容必须覆盖本次预算：当时的预算足够大，或页面本身比当时的预算短
+            if entry.get("max_chars", 0) >= max_chars or len(content) < entry.get("max_chars", 0):
+                if time.time() - stored_at < FIRECRAWL_CACHE_TTL:
+                    _count_scrape("hits", min(len(content), max_chars))
+                    return content[:max_chars]
+                if _page_unchanged(url, entry.get("validators")):
+                    cache.set(key, entry)
+                    _count_scrape("revalidated", min(len(content), max_chars))
+                    return content[:max_chars]
+
+        _count_scrape("misses")
+        entry = _scrape_flights.do(f"{key}:{max_chars}", lambda: self._fetch(url, max_chars))
+        # 空内容多半是抓取失败，不缓存，下次重新抓取
+        if cache is not None and entry["content"].strip():
+            cache.set(key, entry)
+        return entry["content"]
+
+    async def scrape_async(self, url, max_chars: int = FIRECRAWL_MAX_CHARS, use_cache: bool = True):
+        # FireCrawl SDK 与缓存读写都是同步的，放到线程中执行以免阻塞事件循环；
+        # 线程内的 scrape 仍经过单飞层，与同步调用共享同一次抓取
+        return await asyncio.to_thread(self.scrape, url, max_chars, use_cache)
+
+    def _fetch(self, url, max_chars: int) -> dict:
+        if not FIRECRAWL_REVALIDATE:
+            return {"content": self._scrape(url, max_chars), "max_chars": max_chars, "validators": {}}
+        # 抓取的同时并行取回 ETag/Last-Modified，供缓存过期后做条件请求；
+        # 抓取完成后只再等 FIRECRAWL_VALIDATORS_GRACE 秒，慢的 HEAD 请求不拖慢未命中的抓取
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            validators = executor.submit(_page_validators, url)
+            content = self._scrape(url, max_chars)
+            try:
+                _, page_validators = validators.result(timeout=FIRECRAWL_VALIDATORS_GRACE)
+            except FutureTimeoutError:
+                page_validators = {}
+            return {"content": content, "max_chars": max_chars, "validators": page_validators}
+        finally:
+            executor.shutdown(wait=False)
+
+    def _scrape(self, url, max_chars: int = FIRECRAWL_MAX_CHARS):
         docs = FireCrawlLoader(
             api_key=self.firecrawl_api_key, url=url, mode="scrape"
         ).lazy_load()
 
-        page_content = ""
+        # 逐个消费文档，凑够字符预算即停止，不再拉取后续文档
+        parts, size = [], 0
         for doc in docs:
-            page_content += doc.page_content
-
-        # limit to 10,000 characters
-        return page_content[:10000]
+            parts.append(doc.page_content)
+            size += len(doc.page_content)
+            if size >= max_chars:
+                break
+        return "".join(parts)[:max_chars]